@@ -1,109 +1,650 @@
 """Модуль содержит класс логики работы с данными аккаунтов."""
 import asyncio
 import datetime
+import math
+import typing
 
+from app.config import settings
 import app.models.acc_model as acc_bd_mdl
-from app.schemas.acc_schema import AccInfoSchema
+from app.schemas.acc_schema import (
+    AccBulkResultSchema,
+    AccFieldStatsSchema,
+    AccFilterSchema,
+    AccHistoryPointSchema,
+    AccStatsSchema,
+)
+from app.utils.cursor import decode_cursor, encode_cursor
+import app.utils.metrics as metrics
+import app.utils.response_cache as rc
 import app.utils.tron_client as tr
+from app.utils.tron_guard import CircuitOpenError
+import app.utils.write_buffer as wb
+import httpx
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
 import sqlalchemy.exc as se
 
+DATA_FIELDS = ('acc_addr', 'bandwidth', 'trx_balance', 'energy', 'created_at')
+STATS_PERCENTILES = (0.5, 0.9, 0.99)
+HISTORY_BUCKET_SECONDS = {
+    'minute': 60, 'hour': 3600, 'day': 86400, 'week': 604800,
+}
+
+
+def get_history_bucket_count(
+    date_from: datetime.datetime, date_to: datetime.datetime, bucket: str,
+) -> int:
+    """Наибольшее число интервалов bucket в истории за период.
+
+    Интервалы выровнены по date_trunc, поэтому неполные интервалы по
+    краям периода могут добавить ещё один.
+    """
+    return math.ceil(
+        (date_to - date_from).total_seconds() / HISTORY_BUCKET_SECONDS[bucket]
+    ) + 1
+
+
+def get_account_dict(row: typing.Sequence) -> dict:
+    """Строка последнего снимка в виде словаря с полями AccInfoSchema.
+
+    Пустые числовые поля выдаются как 0: схема ответа объявляет их
+    обязательными целыми.
+    """
+    account = dict(zip(DATA_FIELDS, row))
+    for field in ('bandwidth', 'trx_balance', 'energy'):
+        if account[field] is None:
+            account[field] = 0
+    return account
+
+
+def is_int_value(value) -> bool:
+    """Является ли значение из курсора целым числом (но не bool)."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
 
 class AccountWorker:
 
     @staticmethod
-    async def create_account_info(acc_addr: str, bd) -> str:
-        """Метод получает инфу из TRON и создаёт запись в БД."""
+    async def create_account_info(
+        acc_addr: str, bd, wait_durable: bool = False,
+    ) -> str:
+        """Метод получает инфу из TRON и создаёт запись в БД.
+
+        При включённой отложенной записи строка уходит в буфер, а метод
+        ждёт её записи в БД только при wait_durable.
+        """
+        data, messages = await AccountWorker.prepare_account_data(acc_addr)
+        if data is not None:
+            stage = 'db_insert' if wb.write_buffer is None else 'buffer_write'
+            try:
+                with metrics.worker_stage_duration.time(stage=stage):
+                    if wb.write_buffer is not None:
+                        written = await wb.write_buffer.submit(data)
+                        if wait_durable:
+                            await written
+                    else:
+                        inserted = await AccountWorker.insert_data_in_bd(
+                            data, bd
+                        )
+                        if not inserted and not settings.dedup_enabled:
+                            messages.append(
+                                'Не удалось вставить данные в БД'
+                            )
+            except wb.WriteBufferFullError as exc:
+                metrics.worker_errors.inc(
+                    stage=stage, error_type=metrics.get_error_type(exc),
+                )
+                messages.append('Очередь записи в БД переполнена')
+            except (se.SQLAlchemyError, Exception) as exc:
+                metrics.worker_errors.inc(
+                    stage=stage, error_type=metrics.get_error_type(exc),
+                )
+                messages.append('Произошла ошибка вставки в БД')
+        return '; '.join(messages)
+
+    @staticmethod
+    async def create_accounts_info_bulk(
+        acc_addrs: list[str], bd, concurrency: int | None = None,
+    ) -> list[AccBulkResultSchema]:
+        """Метод пакетно получает инфу из TRON и вставляет её в БД.
+
+        Запросы в TRON выполняются параллельно, но не более concurrency
+        одновременно, а все успешно полученные строки вставляются одним
+        многострочным INSERT.
+        """
+        acc_addrs = list(dict.fromkeys(acc_addrs))
+        semaphore = asyncio.Semaphore(
+            concurrency or settings.tron_concurrency_limit
+        )
+
+        async def prepare(acc_addr: str) -> tuple:
+            async with semaphore:
+                return await AccountWorker.prepare_account_data(acc_addr)
+
+        prepared = await asyncio.gather(
+            *(prepare(acc_addr) for acc_addr in acc_addrs)
+        )
+        messages = {
+            acc_addr: acc_messages
+            for acc_addr, (_, acc_messages) in zip(acc_addrs, prepared)
+        }
+        rows = [data for data, _ in prepared if data is not None]
+        inserted_addrs = set()
+        if rows:
+            try:
+                with metrics.worker_stage_duration.time(
+                    stage='db_insert_bulk'
+                ):
+                    inserted = await AccountWorker.insert_bulk_data_in_bd(
+                        rows, bd
+                    )
+                inserted_addrs = {row[1] for row in inserted}
+            except (se.SQLAlchemyError, Exception) as exc:
+                metrics.worker_errors.inc(
+                    stage='db_insert_bulk',
+                    error_type=metrics.get_error_type(exc),
+                )
+                for row in rows:
+                    messages[row['acc_addr']].append(
+                        'Произошла ошибка вставки в БД'
+                    )
+        for row in rows:
+            acc_addr = row['acc_addr']
+            if (
+                acc_addr not in inserted_addrs and not messages[acc_addr]
+                and not settings.dedup_enabled
+            ):
+                messages[acc_addr].append('Не удалось вставить данные в БД')
+        return [
+            AccBulkResultSchema(
+                acc_addr=acc_addr,
+                inserted=acc_addr in inserted_addrs,
+                message='; '.join(messages[acc_addr]),
+            )
+            for acc_addr in acc_addrs
+        ]
+
+    @staticmethod
+    async def prepare_account_data(acc_addr: str) -> tuple:
+        """Метод проверяет адрес и собирает строку для вставки в БД.
+
+        Возвращает строку (или None, если её не удалось собрать) и список
+        сообщений об ошибках.
+        """
+        data = None
         messages = []
-        if tr.tron_client.is_address(acc_addr):
+        with metrics.worker_stage_duration.time(stage='validate_address'):
+            is_address = tr.tron_client.is_address(acc_addr)
+        if is_address:
             try:
-                (
-                    acc_energy, acc_balance, acc_bandwidth
-                ) = await AccountWorker.get_data_from_tron(acc_addr)
+                with metrics.worker_stage_duration.time(stage='tron_fetch'):
+                    (
+                        acc_energy, acc_balance, acc_bandwidth
+                    ) = await AccountWorker.get_data_from_tron(acc_addr)
                 if (acc_balance is not None) and (acc_energy is not None):
                     data = {
                         'acc_addr': acc_addr,
-                        'energy': str(acc_energy),
-                        'trx_balance': str(acc_balance),
-                        'bandwidth': str(acc_bandwidth),
+                        'energy': acc_energy,
+                        'trx_balance': acc_balance,
+                        'bandwidth': acc_bandwidth,
                         'created_at': datetime.datetime.now(),
                     }
-                    try:
-                        inserted = await AccountWorker.insert_data_in_bd(
-                            data, bd
-                        )
-                        if not inserted:
-                            messages.append('Не удалось вставить данные в БД')
-                    except (se.SQLAlchemyError, Exception):
-                        messages.append('Произошла ошибка вставки в БД')
                 else:
                     messages.append(
                         f'Клиент TRON выдал некорректные значения '
                         f'энергии:{acc_energy} и баланса:{acc_balance}'
                     )
-            except (ValueError, Exception):
+            except CircuitOpenError as exc:
+                metrics.worker_errors.inc(
+                    stage='tron_fetch', error_type=metrics.get_error_type(exc),
+                )
+                messages.append(
+                    'Узел TRON временно недоступен, запрос не выполнялся'
+                )
+            except httpx.HTTPStatusError as exc:
+                metrics.worker_errors.inc(
+                    stage='tron_fetch', error_type=metrics.get_error_type(exc),
+                )
+                messages.append(
+                    f'Узел TRON ответил ошибкой '
+                    f'{exc.response.status_code}'
+                )
+            except (ValueError, Exception) as exc:
+                metrics.worker_errors.inc(
+                    stage='tron_fetch', error_type=metrics.get_error_type(exc),
+                )
                 messages.append(
                     'Произошла ошибка при получении данных от TRON'
                 )
         else:
+            metrics.worker_errors.inc(
+                stage='validate_address', error_type='invalid_address',
+            )
             messages.append(f'Указанный адрес {acc_addr} - некорректен')
-        return '; '.join(messages)
+        return data, messages
 
     @staticmethod
     async def get_accounts_info(
         page: int, page_size: int, db,
-    ) -> list[AccInfoSchema]:
-        """Метод выбирает из БД данные об аккаунте с пагинацией."""
+        filters: AccFilterSchema | None = None,
+        sort_by: str = 'm_id', sort_desc: bool = False,
+    ) -> list[dict]:
+        """Метод выбирает из БД данные об аккаунте с пагинацией.
+
+        Строки выдаются словарями с полями AccInfoSchema без построения
+        моделей: они кодируются в JSON напрямую.
+        """
+        async with db as pg_session:
+            stmt = AccountWorker.build_accounts_page_stmt(
+                filters, sort_by, sort_desc
+            ).limit(page_size).offset((page - 1) * page_size)
+
+            curs = await pg_session.execute(stmt)
+            rows = curs.fetchall()
+        return [get_account_dict(row) for row in rows]
+
+    @staticmethod
+    async def get_accounts_info_by_cursor(
+        cursor: str, page_size: int, db,
+        filters: AccFilterSchema | None = None,
+        sort_by: str = 'm_id', sort_desc: bool = False,
+    ) -> tuple[list[dict], str | None]:
+        """Метод выбирает из БД данные об аккаунте по курсору (keyset).
+
+        Возвращает страницу и курсор следующей страницы (None, если
+        страница последняя). Курсор действителен только для той же
+        сортировки, с которой он был выдан.
+        """
+        cursor_values = decode_cursor(cursor)
+        model = acc_bd_mdl.AccLatestModel
+        stmt = AccountWorker.build_accounts_page_stmt(
+            filters, sort_by, sort_desc
+        ).add_columns(model.account_id).limit(page_size)
+        if sort_by != 'm_id':
+            stmt = stmt.add_columns(getattr(model, sort_by))
+        if cursor_values:
+            stmt = stmt.where(AccountWorker.get_keyset_condition(
+                cursor_values, sort_by, sort_desc
+            ))
+        async with db as pg_session:
+            curs = await pg_session.execute(stmt)
+            rows = curs.fetchall()
+        next_cursor = None
+        if len(rows) == page_size:
+            if sort_by == 'm_id':
+                next_cursor = encode_cursor([rows[-1][5]])
+            else:
+                sort_value = rows[-1][6]
+                if isinstance(sort_value, datetime.datetime):
+                    sort_value = sort_value.isoformat()
+                next_cursor = encode_cursor(
+                    [sort_by, sort_desc, sort_value, rows[-1][5]]
+                )
+        return [get_account_dict(row) for row in rows], next_cursor
+
+    @staticmethod
+    def build_accounts_page_stmt(
+        filters: AccFilterSchema | None, sort_by: str, sort_desc: bool,
+    ) -> sa.Select:
+        """Метод собирает выборку страницы последних снимков.
+
+        Порядок - по sort_by, при равенстве - по account_id. 'm_id' -
+        порядок по id последнего снимка адреса: обновлённый адрес
+        перемещается в конец, поэтому при обходе курсором он может
+        встретиться повторно. При сортировке по полю снимка адреса без
+        значения этого поля не выдаются.
+        """
+        model = acc_bd_mdl.AccLatestModel
+        stmt = sa.select(
+            model.acc_addr,
+            model.bandwidth,
+            model.trx_balance,
+            model.energy,
+            model.created_at,
+        )
+        if filters is not None:
+            stmt = stmt.where(
+                *AccountWorker.get_latest_filter_conditions(filters)
+            )
+        order_columns = [model.account_id]
+        if sort_by != 'm_id':
+            sort_column = getattr(model, sort_by)
+            stmt = stmt.where(sort_column.is_not(None))
+            order_columns.insert(0, sort_column)
+        if sort_desc:
+            order_columns = [column.desc() for column in order_columns]
+        return stmt.order_by(*order_columns)
+
+    @staticmethod
+    def get_keyset_condition(
+        cursor_values: list, sort_by: str, sort_desc: bool,
+    ) -> sa.ColumnElement:
+        """Метод строит условие продолжения выборки после курсора."""
+        model = acc_bd_mdl.AccLatestModel
+        if sort_by == 'm_id':
+            if len(cursor_values) != 1 or not is_int_value(
+                cursor_values[0]
+            ):
+                raise ValueError('Курсор выдан для другой сортировки')
+            key_columns = model.account_id
+            key_values = cursor_values[0]
+        else:
+            if (
+                len(cursor_values) != 4
+                or cursor_values[:2] != [sort_by, sort_desc]
+                or not is_int_value(cursor_values[3])
+            ):
+                raise ValueError('Курсор выдан для другой сортировки')
+            sort_value = cursor_values[2]
+            if sort_by == 'created_at':
+                if not isinstance(sort_value, str):
+                    raise ValueError('Курсор выдан для другой сортировки')
+                sort_value = datetime.datetime.fromisoformat(sort_value)
+                if sort_value.tzinfo is not None:
+                    raise ValueError('Курсор выдан для другой сортировки')
+            elif not is_int_value(sort_value):
+                raise ValueError('Курсор выдан для другой сортировки')
+            key_columns = sa.tuple_(getattr(model, sort_by), model.account_id)
+            key_values = sa.tuple_(sort_value, cursor_values[3])
+        if sort_desc:
+            return key_columns < key_values
+        return key_columns > key_values
+
+    @staticmethod
+    def get_latest_filter_conditions(filters: AccFilterSchema) -> list:
+        """Метод собирает условия WHERE по фильтрам последних снимков."""
+        model = acc_bd_mdl.AccLatestModel
+        conditions = []
+        if filters.addr_prefix is not None:
+            conditions.append(model.acc_addr.startswith(
+                filters.addr_prefix, autoescape=True
+            ))
+        for field in ('bandwidth', 'trx_balance', 'energy'):
+            column = getattr(model, field)
+            min_value = getattr(filters, f'min_{field}')
+            max_value = getattr(filters, f'max_{field}')
+            if min_value is not None:
+                conditions.append(column >= min_value)
+            if max_value is not None:
+                conditions.append(column <= max_value)
+        return conditions
+
+    @staticmethod
+    async def get_accounts_stats(
+        filters: AccFilterSchema, thresholds: dict[str, list[int]], db,
+    ) -> AccStatsSchema:
+        """Метод считает в БД статистику по последним снимкам адресов.
+
+        thresholds - для каждого поля значения, для которых считается
+        число аккаунтов со значением не меньше порога.
+        """
+        model = acc_bd_mdl.AccLatestModel
+        fields = ('bandwidth', 'trx_balance', 'energy')
+        columns = [sa.func.count()]
+        for field in fields:
+            column = getattr(model, field)
+            columns.extend([
+                sa.func.sum(column),
+                sa.func.avg(column),
+                sa.func.min(column),
+                sa.func.max(column),
+            ])
+            columns.extend(
+                sa.func.percentile_cont(percentile).within_group(column)
+                for percentile in STATS_PERCENTILES
+            )
+            columns.extend(
+                sa.func.count().filter(column >= threshold)
+                for threshold in thresholds.get(field, [])
+            )
+        stmt = sa.select(*columns).where(
+            *AccountWorker.get_latest_filter_conditions(filters)
+        )
         async with db as pg_session:
-            sub_stmt = sa.select(
-                sa.func.max(acc_bd_mdl.AccDataModel.id).label('m_id')
-            ).group_by(acc_bd_mdl.AccDataModel.acc_addr).limit(
-                page_size
-            ).offset(
-                (page - 1) * page_size
-            ).order_by('m_id')
-
-            stmt = sa.select(
-                acc_bd_mdl.AccDataModel.acc_addr,
-                acc_bd_mdl.AccDataModel.bandwidth,
-                acc_bd_mdl.AccDataModel.trx_balance,
-                acc_bd_mdl.AccDataModel.energy,
-                acc_bd_mdl.AccDataModel.created_at,
-            ).where(acc_bd_mdl.AccDataModel.id.in_(sub_stmt))
+            curs = await pg_session.execute(stmt)
+            row = list(curs.one())
+        stats = {'accounts_count': row.pop(0)}
+        for field in fields:
+            field_thresholds = thresholds.get(field, [])
+            stats[field] = AccFieldStatsSchema(
+                sum=row.pop(0),
+                avg=row.pop(0),
+                min=row.pop(0),
+                max=row.pop(0),
+                percentiles={
+                    f'p{percentile * 100:g}': row.pop(0)
+                    for percentile in STATS_PERCENTILES
+                },
+                above_thresholds={
+                    str(threshold): row.pop(0)
+                    for threshold in field_thresholds
+                },
+            )
+        return AccStatsSchema(**stats)
+
+    @staticmethod
+    async def get_account_history(
+        acc_addr: str,
+        date_from: datetime.datetime,
+        date_to: datetime.datetime,
+        bucket: str | None,
+        db,
+    ) -> tuple[list[AccHistoryPointSchema], bool]:
+        """Метод выбирает из БД историю снимков адреса за период.
 
+        С bucket ('minute', 'hour', 'day', 'week') история прореживается
+        на стороне БД: по каждому интервалу последнее, минимальное и
+        максимальное значение. Выдаётся не больше history_max_points
+        точек; второй элемент результата - была ли история обрезана.
+        """
+        model = acc_bd_mdl.AccDataModel
+        fields = (model.bandwidth, model.trx_balance, model.energy)
+        period_filter = sa.and_(
+            model.acc_addr == acc_addr,
+            model.created_at >= date_from,
+            model.created_at < date_to,
+        )
+        if bucket is None:
+            stmt = sa.select(model.created_at, *fields).where(
+                period_filter
+            ).order_by(model.created_at).limit(
+                settings.history_max_points + 1
+            )
+        else:
+            bucket_start = sa.func.date_trunc(bucket, model.created_at)
+            columns = [bucket_start]
+            for field in fields:
+                columns.extend([
+                    pg.array_agg(
+                        pg.aggregate_order_by(field, model.created_at.desc())
+                    )[1],
+                    sa.func.min(field),
+                    sa.func.max(field),
+                ])
+            stmt = sa.select(*columns).where(period_filter).group_by(
+                bucket_start
+            ).order_by(bucket_start).limit(settings.history_max_points + 1)
+        async with db as pg_session:
             curs = await pg_session.execute(stmt)
             rows = curs.fetchall()
+        truncated = len(rows) > settings.history_max_points
+        rows = rows[:settings.history_max_points]
+        if bucket is None:
+            return [
+                AccHistoryPointSchema(
+                    created_at=row[0], bandwidth=row[1], trx_balance=row[2],
+                    energy=row[3],
+                )
+                for row in rows
+            ], truncated
         return [
-            AccInfoSchema(
-                acc_addr=row[0], bandwidth=row[1], trx_balance=row[2],
-                energy=row[3], created_at=row[4],
+            AccHistoryPointSchema(
+                created_at=row[0],
+                bandwidth=row[1], bandwidth_min=row[2], bandwidth_max=row[3],
+                trx_balance=row[4], trx_balance_min=row[5],
+                trx_balance_max=row[6],
+                energy=row[7], energy_min=row[8], energy_max=row[9],
             )
             for row in rows
-        ]
+        ], truncated
+
+    @staticmethod
+    async def stream_accounts_info(
+        history: bool, db,
+    ) -> typing.AsyncGenerator[list, None]:
+        """Метод выдаёт пачками все снимки аккаунтов через серверный курсор.
+
+        Без history - только последний снимок каждого адреса.
+        """
+        model = (
+            acc_bd_mdl.AccDataModel if history else acc_bd_mdl.AccLatestModel
+        )
+        order_column = (
+            acc_bd_mdl.AccDataModel.id
+            if history else acc_bd_mdl.AccLatestModel.account_id
+        )
+        stmt = sa.select(
+            model.acc_addr,
+            model.bandwidth,
+            model.trx_balance,
+            model.energy,
+            model.created_at,
+        ).order_by(order_column).execution_options(
+            yield_per=settings.export_batch_size
+        )
+        async with db as pg_session:
+            result = await pg_session.stream(stmt)
+            async for rows in result.partitions():
+                yield rows
 
     @staticmethod
     async def insert_data_in_bd(data: dict, bd) -> list:
-        """Метод вставки в БД."""
+        """Метод вставки в БД.
+
+        В режиме дедупликации строка не вставляется (результат пуст),
+        если последний снимок адреса не изменился или свежее окна.
+        """
         ids = []
         async with bd as pg_session:
-            ins_cursor = await pg_session.execute(
-                sa.insert(acc_bd_mdl.AccDataModel).returning(
-                    acc_bd_mdl.AccDataModel.id
-                ),
-                data
-            )
+            if settings.dedup_enabled:
+                ins_cursor = await pg_session.execute(
+                    AccountWorker.build_dedup_insert_stmt([data])
+                )
+            else:
+                ins_cursor = await pg_session.execute(
+                    sa.insert(acc_bd_mdl.AccDataModel).returning(
+                        acc_bd_mdl.AccDataModel.id
+                    ),
+                    data
+                )
+            await pg_session.commit()
+            ids = ins_cursor.fetchall()
+        rc.accounts_page_cache.bump_version()
+        return ids
+
+    @staticmethod
+    async def insert_bulk_data_in_bd(data: list[dict], bd) -> list:
+        """Метод вставки в БД нескольких строк одним запросом."""
+        ids = []
+        async with bd as pg_session:
+            if settings.dedup_enabled:
+                stmt = AccountWorker.build_dedup_insert_stmt(data)
+            else:
+                stmt = sa.insert(acc_bd_mdl.AccDataModel).values(
+                    data
+                ).returning(
+                    acc_bd_mdl.AccDataModel.id,
+                    acc_bd_mdl.AccDataModel.acc_addr,
+                )
+            ins_cursor = await pg_session.execute(stmt)
             await pg_session.commit()
             ids = ins_cursor.fetchall()
+        rc.accounts_page_cache.bump_version()
         return ids
 
+    @staticmethod
+    def drop_batch_duplicates(data: list[dict]) -> list[dict]:
+        """Метод убирает из пачки повторные снимки одного адреса.
+
+        Снимок адреса отбрасывается, если предыдущий оставленный снимок
+        этого адреса в пачке совпадает с ним или снят менее dedup_window
+        секунд назад. Порядок оставшихся строк сохраняется.
+        """
+        window = datetime.timedelta(seconds=settings.dedup_window)
+        last_kept = {}
+        kept = []
+        for row in sorted(data, key=lambda row: row['created_at']):
+            previous = last_kept.get(row['acc_addr'])
+            if previous is not None and (
+                all(
+                    previous[field] == row[field]
+                    for field in ('bandwidth', 'trx_balance', 'energy')
+                )
+                or row['created_at'] - previous['created_at'] < window
+            ):
+                continue
+            last_kept[row['acc_addr']] = row
+            kept.append(row)
+        kept_ids = {id(row) for row in kept}
+        return [row for row in data if id(row) in kept_ids]
+
+    @staticmethod
+    def build_dedup_insert_stmt(data: list[dict]) -> sa.Insert:
+        """Метод собирает условную вставку без повторов одним запросом.
+
+        Строка пропускается, если последний снимок адреса совпадает с ней
+        или записан менее dedup_window секунд назад. Повторы внутри самой
+        пачки отбрасываются заранее по тому же правилу.
+        """
+        data = AccountWorker.drop_batch_duplicates(data)
+        model = acc_bd_mdl.AccDataModel
+        latest = acc_bd_mdl.AccLatestModel
+        new_rows = sa.values(
+            *(
+                sa.column(field, getattr(model, field).type)
+                for field in DATA_FIELDS
+            ),
+            name='new_rows',
+        ).data([tuple(row[field] for field in DATA_FIELDS) for row in data])
+        duplicate = sa.select(latest.acc_addr).where(
+            latest.acc_addr == new_rows.c.acc_addr,
+            sa.or_(
+                sa.and_(*(
+                    getattr(latest, field).is_not_distinct_from(
+                        new_rows.c[field]
+                    )
+                    for field in ('bandwidth', 'trx_balance', 'energy')
+                )),
+                latest.created_at > new_rows.c.created_at - datetime.timedelta(
+                    seconds=settings.dedup_window
+                ),
+            ),
+        ).exists()
+        return sa.insert(model).from_select(
+            DATA_FIELDS, sa.select(new_rows).where(~duplicate)
+        ).returning(model.id, model.acc_addr)
+
     @staticmethod
     async def get_data_from_tron(acc_addr: str) -> tuple:
+        """Метод получения данных из TRON через кеш."""
+        return await tr.tron_data_cache.get_or_fetch(
+            acc_addr, lambda: AccountWorker.fetch_data_from_tron(acc_addr)
+        )
+
+    @staticmethod
+    async def fetch_data_from_tron(acc_addr: str) -> tuple:
         """Метод получения данных из TRON."""
         acc_data_task = asyncio.create_task(
-            tr.tron_client.get_account(acc_addr)
+            tr.tron_guard.call(
+                lambda: tr.tron_client.get_account(acc_addr),
+                method='get_account',
+            )
         )
         acc_bandwidth_task = asyncio.create_task(
-            tr.tron_client.get_bandwidth(acc_addr)
+            tr.tron_guard.call(
+                lambda: tr.tron_client.get_bandwidth(acc_addr),
+                method='get_bandwidth',
+            )
         )
         account_data, acc_bandwidth = await asyncio.gather(
             acc_data_task, acc_bandwidth_task
@@ -0,0 +1,431 @@
+"""Модуль содержит исполнителя фоновых заданий снятия снимков аккаунтов."""
+import asyncio
+import contextlib
+import datetime
+import logging
+
+from app.classes.acc_worker import AccountWorker
+from app.classes.shard_coordinator import get_instance_id
+from app.config import AppSettings
+from app.database import db_session
+import app.models.job_model as job_bd_mdl
+from app.schemas.acc_schema import AccBulkResultSchema
+from app.schemas.job_schema import (
+    JobCreatedSchema,
+    JobFailureSchema,
+    JobStatusSchema,
+)
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotJobWorker:
+    """Исполнитель заданий на пакетное снятие снимков аккаунтов.
+
+    Состояние заданий и их адресов хранится в БД, поэтому незавершённые
+    задания подхватываются после перезапуска. Адреса забираются пачками
+    в аренду на job_stale_timeout через SKIP LOCKED, так что несколько
+    экземпляров сервиса делят одно задание без пересечений. Пока пачка
+    обрабатывается, аренда продлевается; пачку, аренда которой истекла
+    (экземпляр упал или завис), забирает другой экземпляр, а результаты
+    прежнего владельца уже не записываются.
+    """
+
+    def __init__(self, app_settings: AppSettings, db_factory=db_session):
+        self.poll_interval = app_settings.job_poll_interval
+        self.batch_size = app_settings.job_batch_size
+        self.concurrency = app_settings.job_concurrency
+        self.stale_timeout = app_settings.job_stale_timeout
+        self.instance_id = get_instance_id(app_settings)
+        self.db_factory = db_factory
+        self._stop_event = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Запускает фоновую задачу исполнителя."""
+        self._stop_event.clear()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Останавливает исполнителя, дожидаясь текущей пачки."""
+        self._stop_event.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def run(self) -> None:
+        """Цикл разбора заданий до остановки исполнителя."""
+        while not self._stop_event.is_set():
+            try:
+                job_id = await SnapshotJobWorker.claim_job(self.db_factory())
+                if job_id is not None:
+                    await self.process_job(job_id)
+                    continue
+            except Exception:
+                logger.exception('Ошибка обработки задания')
+            await self.wait_or_stop(self.poll_interval)
+
+    async def wait_or_stop(self, delay: float) -> None:
+        """Ждёт delay секунд или сигнала остановки."""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+
+    async def process_job(self, job_id: int) -> None:
+        """Обрабатывает адреса задания пачками до конца или остановки."""
+        try:
+            while not self._stop_event.is_set():
+                items = await SnapshotJobWorker.claim_items(
+                    job_id, self.batch_size, self.instance_id,
+                    self.stale_timeout, self.db_factory(),
+                )
+                if not items:
+                    if await SnapshotJobWorker.finish_job(
+                        job_id, self.db_factory()
+                    ):
+                        logger.info('Задание %s выполнено', job_id)
+                    return
+                results = await self.process_items(items)
+                await SnapshotJobWorker.save_results(
+                    job_id, items, results, self.instance_id,
+                    self.db_factory(),
+                )
+        except Exception:
+            # Не дожидаясь истечения аренды, отдаём пачку другим.
+            await SnapshotJobWorker.release_items(
+                self.instance_id, self.db_factory()
+            )
+            raise
+
+    async def process_items(self, items: list) -> list[AccBulkResultSchema]:
+        """Снимает пачку адресов, продлевая их аренду до конца обработки."""
+        renew_task = asyncio.create_task(
+            self.renew_lease([item_id for item_id, _ in items])
+        )
+        try:
+            return await AccountWorker.create_accounts_info_bulk(
+                [acc_addr for _, acc_addr in items], self.db_factory(),
+                concurrency=self.concurrency,
+            )
+        finally:
+            renew_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await renew_task
+
+    async def renew_lease(self, item_ids: list[int]) -> None:
+        """Продлевает аренду адресов каждую треть её срока до отмены."""
+        while True:
+            await asyncio.sleep(self.stale_timeout / 3)
+            try:
+                renewed = await SnapshotJobWorker.renew_items(
+                    item_ids, self.instance_id, self.stale_timeout,
+                    self.db_factory(),
+                )
+            except Exception:
+                logger.exception('Ошибка продления аренды адресов')
+                continue
+            if renewed < len(item_ids):
+                logger.warning(
+                    'Аренда %s из %s адресов потеряна',
+                    len(item_ids) - renewed, len(item_ids),
+                )
+
+    @staticmethod
+    async def create_job(acc_addrs: list[str], db) -> JobCreatedSchema:
+        """Создаёт задание и его адреса (без повторов) в БД."""
+        job = job_bd_mdl.SnapshotJobModel
+        item = job_bd_mdl.SnapshotJobItemModel
+        acc_addrs = list(dict.fromkeys(acc_addrs))
+        now = datetime.datetime.now()
+        async with db as pg_session:
+            curs = await pg_session.execute(
+                sa.insert(job).values(
+                    status=job_bd_mdl.JOB_PENDING, total=len(acc_addrs),
+                    processed=0, inserted=0, failed=0,
+                    created_at=now, updated_at=now,
+                ).returning(job.id)
+            )
+            job_id = curs.scalar_one()
+            # Все адреса передаются одним параметром-массивом.
+            await pg_session.execute(
+                sa.insert(item).from_select(
+                    ['job_id', 'acc_addr', 'status'],
+                    sa.select(
+                        sa.literal(job_id),
+                        sa.func.unnest(sa.bindparam(
+                            'acc_addrs', acc_addrs,
+                            type_=pg.ARRAY(sa.String),
+                        )),
+                        sa.literal(job_bd_mdl.ITEM_PENDING),
+                    ),
+                )
+            )
+            await pg_session.commit()
+        return JobCreatedSchema(
+            job_id=job_id, status=job_bd_mdl.JOB_PENDING,
+            total=len(acc_addrs),
+        )
+
+    @staticmethod
+    async def claim_job(db) -> int | None:
+        """Выбирает самое старое задание, в котором есть свободные адреса.
+
+        Свободны ожидающие адреса и адреса с истёкшей арендой. Одно
+        задание могут выбрать несколько исполнителей: адреса между ними
+        делит claim_items.
+        """
+        job = job_bd_mdl.SnapshotJobModel
+        item = job_bd_mdl.SnapshotJobItemModel
+        now = datetime.datetime.now()
+        async with db as pg_session:
+            curs = await pg_session.execute(
+                sa.select(job.id).where(
+                    job.status.in_(
+                        (job_bd_mdl.JOB_PENDING, job_bd_mdl.JOB_RUNNING)
+                    ),
+                    sa.exists().where(
+                        item.job_id == job.id,
+                        SnapshotJobWorker.get_claimable_clause(),
+                    ),
+                ).order_by(job.id).limit(1)
+            )
+            job_id = curs.scalar_one_or_none()
+            if job_id is not None:
+                await pg_session.execute(
+                    sa.update(job).where(job.id == job_id).values(
+                        status=job_bd_mdl.JOB_RUNNING,
+                        started_at=sa.func.coalesce(job.started_at, now),
+                        updated_at=now,
+                    )
+                )
+            await pg_session.commit()
+        return job_id
+
+    @staticmethod
+    def get_claimable_clause() -> sa.ColumnElement:
+        """Условие на свободный адрес задания."""
+        item = job_bd_mdl.SnapshotJobItemModel
+        return sa.or_(
+            item.status == job_bd_mdl.ITEM_PENDING,
+            sa.and_(
+                item.status == job_bd_mdl.ITEM_CLAIMED,
+                item.claimed_until < sa.func.now(),
+            ),
+        )
+
+    @staticmethod
+    async def claim_items(
+        job_id: int, limit: int, instance_id: str, lease_seconds: float, db,
+    ) -> list:
+        """Забирает в аренду пачку свободных адресов задания.
+
+        Строки выбираются с SKIP LOCKED, поэтому параллельные исполнители
+        получают непересекающиеся пачки.
+        """
+        item = job_bd_mdl.SnapshotJobItemModel
+        claimable = sa.select(item.id).where(
+            item.job_id == job_id, SnapshotJobWorker.get_claimable_clause(),
+        ).order_by(item.id).limit(limit).with_for_update(skip_locked=True)
+        async with db as pg_session:
+            curs = await pg_session.execute(
+                sa.update(item).where(
+                    item.id.in_(claimable.scalar_subquery())
+                ).values(
+                    status=job_bd_mdl.ITEM_CLAIMED, claimed_by=instance_id,
+                    claimed_until=sa.func.now() + datetime.timedelta(
+                        seconds=lease_seconds
+                    ),
+                ).returning(item.id, item.acc_addr)
+            )
+            items = sorted(tuple(row) for row in curs.fetchall())
+            await pg_session.commit()
+        return items
+
+    @staticmethod
+    async def renew_items(
+        item_ids: list[int], instance_id: str, lease_seconds: float, db,
+    ) -> int:
+        """Продлевает аренду адресов, всё ещё принадлежащих экземпляру."""
+        item = job_bd_mdl.SnapshotJobItemModel
+        async with db as pg_session:
+            curs = await pg_session.execute(
+                sa.update(item).where(
+                    item.id.in_(item_ids),
+                    SnapshotJobWorker.get_owned_clause(instance_id),
+                ).values(
+                    claimed_until=sa.func.now() + datetime.timedelta(
+                        seconds=lease_seconds
+                    ),
+                )
+            )
+            await pg_session.commit()
+        return curs.rowcount
+
+    @staticmethod
+    def get_owned_clause(instance_id: str) -> sa.ColumnElement:
+        """Условие на адрес, арендованный экземпляром."""
+        item = job_bd_mdl.SnapshotJobItemModel
+        return sa.and_(
+            item.claimed_by == instance_id,
+            item.status == job_bd_mdl.ITEM_CLAIMED,
+        )
+
+    @staticmethod
+    async def save_results(
+        job_id: int, items: list, results: list[AccBulkResultSchema],
+        instance_id: str, db,
+    ) -> None:
+        """Сохраняет результаты пачки и продвигает счётчики задания.
+
+        Записываются только адреса, аренда которых осталась за
+        экземпляром: если её успел забрать другой, результат отбрасывается,
+        и счётчики задания учитывают адрес один раз.
+        """
+        job = job_bd_mdl.SnapshotJobModel
+        item = job_bd_mdl.SnapshotJobItemModel
+        results_by_addr = {result.acc_addr: result for result in results}
+        addrs_by_id = dict(items)
+        done_ids = []
+        failed_items = []
+        for item_id, acc_addr in items:
+            result = results_by_addr.get(acc_addr)
+            if result is not None and not result.message:
+                done_ids.append(item_id)
+            else:
+                failed_items.append((
+                    item_id,
+                    result.message if result is not None
+                    else 'Адрес не обработан',
+                ))
+        saved_done_ids = []
+        failed_count = 0
+        async with db as pg_session:
+            if done_ids:
+                curs = await pg_session.execute(
+                    sa.update(item).where(
+                        item.id.in_(done_ids),
+                        SnapshotJobWorker.get_owned_clause(instance_id),
+                    ).values(
+                        status=job_bd_mdl.ITEM_DONE, claimed_until=None,
+                    ).returning(item.id)
+                )
+                saved_done_ids = curs.scalars().all()
+            if failed_items:
+                failed_rows = sa.values(
+                    sa.column('id', item.id.type),
+                    sa.column('message', item.message.type),
+                    name='failed_rows',
+                ).data(failed_items)
+                curs = await pg_session.execute(
+                    sa.update(item).where(
+                        item.id == failed_rows.c.id,
+                        SnapshotJobWorker.get_owned_clause(instance_id),
+                    ).values(
+                        status=job_bd_mdl.ITEM_FAILED,
+                        message=failed_rows.c.message, claimed_until=None,
+                    )
+                )
+                failed_count = curs.rowcount
+            processed = len(saved_done_ids) + failed_count
+            if processed < len(items):
+                logger.warning(
+                    'Задание %s: аренда %s адресов потеряна, результаты '
+                    'отброшены', job_id, len(items) - processed,
+                )
+            await pg_session.execute(
+                sa.update(job).where(job.id == job_id).values(
+                    processed=job.processed + processed,
+                    inserted=job.inserted + sum(
+                        results_by_addr[addrs_by_id[item_id]].inserted
+                        for item_id in saved_done_ids
+                    ),
+                    failed=job.failed + failed_count,
+                    updated_at=datetime.datetime.now(),
+                )
+            )
+            await pg_session.commit()
+
+    @staticmethod
+    async def finish_job(job_id: int, db) -> bool:
+        """Отмечает задание выполненным, если все его адреса обработаны.
+
+        Возвращает False, пока другой исполнитель держит пачку адресов.
+        """
+        job = job_bd_mdl.SnapshotJobModel
+        item = job_bd_mdl.SnapshotJobItemModel
+        now = datetime.datetime.now()
+        async with db as pg_session:
+            curs = await pg_session.execute(
+                sa.update(job).where(
+                    job.id == job_id, job.status != job_bd_mdl.JOB_DONE,
+                    ~sa.exists().where(
+                        item.job_id == job_id,
+                        item.status.in_(
+                            (job_bd_mdl.ITEM_PENDING, job_bd_mdl.ITEM_CLAIMED)
+                        ),
+                    ),
+                ).values(
+                    status=job_bd_mdl.JOB_DONE, finished_at=now,
+                    updated_at=now,
+                )
+            )
+            await pg_session.commit()
+        return bool(curs.rowcount)
+
+    @staticmethod
+    async def release_items(instance_id: str, db) -> None:
+        """Возвращает арендованные экземпляром адреса в очередь."""
+        item = job_bd_mdl.SnapshotJobItemModel
+        async with db as pg_session:
+            await pg_session.execute(
+                sa.update(item).where(
+                    SnapshotJobWorker.get_owned_clause(instance_id),
+                ).values(
+                    status=job_bd_mdl.ITEM_PENDING, claimed_by=None,
+                    claimed_until=None,
+                )
+            )
+            await pg_session.commit()
+
+    @staticmethod
+    async def get_job_status(
+        job_id: int, failures_limit: int, db,
+    ) -> JobStatusSchema | None:
+        """Выдаёт состояние задания или None, если его нет."""
+        job = job_bd_mdl.SnapshotJobModel
+        item = job_bd_mdl.SnapshotJobItemModel
+        async with db as pg_session:
+            curs = await pg_session.execute(
+                sa.select(job).where(job.id == job_id)
+            )
+            job_row = curs.scalar_one_or_none()
+            if job_row is None:
+                return None
+            curs = await pg_session.execute(
+                sa.select(item.acc_addr, item.message).where(
+                    item.job_id == job_id,
+                    item.status == job_bd_mdl.ITEM_FAILED,
+                ).order_by(item.id).limit(failures_limit)
+            )
+            failures = [
+                JobFailureSchema(acc_addr=acc_addr, message=message)
+                for acc_addr, message in curs.fetchall()
+            ]
+        throughput = None
+        if job_row.started_at is not None:
+            elapsed = (
+                (job_row.finished_at or datetime.datetime.now())
+                - job_row.started_at
+            ).total_seconds()
+            if elapsed > 0:
+                throughput = job_row.processed / elapsed
+        return JobStatusSchema(
+            job_id=job_row.id, status=job_row.status, total=job_row.total,
+            processed=job_row.processed, inserted=job_row.inserted,
+            failed=job_row.failed, created_at=job_row.created_at,
+            started_at=job_row.started_at, finished_at=job_row.finished_at,
+            throughput=throughput, failures=failures,
+        )
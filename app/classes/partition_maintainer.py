@@ -0,0 +1,238 @@
+"""Модуль содержит обслуживание помесячных партиций таблицы снимков."""
+import asyncio
+import datetime
+import logging
+import re
+
+from app.config import AppSettings
+from app.database import db_session
+import sqlalchemy as sa
+
+logger = logging.getLogger(__name__)
+
+# Ключ advisory-блокировки, чтобы обслуживание выполнял один экземпляр.
+MAINTENANCE_LOCK_KEY = 7_301_001
+DOWNSAMPLED_COMMENT = 'downsampled'
+DEFAULT_PARTITION_BOUND = 'DEFAULT'
+PARTITION_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def add_months(month_start: datetime.date, months: int) -> datetime.date:
+    """Первое число месяца, отстоящего на months от month_start."""
+    month_index = month_start.year * 12 + month_start.month - 1 + months
+    return datetime.date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def parse_partition_bound(bound: str) -> tuple:
+    """Разбирает границы партиции из pg_get_expr(relpartbound)."""
+    match = PARTITION_BOUND_RE.search(bound)
+    if match is None:
+        return None, None
+    values = []
+    for value in match.groups():
+        if value in ('MINVALUE', 'MAXVALUE'):
+            values.append(None)
+        else:
+            values.append(
+                datetime.datetime.fromisoformat(value.strip("'")).date()
+            )
+    return tuple(values)
+
+
+def quote_ident(name: str) -> str:
+    """Экранирует имя таблицы для DDL."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+class AccountPartitionMaintainer:
+    """Создаёт будущие партиции accounts и применяет политику хранения."""
+
+    def __init__(self, app_settings: AppSettings, db_factory=db_session):
+        self.interval = app_settings.partition_maintenance_interval
+        self.premake_months = app_settings.partition_premake_months
+        self.retention_months = app_settings.partition_retention_months
+        self.retention_mode = app_settings.partition_retention_mode
+        self.db_factory = db_factory
+        self._stop_event = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Запускает фоновую задачу обслуживания."""
+        self._stop_event.clear()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Останавливает обслуживание."""
+        self._stop_event.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def run(self) -> None:
+        """Цикл обслуживания до остановки."""
+        while not self._stop_event.is_set():
+            try:
+                result = await self.maintain(self.db_factory())
+                logger.info('Обслуживание партиций accounts: %s', result)
+            except Exception:
+                logger.exception('Ошибка обслуживания партиций accounts')
+            try:
+                await asyncio.wait_for(
+                    self._stop_event.wait(), self.interval
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    def plan(self, partitions: list, today: datetime.date) -> dict:
+        """Решает, какие партиции создать, удалить или проредить.
+
+        partitions - список (имя, нижняя граница, верхняя граница,
+        комментарий), границы None означают MINVALUE/MAXVALUE.
+        """
+        to_create = []
+        month_start = today.replace(day=1)
+        for _ in range(self.premake_months + 1):
+            month_end = add_months(month_start, 1)
+            covered = any(
+                (lower is None or lower <= month_start)
+                and (upper is None or upper > month_start)
+                for _, lower, upper, _ in partitions
+            )
+            if not covered:
+                to_create.append(
+                    (f'accounts_p{month_start:%Y%m}', month_start, month_end)
+                )
+            month_start = month_end
+        to_drop = []
+        to_downsample = []
+        if self.retention_months > 0:
+            cutoff = add_months(
+                today.replace(day=1), -self.retention_months
+            )
+            for name, _, upper, comment in partitions:
+                if upper is None or upper > cutoff:
+                    continue
+                if self.retention_mode == 'drop':
+                    to_drop.append(name)
+                elif comment != DOWNSAMPLED_COMMENT:
+                    to_downsample.append(name)
+        return {
+            'created': to_create,
+            'dropped': to_drop,
+            'downsampled': to_downsample,
+        }
+
+    async def maintain(self, db) -> dict:
+        """Один проход обслуживания под advisory-блокировкой."""
+        async with db as pg_session:
+            locked = (await pg_session.execute(
+                sa.text('SELECT pg_try_advisory_xact_lock(:key)'),
+                {'key': MAINTENANCE_LOCK_KEY},
+            )).scalar()
+            if not locked:
+                return {}
+            curs = await pg_session.execute(sa.text(
+                """
+                SELECT c.relname, pg_get_expr(c.relpartbound, c.oid),
+                    obj_description(c.oid, 'pg_class')
+                FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'accounts'::regclass
+                """
+            ))
+            partitions = []
+            default_partition = None
+            for name, bound, comment in curs.fetchall():
+                if bound == DEFAULT_PARTITION_BOUND:
+                    default_partition = name
+                else:
+                    partitions.append(
+                        (name, *parse_partition_bound(bound), comment)
+                    )
+            plan = self.plan(partitions, datetime.date.today())
+            for name, month_start, month_end in plan['created']:
+                await AccountPartitionMaintainer.create_partition(
+                    pg_session, name, month_start, month_end,
+                    default_partition,
+                )
+            for name in plan['dropped']:
+                await pg_session.execute(sa.text(
+                    f'ALTER TABLE accounts DETACH PARTITION '
+                    f'{quote_ident(name)}'
+                ))
+                await pg_session.execute(
+                    sa.text(f'DROP TABLE {quote_ident(name)}')
+                )
+            for name in plan['downsampled']:
+                # Оставляем последний снимок адреса за каждые сутки.
+                await pg_session.execute(sa.text(
+                    f"""
+                    DELETE FROM {quote_ident(name)} AS a
+                    USING (
+                        SELECT id, row_number() OVER (
+                            PARTITION BY acc_addr,
+                                date_trunc('day', created_at)
+                            ORDER BY id DESC
+                        ) AS rn
+                        FROM {quote_ident(name)}
+                    ) AS d
+                    WHERE a.id = d.id AND d.rn > 1
+                    """
+                ))
+                await pg_session.execute(sa.text(
+                    f"COMMENT ON TABLE {quote_ident(name)} "
+                    f"IS '{DOWNSAMPLED_COMMENT}'"
+                ))
+            await pg_session.commit()
+        return plan
+
+    @staticmethod
+    async def create_partition(
+        pg_session, name: str, month_start: datetime.date,
+        month_end: datetime.date, default_partition: str | None,
+    ) -> None:
+        """Создаёт помесячную партицию.
+
+        Если есть DEFAULT-партиция, строки месяца, попавшие в неё, пока
+        партиции не было, сначала переносятся в новую таблицу: иначе
+        присоединение отклоняется из-за пересечения с DEFAULT. На время
+        переноса DEFAULT блокируется от записи до конца транзакции, чтобы
+        новая строка месяца не попала в неё между переносом и ATTACH.
+        """
+        bound = (
+            f"FROM ('{month_start.isoformat()}') "
+            f"TO ('{month_end.isoformat()}')"
+        )
+        if default_partition is None:
+            await pg_session.execute(sa.text(
+                f'CREATE TABLE {quote_ident(name)} PARTITION OF accounts '
+                f'FOR VALUES {bound}'
+            ))
+            return
+        await pg_session.execute(sa.text(
+            f'LOCK TABLE {quote_ident(default_partition)} '
+            f'IN SHARE ROW EXCLUSIVE MODE'
+        ))
+        await pg_session.execute(sa.text(
+            f'CREATE TABLE {quote_ident(name)} '
+            f'(LIKE accounts INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        ))
+        curs = await pg_session.execute(sa.text(
+            f"""
+            WITH moved AS (
+                DELETE FROM {quote_ident(default_partition)}
+                WHERE created_at >= '{month_start.isoformat()}'
+                    AND created_at < '{month_end.isoformat()}'
+                RETURNING *
+            )
+            INSERT INTO {quote_ident(name)} SELECT * FROM moved
+            """
+        ))
+        if curs.rowcount:
+            logger.warning(
+                'Из %s в %s перенесено строк: %s',
+                default_partition, name, curs.rowcount,
+            )
+        await pg_session.execute(sa.text(
+            f'ALTER TABLE accounts ATTACH PARTITION {quote_ident(name)} '
+            f'FOR VALUES {bound}'
+        ))
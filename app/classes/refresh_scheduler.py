@@ -0,0 +1,129 @@
+"""Модуль содержит планировщик фонового обновления снимков аккаунтов."""
+import asyncio
+import logging
+import random
+
+from app.classes.acc_worker import AccountWorker
+from app.config import AppSettings
+from app.database import db_session
+import app.models.acc_model as acc_bd_mdl
+import app.models.work_model as work_bd_mdl
+import sqlalchemy as sa
+
+logger = logging.getLogger(__name__)
+
+
+class AccountRefreshScheduler:
+    """Планировщик, периодически переснимающий все известные аккаунты.
+
+    С координатором каждый экземпляр сервиса обновляет только адреса из
+    шардов, которые он сейчас арендует.
+    """
+
+    def __init__(
+        self, app_settings: AppSettings, db_factory=db_session,
+        coordinator=None,
+    ):
+        self.interval = app_settings.refresh_interval
+        self.jitter = app_settings.refresh_jitter
+        self.concurrency = app_settings.refresh_concurrency
+        self.batch_size = app_settings.refresh_batch_size
+        self.rate_limit = app_settings.refresh_rate_limit
+        self.db_factory = db_factory
+        self.coordinator = coordinator
+        self._stop_event = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Запускает фоновую задачу планировщика."""
+        self._stop_event.clear()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Останавливает планировщик, дожидаясь текущей пачки."""
+        self._stop_event.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def run(self) -> None:
+        """Цикл обновления до остановки планировщика."""
+        while not self._stop_event.is_set():
+            try:
+                refreshed = await self.refresh_cycle()
+                logger.info('Обновлено снимков аккаунтов: %s', refreshed)
+            except Exception:
+                logger.exception('Ошибка цикла обновления аккаунтов')
+            await self.wait_or_stop(
+                self.interval + random.uniform(0, self.jitter)
+            )
+
+    async def wait_or_stop(self, delay: float) -> None:
+        """Ждёт delay секунд или сигнала остановки."""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+
+    async def refresh_cycle(self) -> int:
+        """Один проход по всем адресам пачками, возвращает число вставок."""
+        if self.coordinator is None:
+            return await self.refresh_shard(None)
+        refreshed = 0
+        for shard in sorted(self.coordinator.shards):
+            refreshed += await self.refresh_shard(shard)
+        return refreshed
+
+    async def refresh_shard(self, shard: int | None) -> int:
+        """Проход по адресам шарда (None - по всем адресам) пачками."""
+        refreshed = 0
+        last_addr = None
+        loop = asyncio.get_running_loop()
+        while not self._stop_event.is_set():
+            # Шард, отданный при перебалансировке, больше не обновляется.
+            if shard is not None and shard not in self.coordinator.shards:
+                break
+            acc_addrs = (
+                await AccountRefreshScheduler.get_tracked_addresses(
+                    last_addr, self.batch_size, self.db_factory(),
+                    shard=shard,
+                )
+            )
+            if not acc_addrs:
+                break
+            started = loop.time()
+            results = await AccountWorker.create_accounts_info_bulk(
+                acc_addrs, self.db_factory(), concurrency=self.concurrency,
+            )
+            refreshed += sum(result.inserted for result in results)
+            last_addr = acc_addrs[-1]
+            if self.rate_limit > 0:
+                await self.wait_or_stop(
+                    len(acc_addrs) / self.rate_limit
+                    - (loop.time() - started)
+                )
+        return refreshed
+
+    @staticmethod
+    async def get_tracked_addresses(
+        after_addr: str | None, limit: int, db, shard: int | None = None,
+    ) -> list[str]:
+        """Выбирает пачку известных адресов после after_addr.
+
+        Если задан shard, выбираются только адреса этого шарда (по индексу
+        ix_accounts_latest_shard_acc_addr).
+        """
+        async with db as pg_session:
+            stmt = sa.select(acc_bd_mdl.AccLatestModel.acc_addr).order_by(
+                acc_bd_mdl.AccLatestModel.acc_addr
+            ).limit(limit)
+            if after_addr is not None:
+                stmt = stmt.where(
+                    acc_bd_mdl.AccLatestModel.acc_addr > after_addr
+                )
+            if shard is not None:
+                stmt = stmt.where(work_bd_mdl.get_shard_expr(
+                    acc_bd_mdl.AccLatestModel.acc_addr
+                ) == sa.literal_column(str(int(shard))))
+            curs = await pg_session.execute(stmt)
+            return list(curs.scalars().all())
@@ -0,0 +1,165 @@
+"""Модуль содержит координатора шардов адресов между экземплярами."""
+import asyncio
+import datetime
+import logging
+import math
+import os
+import socket
+
+from app.config import AppSettings
+from app.database import db_session
+import app.models.work_model as work_bd_mdl
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+logger = logging.getLogger(__name__)
+
+
+def get_instance_id(app_settings: AppSettings) -> str:
+    """Идентификатор экземпляра сервиса: из настроек или хост и pid."""
+    return app_settings.instance_id or f'{socket.gethostname()}-{os.getpid()}'
+
+
+class ShardCoordinator:
+    """Распределяет шарды адресов между живыми экземплярами сервиса.
+
+    Каждый экземпляр пульсирует в work_instances и держит аренду своих
+    шардов в work_shards. При каждом продлении он пересчитывает долю
+    ceil(шардов / живых экземпляров): лишние шарды отпускает (пришёл
+    новый экземпляр), недостающие забирает из свободных и просроченных
+    (экземпляр ушёл или завис) через SKIP LOCKED. Время берётся из БД,
+    так что расхождение часов экземпляров не влияет на аренду.
+    """
+
+    def __init__(self, app_settings: AppSettings, db_factory=db_session):
+        self.instance_id = get_instance_id(app_settings)
+        self.lease_ttl = app_settings.shard_lease_ttl
+        self.renew_interval = app_settings.shard_renew_interval
+        self.db_factory = db_factory
+        self.shards: frozenset[int] = frozenset()
+        self._stop_event = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Запускает фоновое продление аренды."""
+        self._stop_event.clear()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Останавливается и отпускает шарды для других экземпляров."""
+        self._stop_event.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        self.shards = frozenset()
+        try:
+            await ShardCoordinator.leave(self.instance_id, self.db_factory())
+        except Exception:
+            logger.exception('Не удалось отпустить шарды')
+
+    async def run(self) -> None:
+        """Цикл продления аренды до остановки."""
+        while not self._stop_event.is_set():
+            await self.renew()
+            try:
+                await asyncio.wait_for(
+                    self._stop_event.wait(), self.renew_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def renew(self) -> None:
+        """Продлевает аренду и обновляет набор своих шардов."""
+        try:
+            shards = await ShardCoordinator.rebalance(
+                self.instance_id, self.lease_ttl, self.db_factory()
+            )
+        except Exception:
+            # Без продления аренда истечёт, и шарды заберут другие.
+            self.shards = frozenset()
+            logger.exception('Ошибка продления аренды шардов')
+            return
+        if shards != self.shards:
+            logger.info(
+                'Экземпляр %s владеет шардами: %s',
+                self.instance_id, sorted(shards),
+            )
+        self.shards = shards
+
+    @staticmethod
+    async def rebalance(
+        instance_id: str, lease_ttl: float, db,
+    ) -> frozenset[int]:
+        """Продлевает аренду и выравнивает долю шардов экземпляра."""
+        shard = work_bd_mdl.WorkShardModel
+        instance = work_bd_mdl.WorkInstanceModel
+        now = sa.func.now()
+        lease_until = now + datetime.timedelta(seconds=lease_ttl)
+        async with db as pg_session:
+            await pg_session.execute(
+                pg.insert(instance).values(
+                    instance_id=instance_id, heartbeat_at=now,
+                ).on_conflict_do_update(
+                    index_elements=[instance.instance_id],
+                    set_={'heartbeat_at': now},
+                )
+            )
+            await pg_session.execute(
+                sa.delete(instance).where(
+                    instance.heartbeat_at
+                    < now - datetime.timedelta(seconds=lease_ttl)
+                )
+            )
+            curs = await pg_session.execute(
+                sa.select(sa.func.count()).select_from(instance)
+            )
+            fair_share = math.ceil(
+                work_bd_mdl.WORK_SHARD_COUNT / max(curs.scalar_one(), 1)
+            )
+            curs = await pg_session.execute(
+                sa.update(shard).where(shard.owner == instance_id).values(
+                    lease_until=lease_until
+                ).returning(shard.shard_id)
+            )
+            owned = sorted(curs.scalars().all())
+            if len(owned) > fair_share:
+                await pg_session.execute(
+                    sa.update(shard).where(
+                        shard.shard_id.in_(owned[fair_share:])
+                    ).values(owner=None, lease_until=None)
+                )
+                owned = owned[:fair_share]
+            elif len(owned) < fair_share:
+                curs = await pg_session.execute(
+                    sa.select(shard.shard_id).where(
+                        sa.or_(shard.owner.is_(None), shard.lease_until < now)
+                    ).order_by(shard.shard_id).limit(
+                        fair_share - len(owned)
+                    ).with_for_update(skip_locked=True)
+                )
+                free = list(curs.scalars().all())
+                if free:
+                    await pg_session.execute(
+                        sa.update(shard).where(
+                            shard.shard_id.in_(free)
+                        ).values(owner=instance_id, lease_until=lease_until)
+                    )
+                    owned += free
+            await pg_session.commit()
+        return frozenset(owned)
+
+    @staticmethod
+    async def leave(instance_id: str, db) -> None:
+        """Отпускает шарды экземпляра и удаляет его из живых."""
+        shard = work_bd_mdl.WorkShardModel
+        instance = work_bd_mdl.WorkInstanceModel
+        async with db as pg_session:
+            await pg_session.execute(
+                sa.update(shard).where(shard.owner == instance_id).values(
+                    owner=None, lease_until=None,
+                )
+            )
+            await pg_session.execute(
+                sa.delete(instance).where(instance.instance_id == instance_id)
+            )
+            await pg_session.commit()
@@ -1,22 +1,139 @@
 """Модуль содержит соединение, сессию и базовую модель БД."""
 from contextlib import asynccontextmanager
+import hashlib
+import logging
+import random
+import time
 from typing import Any, AsyncGenerator
 
-from sqlalchemy import MetaData
+from sqlalchemy import MetaData, event
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy.pool import NullPool
-from app.config import settings
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from app.config import AppSettings, settings
+import app.utils.metrics as metrics
+from app.utils.replica_router import ReplicaRouter
+
+logger = logging.getLogger(__name__)
+
+
+class MeteredAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, считающий время ожидания свободного соединения."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_count = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            wait_time = time.perf_counter() - start
+            self.wait_count += 1
+            self.wait_time_total += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+
+    def recreate(self) -> 'MeteredAsyncQueuePool':
+        new_pool = super().recreate()
+        new_pool.wait_count = self.wait_count
+        new_pool.wait_time_total = self.wait_time_total
+        new_pool.wait_time_max = self.wait_time_max
+        new_pool.timeouts = self.timeouts
+        return new_pool
+
+
+def get_engine_pool_kwargs(app_settings: AppSettings) -> dict:
+    """Параметры пула соединений движка из настроек."""
+    if app_settings.postgres_pool_class == 'null':
+        return {'poolclass': NullPool}
+    return {
+        'poolclass': MeteredAsyncQueuePool,
+        'pool_size': app_settings.postgres_pool_size,
+        'max_overflow': app_settings.postgres_max_overflow,
+        'pool_timeout': app_settings.postgres_pool_timeout,
+        'pool_pre_ping': app_settings.postgres_pool_pre_ping,
+        'pool_recycle': app_settings.postgres_pool_recycle,
+    }
 
 
 async_engine = create_async_engine(
     settings.postgres_url,
     future=True,
     echo=settings.postgresql_log,
-    poolclass=NullPool,
+    **get_engine_pool_kwargs(settings),
 )
 
 
+def register_query_hooks(engine: Any, app_settings: AppSettings) -> None:
+    """Подключает к движку замер длительности и журнал медленных запросов."""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, *args) -> None:
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(
+        conn, cursor, statement, parameters, *args,
+    ) -> None:
+        duration = time.perf_counter() - conn.info['query_start'].pop()
+        metrics.db_query_duration.observe(
+            duration, operation=get_query_operation(statement),
+        )
+        if (
+            duration * 1000 >= app_settings.slow_query_threshold_ms
+            and random.random() < app_settings.slow_query_sample_rate
+        ):
+            log_slow_query(statement, parameters, duration, cursor.rowcount)
+
+    @event.listens_for(engine, 'handle_error')
+    def handle_error(context) -> None:
+        if context.connection is None:
+            return
+        query_start = context.connection.info.get('query_start')
+        if query_start:
+            query_start.pop()
+
+
+def log_slow_query(
+    statement: str, parameters: Any, duration: float, rowcount: int,
+) -> None:
+    """Пишет в журнал медленный запрос.
+
+    Вместо значений параметров пишется их хеш: он позволяет сгруппировать
+    повторы одного запроса, не раскрывая данные.
+    """
+    params_hash = hashlib.sha1(
+        repr(parameters).encode(), usedforsecurity=False,
+    ).hexdigest()[:16]
+    record = {
+        'statement': ' '.join(statement.split()),
+        'params_hash': params_hash,
+        'duration_ms': round(duration * 1000, 3),
+        'rows': rowcount,
+    }
+    logger.warning(
+        'Медленный запрос %(duration_ms)s мс, строк %(rows)s, '
+        'параметры %(params_hash)s: %(statement)s',
+        record, extra={'slow_query': record},
+    )
+
+
+def get_query_operation(statement: str) -> str:
+    """Тип SQL-операции (SELECT, INSERT, ...) по тексту запроса."""
+    words = statement.lstrip().split(None, 1)
+    return words[0].upper() if words else 'UNKNOWN'
+
+
+register_query_hooks(async_engine.sync_engine, settings)
+
 async_session = sessionmaker(  # type: ignore
     async_engine,
     class_=AsyncSession,
@@ -34,3 +151,77 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 db_session = asynccontextmanager(get_db)
+
+
+def create_replica_router(app_settings: AppSettings) -> ReplicaRouter | None:
+    """Создаёт движки реплик для чтения, если они заданы в настройках."""
+    if not app_settings.postgres_replica_urls:
+        return None
+    engines = []
+    for replica_url in app_settings.postgres_replica_urls:
+        engine = create_async_engine(
+            replica_url,
+            future=True,
+            echo=app_settings.postgresql_log,
+            **get_engine_pool_kwargs(app_settings),
+        )
+        register_query_hooks(engine.sync_engine, app_settings)
+        engines.append(engine)
+    return ReplicaRouter(engines, app_settings)
+
+
+replica_router = create_replica_router(settings)
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Получение сессии для чтения: с реплики или, если нет, с основной.
+
+    Данные реплики могут отставать не более чем на replica_max_lag
+    секунд, поэтому сессия годится только для запросов на чтение.
+    """
+    replica = replica_router.choose() if replica_router else None
+    if replica is None:
+        session_factory = async_session
+    else:
+        session_factory = replica.session_factory
+        replica.in_use += 1
+    try:
+        async with session_factory() as session:
+            try:
+                yield session
+            except DBAPIError as exc:
+                if replica is not None and exc.connection_invalidated:
+                    replica_router.mark_failed(replica)
+                raise
+            finally:
+                await session.close()
+    finally:
+        if replica is not None:
+            replica.in_use -= 1
+
+db_read_session = asynccontextmanager(get_read_db)
+
+
+def get_pool_stats() -> dict:
+    """Текущая статистика пула соединений движка."""
+    pool = async_engine.pool
+    stats: dict = {'pool_class': type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+        })
+    if isinstance(pool, MeteredAsyncQueuePool):
+        stats.update({
+            'wait_count': pool.wait_count,
+            'wait_time_total': pool.wait_time_total,
+            'wait_time_avg': (
+                pool.wait_time_total / pool.wait_count
+                if pool.wait_count else 0.0
+            ),
+            'wait_time_max': pool.wait_time_max,
+            'timeouts': pool.timeouts,
+        })
+    return stats
@@ -0,0 +1,86 @@
+"""accounts_latest
+
+Revision ID: 4b1e2d7a9c03
+Revises: 9cf7cad9918f
+Create Date: 2026-10-18 10:12:41.527310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b1e2d7a9c03'
+down_revision: Union[str, None] = '9cf7cad9918f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'accounts_latest',
+        sa.Column('acc_addr', sa.String, nullable=False, primary_key=True),
+        sa.Column('account_id', sa.Integer, nullable=False),
+        sa.Column('bandwidth', sa.String),
+        sa.Column('trx_balance', sa.String),
+        sa.Column('energy', sa.String),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+    )
+    op.create_index(
+        'ix_accounts_latest_account_id', 'accounts_latest', ['account_id'],
+        unique=True,
+    )
+    # Триггер держит последний снимок каждого адреса в актуальном
+    # состоянии при любой вставке в accounts.
+    op.execute(
+        """
+        CREATE FUNCTION accounts_latest_upsert() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO accounts_latest (
+                acc_addr, account_id, bandwidth, trx_balance, energy,
+                created_at
+            )
+            VALUES (
+                NEW.acc_addr, NEW.id, NEW.bandwidth, NEW.trx_balance,
+                NEW.energy, NEW.created_at
+            )
+            ON CONFLICT (acc_addr) DO UPDATE SET
+                account_id = EXCLUDED.account_id,
+                bandwidth = EXCLUDED.bandwidth,
+                trx_balance = EXCLUDED.trx_balance,
+                energy = EXCLUDED.energy,
+                created_at = EXCLUDED.created_at
+            WHERE accounts_latest.account_id < EXCLUDED.account_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER accounts_latest_trg
+        AFTER INSERT ON accounts
+        FOR EACH ROW EXECUTE FUNCTION accounts_latest_upsert()
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO accounts_latest (
+            acc_addr, account_id, bandwidth, trx_balance, energy, created_at
+        )
+        SELECT DISTINCT ON (acc_addr)
+            acc_addr, id, bandwidth, trx_balance, energy, created_at
+        FROM accounts
+        ORDER BY acc_addr, id DESC
+        ON CONFLICT (acc_addr) DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER accounts_latest_trg ON accounts')
+    op.execute('DROP FUNCTION accounts_latest_upsert()')
+    op.drop_index('ix_accounts_latest_account_id', 'accounts_latest')
+    op.drop_table('accounts_latest')
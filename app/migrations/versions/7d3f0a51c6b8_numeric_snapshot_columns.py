@@ -0,0 +1,103 @@
+"""numeric snapshot columns (expand)
+
+Revision ID: 7d3f0a51c6b8
+Revises: 4b1e2d7a9c03
+Create Date: 2026-10-18 11:40:05.118264
+
+Первая половина перевода bandwidth/trx_balance/energy в bigint: рядом со
+строковыми колонками появляются числовые *_num, которые триггер держит в
+согласии со строковыми, и старые строки переносятся пачками. Старые и
+новые версии сервиса продолжают работать. Колонки подменяются отдельной
+ревизией 8b6e4d2c9a17 только после того, как все экземпляры обновлены:
+
+    alembic upgrade 7d3f0a51c6b8
+    # выкатить версию, пишущую числа, на все экземпляры
+    alembic -x numeric_writers=int upgrade head
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3f0a51c6b8'
+down_revision: Union[str, None] = '4b1e2d7a9c03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ('bandwidth', 'trx_balance', 'energy')
+TABLES = ('accounts', 'accounts_latest')
+BACKFILL_BATCH_SIZE = 10000
+STR_TO_BIGINT_FUNCTION = """
+    CREATE FUNCTION accounts_str_to_bigint(value text) RETURNS bigint AS $$
+        SELECT CASE WHEN value ~ '^-?[0-9]+$' THEN value::bigint END
+    $$ LANGUAGE sql IMMUTABLE
+"""
+FILL_NUMERIC_FUNCTION = """
+    CREATE FUNCTION accounts_fill_numeric() RETURNS trigger AS $$
+    BEGIN
+        NEW.bandwidth_num := accounts_str_to_bigint(NEW.bandwidth);
+        NEW.trx_balance_num := accounts_str_to_bigint(NEW.trx_balance);
+        NEW.energy_num := accounts_str_to_bigint(NEW.energy);
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+
+def create_fill_numeric_triggers() -> None:
+    """Функции и триггеры, заполняющие *_num из строковых колонок."""
+    op.execute(STR_TO_BIGINT_FUNCTION)
+    op.execute(FILL_NUMERIC_FUNCTION)
+    for table in TABLES:
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_fill_numeric_trg
+            BEFORE INSERT OR UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION accounts_fill_numeric()
+            """
+        )
+
+
+def upgrade() -> None:
+    # Шаг 1: новые числовые колонки и триггер, заполняющий их для строк,
+    # которые продолжают вставляться во время и после миграции.
+    for table in TABLES:
+        for column in COLUMNS:
+            op.add_column(table, sa.Column(f'{column}_num', sa.BigInteger))
+    create_fill_numeric_triggers()
+    max_id = op.get_bind().execute(
+        sa.text('SELECT coalesce(max(id), 0) FROM accounts')
+    ).scalar()
+
+    # Шаг 2: онлайн-перенос старых строк пачками, каждая пачка
+    # в своей короткой транзакции.
+    with op.get_context().autocommit_block():
+        op.execute(
+            """
+            UPDATE accounts_latest SET acc_addr = acc_addr
+            WHERE bandwidth_num IS NULL
+            """
+        )
+        for start_id in range(0, max_id + 1, BACKFILL_BATCH_SIZE):
+            op.execute(
+                f"""
+                UPDATE accounts SET
+                    bandwidth_num = accounts_str_to_bigint(bandwidth),
+                    trx_balance_num = accounts_str_to_bigint(trx_balance),
+                    energy_num = accounts_str_to_bigint(energy)
+                WHERE id >= {start_id}
+                    AND id < {start_id + BACKFILL_BATCH_SIZE}
+                """
+            )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f'DROP TRIGGER {table}_fill_numeric_trg ON {table}')
+        for column in COLUMNS:
+            op.drop_column(table, f'{column}_num')
+    op.execute('DROP FUNCTION accounts_fill_numeric()')
+    op.execute('DROP FUNCTION accounts_str_to_bigint(text)')
@@ -0,0 +1,95 @@
+"""numeric snapshot columns (contract)
+
+Revision ID: 8b6e4d2c9a17
+Revises: 7d3f0a51c6b8
+Create Date: 2026-10-18 11:52:37.640915
+
+Вторая половина перевода bandwidth/trx_balance/energy в bigint: числовые
+*_num подменяют строковые колонки. Экземпляр, который пишет в эти поля
+строки, после неё получает ошибку вставки, поэтому ревизия применяется
+только когда все экземпляры сервиса уже пишут числа (их вставки в
+строковые колонки проходят через присваивающее приведение), и требует
+подтверждения:
+
+    alembic -x numeric_writers=int upgrade head
+
+На пустой БД подтверждение не нужно.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b6e4d2c9a17'
+down_revision: Union[str, None] = '7d3f0a51c6b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ('bandwidth', 'trx_balance', 'energy')
+TABLES = ('accounts', 'accounts_latest')
+STR_TO_BIGINT_FUNCTION = """
+    CREATE FUNCTION accounts_str_to_bigint(value text) RETURNS bigint AS $$
+        SELECT CASE WHEN value ~ '^-?[0-9]+$' THEN value::bigint END
+    $$ LANGUAGE sql IMMUTABLE
+"""
+FILL_NUMERIC_FUNCTION = """
+    CREATE FUNCTION accounts_fill_numeric() RETURNS trigger AS $$
+    BEGIN
+        NEW.bandwidth_num := accounts_str_to_bigint(NEW.bandwidth);
+        NEW.trx_balance_num := accounts_str_to_bigint(NEW.trx_balance);
+        NEW.energy_num := accounts_str_to_bigint(NEW.energy);
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+
+def check_writers_ready() -> None:
+    """Не даёт подменить колонки, пока могут работать старые экземпляры."""
+    x_args = context.get_x_argument(as_dictionary=True)
+    if x_args.get('numeric_writers') == 'int':
+        return
+    has_rows = op.get_bind().execute(
+        sa.text('SELECT EXISTS (SELECT 1 FROM accounts)')
+    ).scalar()
+    if has_rows:
+        raise RuntimeError(
+            'Подмена числовых колонок сломает вставки экземпляров, пишущих '
+            'строки. Обновите все экземпляры сервиса и запустите '
+            '"alembic -x numeric_writers=int upgrade head"'
+        )
+
+
+def upgrade() -> None:
+    check_writers_ready()
+    # Подмена колонок в одной короткой транзакции.
+    for table in TABLES:
+        op.execute(f'DROP TRIGGER {table}_fill_numeric_trg ON {table}')
+        for column in COLUMNS:
+            op.drop_column(table, column)
+            op.alter_column(table, f'{column}_num', new_column_name=column)
+    op.execute('DROP FUNCTION accounts_fill_numeric()')
+    op.execute('DROP FUNCTION accounts_str_to_bigint(text)')
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        for column in COLUMNS:
+            op.alter_column(table, column, new_column_name=f'{column}_num')
+            op.add_column(table, sa.Column(column, sa.String))
+        op.execute(
+            f'UPDATE {table} SET '
+            + ', '.join(f'{column} = {column}_num::text' for column in COLUMNS)
+        )
+    op.execute(STR_TO_BIGINT_FUNCTION)
+    op.execute(FILL_NUMERIC_FUNCTION)
+    for table in TABLES:
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_fill_numeric_trg
+            BEFORE INSERT OR UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION accounts_fill_numeric()
+            """
+        )
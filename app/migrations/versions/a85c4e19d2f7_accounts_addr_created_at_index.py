@@ -0,0 +1,33 @@
+"""accounts acc_addr created_at index
+
+Revision ID: a85c4e19d2f7
+Revises: 8b6e4d2c9a17
+Create Date: 2026-10-18 13:05:52.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a85c4e19d2f7'
+down_revision: Union[str, None] = '8b6e4d2c9a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_accounts_acc_addr_created_at', 'accounts',
+            ['acc_addr', 'created_at'], postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_accounts_acc_addr_created_at', 'accounts',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,153 @@
+"""partition accounts by created_at
+
+Revision ID: c3e97b6f0a14
+Revises: a85c4e19d2f7
+Create Date: 2026-10-18 14:21:17.660482
+
+"""
+import datetime
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e97b6f0a14'
+down_revision: Union[str, None] = 'a85c4e19d2f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PREMAKE_MONTHS = 3
+
+
+def add_month(month_start: datetime.date) -> datetime.date:
+    return (month_start + datetime.timedelta(days=32)).replace(day=1)
+
+
+def upgrade() -> None:
+    # Существующая таблица без копирования данных становится партицией
+    # со всей историей до начала следующего месяца, дальше - помесячно.
+    legacy_upper = add_month(datetime.date.today().replace(day=1))
+    # Долгие проверка границы и построение уникального индекса идут без
+    # блокировки записи, поэтому ATTACH PARTITION ниже меняет только
+    # метаданные: граница доказывается ограничением, а первичный ключ
+    # партиции уже есть.
+    with op.get_context().autocommit_block():
+        op.execute(
+            f"""
+            ALTER TABLE accounts ADD CONSTRAINT accounts_legacy_bound
+            CHECK (
+                created_at IS NOT NULL
+                AND created_at < '{legacy_upper.isoformat()}'
+            ) NOT VALID
+            """
+        )
+        op.execute(
+            'ALTER TABLE accounts VALIDATE CONSTRAINT accounts_legacy_bound'
+        )
+        op.execute(
+            'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS '
+            'accounts_legacy_pkey ON accounts (id, created_at)'
+        )
+    op.execute('DROP TRIGGER accounts_latest_trg ON accounts')
+    op.execute('ALTER TABLE accounts RENAME TO accounts_legacy')
+    op.execute('ALTER TABLE accounts_legacy DROP CONSTRAINT accounts_pkey')
+    op.execute(
+        'ALTER TABLE accounts_legacy ADD CONSTRAINT accounts_legacy_pkey '
+        'PRIMARY KEY USING INDEX accounts_legacy_pkey'
+    )
+    op.execute(
+        'ALTER INDEX ix_accounts_acc_addr_created_at '
+        'RENAME TO accounts_legacy_acc_addr_created_at_idx'
+    )
+    op.execute(
+        """
+        CREATE TABLE accounts (
+            id integer NOT NULL DEFAULT nextval('accounts_id_seq'),
+            acc_addr varchar NOT NULL,
+            bandwidth bigint,
+            trx_balance bigint,
+            energy bigint,
+            created_at timestamp without time zone NOT NULL,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute('ALTER SEQUENCE accounts_id_seq OWNED BY accounts.id')
+    op.execute(
+        'CREATE INDEX ix_accounts_acc_addr_created_at '
+        'ON accounts (acc_addr, created_at)'
+    )
+    op.execute(
+        f"""
+        ALTER TABLE accounts ATTACH PARTITION accounts_legacy
+        FOR VALUES FROM (MINVALUE) TO ('{legacy_upper.isoformat()}')
+        """
+    )
+    op.execute(
+        'ALTER TABLE accounts_legacy DROP CONSTRAINT accounts_legacy_bound'
+    )
+    month_start = legacy_upper
+    for _ in range(PREMAKE_MONTHS):
+        month_end = add_month(month_start)
+        op.execute(
+            f"""
+            CREATE TABLE accounts_p{month_start:%Y%m} PARTITION OF accounts
+            FOR VALUES FROM ('{month_start.isoformat()}')
+            TO ('{month_end.isoformat()}')
+            """
+        )
+        month_start = month_end
+    # Страховка на случай, если обслуживание партиций выключено или не
+    # успело создать месяц: вставки не падают, а строки переносятся в
+    # помесячную партицию при её создании.
+    op.execute('CREATE TABLE accounts_default PARTITION OF accounts DEFAULT')
+    op.execute(
+        """
+        CREATE TRIGGER accounts_latest_trg
+        AFTER INSERT ON accounts
+        FOR EACH ROW EXECUTE FUNCTION accounts_latest_upsert()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE accounts RENAME TO accounts_partitioned')
+    op.execute(
+        'ALTER TABLE accounts_partitioned '
+        'RENAME CONSTRAINT accounts_pkey TO accounts_partitioned_pkey'
+    )
+    op.execute('ALTER SEQUENCE accounts_id_seq OWNED BY NONE')
+    op.execute(
+        """
+        CREATE TABLE accounts (
+            id integer NOT NULL DEFAULT nextval('accounts_id_seq')
+                PRIMARY KEY,
+            acc_addr varchar NOT NULL,
+            bandwidth bigint,
+            trx_balance bigint,
+            energy bigint,
+            created_at timestamp without time zone NOT NULL
+        )
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO accounts
+        SELECT id, acc_addr, bandwidth, trx_balance, energy, created_at
+        FROM accounts_partitioned
+        """
+    )
+    op.execute('ALTER SEQUENCE accounts_id_seq OWNED BY accounts.id')
+    op.execute('DROP TABLE accounts_partitioned')
+    op.execute(
+        'CREATE INDEX ix_accounts_acc_addr_created_at '
+        'ON accounts (acc_addr, created_at)'
+    )
+    op.execute(
+        """
+        CREATE TRIGGER accounts_latest_trg
+        AFTER INSERT ON accounts
+        FOR EACH ROW EXECUTE FUNCTION accounts_latest_upsert()
+        """
+    )
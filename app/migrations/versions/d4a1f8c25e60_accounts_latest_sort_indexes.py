@@ -0,0 +1,46 @@
+"""accounts_latest sort indexes
+
+Revision ID: d4a1f8c25e60
+Revises: c3e97b6f0a14
+Create Date: 2026-10-18 15:48:33.201945
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a1f8c25e60'
+down_revision: Union[str, None] = 'c3e97b6f0a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SORT_FIELDS = ('bandwidth', 'trx_balance', 'energy', 'created_at')
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for field in SORT_FIELDS:
+            op.create_index(
+                f'ix_accounts_latest_{field}_account_id', 'accounts_latest',
+                [field, 'account_id'], postgresql_concurrently=True,
+            )
+        op.create_index(
+            'ix_accounts_latest_acc_addr_pattern', 'accounts_latest',
+            ['acc_addr'], postgresql_concurrently=True,
+            postgresql_ops={'acc_addr': 'varchar_pattern_ops'},
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_accounts_latest_acc_addr_pattern', 'accounts_latest',
+            postgresql_concurrently=True,
+        )
+        for field in SORT_FIELDS:
+            op.drop_index(
+                f'ix_accounts_latest_{field}_account_id', 'accounts_latest',
+                postgresql_concurrently=True,
+            )
@@ -0,0 +1,59 @@
+"""snapshot jobs
+
+Revision ID: e5b2c7913a48
+Revises: d4a1f8c25e60
+Create Date: 2026-10-18 19:06:12.418236
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b2c7913a48'
+down_revision: Union[str, None] = 'd4a1f8c25e60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'snapshot_jobs',
+        sa.Column('id', sa.Integer, nullable=False, primary_key=True),
+        sa.Column('status', sa.String, nullable=False),
+        sa.Column('total', sa.Integer, nullable=False),
+        sa.Column('processed', sa.Integer, nullable=False),
+        sa.Column('inserted', sa.Integer, nullable=False),
+        sa.Column('failed', sa.Integer, nullable=False),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+        sa.Column('started_at', sa.DateTime),
+        sa.Column('finished_at', sa.DateTime),
+        sa.Column('updated_at', sa.DateTime, nullable=False),
+    )
+    op.create_index(
+        'ix_snapshot_jobs_status_updated_at', 'snapshot_jobs',
+        ['status', 'updated_at'],
+    )
+    op.create_table(
+        'snapshot_job_items',
+        sa.Column('id', sa.BigInteger, nullable=False, primary_key=True),
+        sa.Column(
+            'job_id', sa.Integer,
+            sa.ForeignKey('snapshot_jobs.id', ondelete='CASCADE'),
+            nullable=False,
+        ),
+        sa.Column('acc_addr', sa.String, nullable=False),
+        sa.Column('status', sa.String, nullable=False),
+        sa.Column('message', sa.Text),
+    )
+    op.create_index(
+        'ix_snapshot_job_items_job_id_status', 'snapshot_job_items',
+        ['job_id', 'status'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('snapshot_job_items')
+    op.drop_table('snapshot_jobs')
@@ -0,0 +1,99 @@
+"""work shards
+
+Revision ID: f7c3d9a1b254
+Revises: e5b2c7913a48
+Create Date: 2026-10-18 21:37:54.106318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7c3d9a1b254'
+down_revision: Union[str, None] = 'e5b2c7913a48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Совпадает с app.models.work_model.WORK_SHARD_COUNT.
+WORK_SHARD_COUNT = 64
+
+
+def upgrade() -> None:
+    work_shards = op.create_table(
+        'work_shards',
+        sa.Column('shard_id', sa.SmallInteger, nullable=False,
+                  primary_key=True),
+        sa.Column('owner', sa.String),
+        sa.Column('lease_until', sa.DateTime),
+    )
+    op.bulk_insert(
+        work_shards,
+        [{'shard_id': shard_id} for shard_id in range(WORK_SHARD_COUNT)],
+    )
+    op.create_table(
+        'work_instances',
+        sa.Column('instance_id', sa.String, nullable=False,
+                  primary_key=True),
+        sa.Column('heartbeat_at', sa.DateTime, nullable=False),
+    )
+    op.add_column(
+        'snapshot_job_items', sa.Column('claimed_by', sa.String),
+    )
+    op.add_column(
+        'snapshot_job_items', sa.Column('claimed_until', sa.DateTime),
+    )
+    # Задания и адреса теперь выбираются по статусу и сроку аренды, а не
+    # по updated_at задания.
+    op.drop_index(
+        'ix_snapshot_jobs_status_updated_at', 'snapshot_jobs',
+    )
+    op.create_index(
+        'ix_snapshot_jobs_active_id', 'snapshot_jobs', ['id'],
+        postgresql_where=sa.text("status IN ('pending', 'running')"),
+    )
+    op.drop_index(
+        'ix_snapshot_job_items_job_id_status', 'snapshot_job_items',
+    )
+    op.create_index(
+        'ix_snapshot_job_items_job_id_status_claimed_until',
+        'snapshot_job_items', ['job_id', 'status', 'claimed_until'],
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_accounts_latest_shard_acc_addr', 'accounts_latest',
+            [
+                sa.text(
+                    f'(hashtext(acc_addr) & 2147483647) % {WORK_SHARD_COUNT}'
+                ),
+                'acc_addr',
+            ],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_accounts_latest_shard_acc_addr', 'accounts_latest',
+            postgresql_concurrently=True,
+        )
+    op.drop_index(
+        'ix_snapshot_job_items_job_id_status_claimed_until',
+        'snapshot_job_items',
+    )
+    op.create_index(
+        'ix_snapshot_job_items_job_id_status', 'snapshot_job_items',
+        ['job_id', 'status'],
+    )
+    op.drop_index('ix_snapshot_jobs_active_id', 'snapshot_jobs')
+    op.create_index(
+        'ix_snapshot_jobs_status_updated_at', 'snapshot_jobs',
+        ['status', 'updated_at'],
+    )
+    op.drop_column('snapshot_job_items', 'claimed_until')
+    op.drop_column('snapshot_job_items', 'claimed_by')
+    op.drop_table('work_instances')
+    op.drop_table('work_shards')
@@ -1,16 +1,55 @@
 """Модуль со схемой аккаунта в БД."""
 
 from app.database import Base
-from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String
 
 
 class AccDataModel(Base):
     """Модель данных аккаунта в БД."""
 
     __tablename__ = 'accounts'
+    __table_args__ = (
+        Index('ix_accounts_acc_addr_created_at', 'acc_addr', 'created_at'),
+    )
     id = Column(Integer, nullable=False, primary_key=True)
     acc_addr: str = Column(String, nullable=False)
-    bandwidth: str = Column(String)
-    trx_balance: str = Column(String)
-    energy: str = Column(String)
+    bandwidth: int = Column(BigInteger)
+    trx_balance: int = Column(BigInteger)
+    energy: int = Column(BigInteger)
+    created_at = Column(DateTime, nullable=False, primary_key=True)
+
+
+class AccLatestModel(Base):
+    """Модель последнего снимка аккаунта в БД.
+
+    Таблица заполняется триггером при вставке в accounts.
+    """
+
+    __tablename__ = 'accounts_latest'
+    __table_args__ = (
+        Index(
+            'ix_accounts_latest_bandwidth_account_id',
+            'bandwidth', 'account_id',
+        ),
+        Index(
+            'ix_accounts_latest_trx_balance_account_id',
+            'trx_balance', 'account_id',
+        ),
+        Index(
+            'ix_accounts_latest_energy_account_id', 'energy', 'account_id',
+        ),
+        Index(
+            'ix_accounts_latest_created_at_account_id',
+            'created_at', 'account_id',
+        ),
+        Index(
+            'ix_accounts_latest_acc_addr_pattern', 'acc_addr',
+            postgresql_ops={'acc_addr': 'varchar_pattern_ops'},
+        ),
+    )
+    acc_addr: str = Column(String, nullable=False, primary_key=True)
+    account_id = Column(Integer, nullable=False, unique=True, index=True)
+    bandwidth: int = Column(BigInteger)
+    trx_balance: int = Column(BigInteger)
+    energy: int = Column(BigInteger)
     created_at = Column(DateTime, nullable=False)
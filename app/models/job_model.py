@@ -0,0 +1,61 @@
+"""Модуль со схемой фоновых заданий снятия снимков в БД."""
+
+from app.database import Base
+from sqlalchemy import (
+    BigInteger, Column, DateTime, ForeignKey, Index, Integer, String, Text,
+    text,
+)
+
+JOB_PENDING = 'pending'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+
+ITEM_PENDING = 'pending'
+ITEM_CLAIMED = 'claimed'
+ITEM_DONE = 'done'
+ITEM_FAILED = 'failed'
+
+
+class SnapshotJobModel(Base):
+    """Модель задания на пакетное снятие снимков аккаунтов."""
+
+    __tablename__ = 'snapshot_jobs'
+    __table_args__ = (
+        # Под выбор задания со свободными адресами (claim_job).
+        Index(
+            'ix_snapshot_jobs_active_id', 'id',
+            postgresql_where=text("status IN ('pending', 'running')"),
+        ),
+    )
+    id = Column(Integer, nullable=False, primary_key=True)
+    status: str = Column(String, nullable=False, default=JOB_PENDING)
+    total: int = Column(Integer, nullable=False)
+    processed: int = Column(Integer, nullable=False, default=0)
+    inserted: int = Column(Integer, nullable=False, default=0)
+    failed: int = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    updated_at = Column(DateTime, nullable=False)
+
+
+class SnapshotJobItemModel(Base):
+    """Модель адреса в задании на снятие снимков."""
+
+    __tablename__ = 'snapshot_job_items'
+    __table_args__ = (
+        Index(
+            'ix_snapshot_job_items_job_id_status_claimed_until',
+            'job_id', 'status', 'claimed_until',
+        ),
+    )
+    id = Column(BigInteger, nullable=False, primary_key=True)
+    job_id: int = Column(
+        Integer, ForeignKey('snapshot_jobs.id', ondelete='CASCADE'),
+        nullable=False,
+    )
+    acc_addr: str = Column(String, nullable=False)
+    status: str = Column(String, nullable=False, default=ITEM_PENDING)
+    message = Column(Text)
+    claimed_by = Column(String)
+    claimed_until = Column(DateTime)
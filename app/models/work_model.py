@@ -0,0 +1,37 @@
+"""Модуль со схемой распределения работы между экземплярами сервиса."""
+
+from app.database import Base
+import sqlalchemy as sa
+from sqlalchemy import Column, DateTime, SmallInteger, String
+
+# Число шардов адресов. Оно зашито в индекс по выражению шарда
+# (миграция f7c3d9a1b254), поэтому меняется только вместе с ним.
+WORK_SHARD_COUNT = 64
+
+
+def get_shard_expr(acc_addr_column) -> sa.ColumnElement:
+    """Номер шарда адреса в SQL.
+
+    Константы подставляются литералами, а не параметрами, чтобы
+    выражение совпадало с индексом и при подготовленных запросах.
+    """
+    return sa.func.hashtext(acc_addr_column).op('&')(
+        sa.literal_column('2147483647')
+    ) % sa.literal_column(str(WORK_SHARD_COUNT))
+
+
+class WorkShardModel(Base):
+    """Модель аренды шарда адресов экземпляром сервиса."""
+
+    __tablename__ = 'work_shards'
+    shard_id = Column(SmallInteger, nullable=False, primary_key=True)
+    owner = Column(String)
+    lease_until = Column(DateTime)
+
+
+class WorkInstanceModel(Base):
+    """Модель живого экземпляра сервиса (по последнему пульсу)."""
+
+    __tablename__ = 'work_instances'
+    instance_id = Column(String, nullable=False, primary_key=True)
+    heartbeat_at = Column(DateTime, nullable=False)
@@ -1,28 +1,235 @@
 """Модуль содержит роутеры работы с аккаунтом."""
-from fastapi import Query, Depends
+import datetime
+import typing
+
+from fastapi import (
+    Depends, Header, HTTPException, Query, Request, Response,
+)
+from fastapi.responses import StreamingResponse
 from fastapi.routing import APIRouter
-from app.classes.acc_worker import AccountWorker
-from app.database import db_session
-from app.schemas.acc_schema import AccInfoSchema, AccInfoInputSchema
+from app.classes.acc_worker import (
+    AccountWorker,
+    get_history_bucket_count,
+)
+from app.config import settings
+from app.database import db_read_session, db_session
+from app.schemas.acc_schema import (
+    AccBulkInputSchema,
+    AccBulkResultSchema,
+    AccFilterSchema,
+    AccHistoryPointSchema,
+    AccInfoInputSchema,
+    AccInfoSchema,
+    AccStatsSchema,
+)
+import app.utils.export as export
+import app.utils.fast_json as fast_json
+import app.utils.response_cache as rc
 
 
 account_router = APIRouter(tags=['Работа с акканутами'])
 
 
+def to_naive_datetime(value: datetime.datetime) -> datetime.datetime:
+    """Приводит дату с часовым поясом к наивной локальной.
+
+    Снимки хранятся в timestamp without time zone по локальным часам
+    сервиса (datetime.now()), и asyncpg не принимает для таких колонок
+    даты с часовым поясом.
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
 @account_router.post('/api/v1/create_account_info')
 async def create_account_info(
     input_data: AccInfoInputSchema,
+    wait_durable: bool = Query(False),
+    idempotency_key: str | None = Header(None, max_length=255),
     db=Depends(db_session),
 ) -> str:
-    """Эндпоинт принимает адрес, получает инфу и складывает в БД."""
-    return await AccountWorker.create_account_info(input_data.acc_addr, db)
+    """Эндпоинт принимает адрес, получает инфу и складывает в БД.
+
+    Повторы с тем же заголовком Idempotency-Key не создают новых записей:
+    одновременные запросы сливаются в один, а успешный результат
+    выдаётся из кеша до истечения idempotency_ttl.
+    """
+    if idempotency_key is None:
+        return await AccountWorker.create_account_info(
+            input_data.acc_addr, db, wait_durable=wait_durable,
+        )
+    return await rc.idempotency_cache.get_or_fetch(
+        (idempotency_key, input_data.acc_addr),
+        lambda: AccountWorker.create_account_info(
+            input_data.acc_addr, db, wait_durable=wait_durable,
+        ),
+        cacheable=lambda messages: not messages,
+    )
 
 
-@account_router.get('/api/v1/get_accounts_info')
+@account_router.post('/api/v1/create_accounts_info_bulk')
+async def create_accounts_info_bulk(
+    input_data: AccBulkInputSchema,
+    db=Depends(db_session),
+) -> list[AccBulkResultSchema]:
+    """Эндпоинт принимает пакет адресов и складывает их инфу в БД."""
+    return await AccountWorker.create_accounts_info_bulk(
+        input_data.acc_addrs, db
+    )
+
+
+@account_router.get(
+    '/api/v1/get_accounts_info', response_model=list[AccInfoSchema],
+)
 async def get_accounts_info(
+    request: Request,
     page: int = Query(1, gt=0),
     page_size: int | None = Query(20, gt=0, le=300),
-    db=Depends(db_session),
-) -> list[AccInfoSchema]:
-    """Эндпоинт выдает инфу по аккаунтам из БД."""
-    return await AccountWorker.get_accounts_info(page, page_size, db)
+    cursor: str | None = Query(None),
+    filters: AccFilterSchema = Depends(),
+    sort_by: typing.Literal[
+        'm_id', 'bandwidth', 'trx_balance', 'energy', 'created_at'
+    ] = Query('m_id'),
+    sort_desc: bool = Query(False),
+    db=Depends(db_read_session),
+) -> Response:
+    """Эндпоинт выдает инфу по аккаунтам из БД.
+
+    Если передан cursor (пустая строка - с начала), то вместо page
+    используется keyset-пагинация, а курсор следующей страницы
+    возвращается в заголовке X-Next-Cursor. Фильтры и сортировка
+    применяются в БД. Страницы кешируются до следующей записи в БД,
+    при совпадении If-None-Match отдаётся 304.
+    """
+    cache_key = (
+        page, page_size, cursor, tuple(filters.model_dump().items()),
+        sort_by, sort_desc,
+    )
+    cached = rc.accounts_page_cache.get(cache_key)
+    if cached is None:
+        version = rc.accounts_page_cache.version
+        headers = {}
+        if cursor is None:
+            accounts = await AccountWorker.get_accounts_info(
+                page, page_size, db,
+                filters=filters, sort_by=sort_by, sort_desc=sort_desc,
+            )
+        else:
+            try:
+                accounts, next_cursor = (
+                    await AccountWorker.get_accounts_info_by_cursor(
+                        cursor, page_size, db, filters=filters,
+                        sort_by=sort_by, sort_desc=sort_desc,
+                    )
+                )
+            except ValueError as exc:
+                raise HTTPException(status_code=422, detail=str(exc))
+            if next_cursor is not None:
+                headers['X-Next-Cursor'] = next_cursor
+        cached = rc.accounts_page_cache.put(
+            cache_key, fast_json.dumps(accounts), version, headers,
+        )
+    return rc.build_response(request, cached)
+
+
+@account_router.get('/api/v1/get_account_history')
+async def get_account_history(
+    response: Response,
+    acc_addr: str = Query(...),
+    date_from: datetime.datetime = Query(...),
+    date_to: datetime.datetime = Query(...),
+    bucket: typing.Literal['minute', 'hour', 'day', 'week'] | None = Query(
+        None
+    ),
+    db=Depends(db_read_session),
+) -> list[AccHistoryPointSchema]:
+    """Эндпоинт выдает историю снимков аккаунта за период.
+
+    Период с интервалами, число которых может превысить
+    history_max_points, отклоняется. История без интервалов обрезается
+    до history_max_points точек, о чём говорит заголовок
+    X-History-Truncated.
+    """
+    date_from = to_naive_datetime(date_from)
+    date_to = to_naive_datetime(date_to)
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=422, detail='date_from позже date_to',
+        )
+    if bucket is not None and get_history_bucket_count(
+        date_from, date_to, bucket
+    ) > settings.history_max_points:
+        raise HTTPException(
+            status_code=422,
+            detail=(
+                f'Период дает больше {settings.history_max_points} '
+                f'интервалов {bucket}, сузьте период или укрупните интервал'
+            ),
+        )
+    points, truncated = await AccountWorker.get_account_history(
+        acc_addr, date_from, date_to, bucket, db
+    )
+    if truncated:
+        response.headers['X-History-Truncated'] = 'true'
+    return points
+
+
+@account_router.get(
+    '/api/v1/get_accounts_stats', response_model=AccStatsSchema,
+)
+async def get_accounts_stats(
+    request: Request,
+    filters: AccFilterSchema = Depends(),
+    bandwidth_above: list[int] = Query([]),
+    trx_balance_above: list[int] = Query([]),
+    energy_above: list[int] = Query([]),
+    db=Depends(db_read_session),
+) -> Response:
+    """Эндпоинт выдает статистику по последним снимкам аккаунтов.
+
+    Результат кешируется на короткое время.
+    """
+    thresholds = {
+        'bandwidth': bandwidth_above,
+        'trx_balance': trx_balance_above,
+        'energy': energy_above,
+    }
+    cache_key = (
+        tuple(filters.model_dump().items()),
+        tuple((field, tuple(values)) for field, values in thresholds.items()),
+    )
+    cached = rc.accounts_stats_cache.get(cache_key)
+    if cached is None:
+        version = rc.accounts_stats_cache.version
+        stats = await AccountWorker.get_accounts_stats(
+            filters, thresholds, db
+        )
+        cached = rc.accounts_stats_cache.put(
+            cache_key, stats.model_dump_json().encode(), version,
+        )
+    return rc.build_response(request, cached)
+
+
+@account_router.get('/api/v1/export_accounts_info')
+async def export_accounts_info(
+    export_format: typing.Literal['ndjson', 'csv'] = Query(
+        'ndjson', alias='format',
+    ),
+    history: bool = Query(False),
+    db=Depends(db_read_session),
+) -> StreamingResponse:
+    """Эндпоинт потоково выгружает последние снимки или всю историю."""
+
+    async def encode_rows() -> typing.AsyncGenerator[str, None]:
+        if export_format == 'csv':
+            yield export.encode_csv([], with_header=True)
+        async for rows in AccountWorker.stream_accounts_info(history, db):
+            if export_format == 'csv':
+                yield export.encode_csv(rows)
+            else:
+                yield export.encode_ndjson(rows)
+
+    return StreamingResponse(
+        encode_rows(), media_type=export.EXPORT_MEDIA_TYPES[export_format],
+    )
@@ -0,0 +1,42 @@
+"""Модуль содержит роутеры фоновых заданий снятия снимков."""
+from fastapi import Depends, HTTPException, Query, status
+from fastapi.routing import APIRouter
+from app.classes.job_worker import SnapshotJobWorker
+from app.database import db_session
+from app.schemas.job_schema import (
+    JobCreatedSchema,
+    JobInputSchema,
+    JobStatusSchema,
+)
+
+
+job_router = APIRouter(tags=['Фоновые задания'])
+
+
+@job_router.post(
+    '/api/v1/snapshot_jobs', status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_snapshot_job(
+    input_data: JobInputSchema,
+    db=Depends(db_session),
+) -> JobCreatedSchema:
+    """Эндпоинт ставит задание на снятие снимков пакета адресов.
+
+    Ответ возвращается сразу, адреса обрабатываются в фоне.
+    """
+    return await SnapshotJobWorker.create_job(input_data.acc_addrs, db)
+
+
+@job_router.get('/api/v1/snapshot_jobs/{job_id}')
+async def get_snapshot_job(
+    job_id: int,
+    failures_limit: int = Query(100, ge=0, le=10000),
+    db=Depends(db_session),
+) -> JobStatusSchema:
+    """Эндпоинт выдает прогресс, ошибки по адресам и скорость задания."""
+    job_status = await SnapshotJobWorker.get_job_status(
+        job_id, failures_limit, db
+    )
+    if job_status is None:
+        raise HTTPException(status_code=404, detail='Задание не найдено')
+    return job_status
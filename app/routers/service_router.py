@@ -0,0 +1,30 @@
+"""Модуль содержит служебные роутеры сервиса."""
+from fastapi import Response
+from fastapi.routing import APIRouter
+from app.database import get_pool_stats
+from app.schemas.service_schema import CacheStatsSchema, PoolStatsSchema
+import app.utils.metrics as metrics
+import app.utils.tron_client as tr
+
+
+service_router = APIRouter(tags=['Служебное'])
+
+
+@service_router.get('/api/v1/pool_stats')
+async def pool_stats() -> PoolStatsSchema:
+    """Эндпоинт выдает текущую статистику пула соединений с БД."""
+    return PoolStatsSchema(**get_pool_stats())
+
+
+@service_router.get('/api/v1/tron_cache_stats')
+async def tron_cache_stats() -> CacheStatsSchema:
+    """Эндпоинт выдает статистику кеша данных из TRON."""
+    return CacheStatsSchema(**tr.tron_data_cache.stats())
+
+
+@service_router.get('/metrics', response_class=Response)
+async def metrics_endpoint() -> Response:
+    """Эндпоинт выдает метрики сервиса в текстовом формате Prometheus."""
+    return Response(
+        content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE,
+    )
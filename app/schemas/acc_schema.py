@@ -3,6 +3,8 @@ import datetime
 
 from pydantic import BaseModel, Field
 
+from app.config import settings
+
 
 class AccInfoSchema(BaseModel):
     """Схема выдачи данных об аккаунте."""
@@ -18,3 +20,70 @@ class AccInfoInputSchema(BaseModel):
     """Схема POST данных об аккаунте."""
 
     acc_addr: str = Field(...)
+
+
+class AccBulkInputSchema(BaseModel):
+    """Схема POST пакета адресов аккаунтов."""
+
+    acc_addrs: list[str] = Field(
+        ..., min_length=1, max_length=settings.bulk_max_addresses,
+    )
+
+
+class AccBulkResultSchema(BaseModel):
+    """Схема результата обработки адреса из пакета."""
+
+    acc_addr: str = Field(...)
+    inserted: bool = Field(...)
+    message: str = Field(...)
+
+
+class AccHistoryPointSchema(BaseModel):
+    """Схема точки истории снимков аккаунта.
+
+    При прореживании created_at - начало интервала, значения - последние
+    в интервале, а *_min/*_max - минимум и максимум за интервал.
+    """
+
+    created_at: datetime.datetime = Field(...)
+    bandwidth: int | None = Field(...)
+    trx_balance: int | None = Field(...)
+    energy: int | None = Field(...)
+    bandwidth_min: int | None = Field(None)
+    bandwidth_max: int | None = Field(None)
+    trx_balance_min: int | None = Field(None)
+    trx_balance_max: int | None = Field(None)
+    energy_min: int | None = Field(None)
+    energy_max: int | None = Field(None)
+
+
+class AccFilterSchema(BaseModel):
+    """Схема фильтров по последним снимкам аккаунтов."""
+
+    addr_prefix: str | None = Field(None, min_length=1)
+    min_bandwidth: int | None = Field(None)
+    max_bandwidth: int | None = Field(None)
+    min_trx_balance: int | None = Field(None)
+    max_trx_balance: int | None = Field(None)
+    min_energy: int | None = Field(None)
+    max_energy: int | None = Field(None)
+
+
+class AccFieldStatsSchema(BaseModel):
+    """Схема статистики по одному полю снимков."""
+
+    sum: int | None = Field(...)
+    avg: float | None = Field(...)
+    min: int | None = Field(...)
+    max: int | None = Field(...)
+    percentiles: dict[str, float | None] = Field(...)
+    above_thresholds: dict[str, int] = Field(...)
+
+
+class AccStatsSchema(BaseModel):
+    """Схема агрегированной статистики по последним снимкам."""
+
+    accounts_count: int = Field(...)
+    bandwidth: AccFieldStatsSchema = Field(...)
+    trx_balance: AccFieldStatsSchema = Field(...)
+    energy: AccFieldStatsSchema = Field(...)
@@ -0,0 +1,47 @@
+"""Модуль содержит схемы фоновых заданий снятия снимков."""
+import datetime
+
+from pydantic import BaseModel, Field
+
+from app.config import settings
+
+
+class JobInputSchema(BaseModel):
+    """Схема POST задания на снятие снимков пакета адресов."""
+
+    acc_addrs: list[str] = Field(
+        ..., min_length=1, max_length=settings.job_max_addresses,
+    )
+
+
+class JobCreatedSchema(BaseModel):
+    """Схема ответа на постановку задания."""
+
+    job_id: int = Field(...)
+    status: str = Field(...)
+    total: int = Field(...)
+
+
+class JobFailureSchema(BaseModel):
+    """Схема ошибки обработки адреса в задании."""
+
+    acc_addr: str = Field(...)
+    message: str | None = Field(None)
+
+
+class JobStatusSchema(BaseModel):
+    """Схема состояния задания."""
+
+    job_id: int = Field(...)
+    status: str = Field(...)
+    total: int = Field(...)
+    processed: int = Field(...)
+    inserted: int = Field(...)
+    failed: int = Field(...)
+    created_at: datetime.datetime = Field(...)
+    started_at: datetime.datetime | None = Field(None)
+    finished_at: datetime.datetime | None = Field(None)
+    throughput: float | None = Field(
+        None, description='Обработано адресов в секунду',
+    )
+    failures: list[JobFailureSchema] = Field(default_factory=list)
@@ -0,0 +1,29 @@
+"""Модуль содержит схемы служебных данных сервиса."""
+from pydantic import BaseModel, Field
+
+
+class PoolStatsSchema(BaseModel):
+    """Схема статистики пула соединений с БД."""
+
+    pool_class: str = Field(...)
+    size: int | None = Field(None)
+    checked_in: int | None = Field(None)
+    checked_out: int | None = Field(None)
+    overflow: int | None = Field(None)
+    wait_count: int | None = Field(None)
+    wait_time_total: float | None = Field(None)
+    wait_time_avg: float | None = Field(None)
+    wait_time_max: float | None = Field(None)
+    timeouts: int | None = Field(None)
+
+
+class CacheStatsSchema(BaseModel):
+    """Схема статистики кеша."""
+
+    size: int = Field(...)
+    max_size: int = Field(...)
+    ttl: float = Field(...)
+    in_flight: int = Field(...)
+    hits: int = Field(...)
+    misses: int = Field(...)
+    coalesced: int = Field(...)
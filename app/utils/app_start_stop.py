@@ -2,10 +2,16 @@
 from contextlib import asynccontextmanager
 import typing
 
+from app.classes.acc_worker import AccountWorker
+from app.classes.job_worker import SnapshotJobWorker
+from app.classes.partition_maintainer import AccountPartitionMaintainer
+from app.classes.refresh_scheduler import AccountRefreshScheduler
+from app.classes.shard_coordinator import ShardCoordinator
 import app.config as config
+import app.database as db
 import app.utils.tron_client as tc
+import app.utils.write_buffer as wb
 import fastapi
-import tronpy
 
 app_settings = config.get_settings()
 
@@ -13,8 +19,50 @@ app_settings = config.get_settings()
 @asynccontextmanager
 async def app_lifespan(app: fastapi.FastAPI) -> typing.AsyncGenerator:
     """Лайфспан функция для старта-стопа приложения(по новому образцу)."""
+    refresh_scheduler = None
+    shard_coordinator = None
+    partition_maintainer = None
+    job_worker = None
     try:
-        tc.tron_client = tronpy.AsyncTron(network='nile')
+        tc.tron_client = tc.create_tron_client(app_settings)
+        if db.replica_router is not None:
+            db.replica_router.start()
+        if app_settings.write_behind_enabled:
+            wb.write_buffer = wb.AccountWriteBuffer(
+                app_settings, AccountWorker.insert_bulk_data_in_bd,
+            )
+            wb.write_buffer.start()
+        if app_settings.partition_maintenance_enabled:
+            partition_maintainer = AccountPartitionMaintainer(app_settings)
+            partition_maintainer.start()
+        if app_settings.coordination_enabled:
+            shard_coordinator = ShardCoordinator(app_settings)
+            # Шарды нужны планировщику уже к первому проходу.
+            await shard_coordinator.renew()
+            shard_coordinator.start()
+        if app_settings.refresh_enabled:
+            refresh_scheduler = AccountRefreshScheduler(
+                app_settings, coordinator=shard_coordinator,
+            )
+            refresh_scheduler.start()
+        if app_settings.jobs_enabled:
+            job_worker = SnapshotJobWorker(app_settings)
+            job_worker.start()
         yield
     finally:
-        pass
+        if job_worker is not None:
+            await job_worker.stop()
+        if refresh_scheduler is not None:
+            await refresh_scheduler.stop()
+        if shard_coordinator is not None:
+            await shard_coordinator.stop()
+        if partition_maintainer is not None:
+            await partition_maintainer.stop()
+        if wb.write_buffer is not None:
+            await wb.write_buffer.stop()
+            wb.write_buffer = None
+        if tc.tron_client is not None:
+            await tc.tron_client.close()
+        if db.replica_router is not None:
+            await db.replica_router.stop()
+        await db.async_engine.dispose()
@@ -0,0 +1,96 @@
+"""Модуль с асинхронным TTL-кешем со слиянием одновременных запросов."""
+import asyncio
+import collections
+import time
+import typing
+
+
+class CoalescingTTLCache:
+    """LRU-кеш с ограниченным временем жизни записей.
+
+    Одновременные промахи по одному ключу разделяют один выполняющийся
+    запрос вместо того, чтобы каждый шёл к источнику данных. Ошибки
+    не кешируются.
+    """
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._items: collections.OrderedDict = collections.OrderedDict()
+        self._in_flight: dict[typing.Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_fetch(
+        self,
+        key: typing.Hashable,
+        fetch: typing.Callable[[], typing.Awaitable],
+        cacheable: typing.Callable[[typing.Any], bool] | None = None,
+    ) -> typing.Any:
+        """Выдаёт значение из кеша или получает его вызовом fetch.
+
+        Если задан cacheable, сохраняются только значения, для которых
+        он вернул True.
+        """
+        item = self._items.get(key)
+        if item is not None:
+            expires_at, value = item
+            if expires_at > time.monotonic():
+                self._items.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._items[key]
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(fetch())
+            self._in_flight[key] = task
+            task.add_done_callback(
+                lambda done_task: self._on_fetched(key, done_task, cacheable)
+            )
+        # shield: отмена одного из ожидающих не отменяет запрос остальным.
+        return await asyncio.shield(task)
+
+    def _on_fetched(
+        self,
+        key: typing.Hashable,
+        task: asyncio.Task,
+        cacheable: typing.Callable[[typing.Any], bool] | None,
+    ) -> None:
+        self._in_flight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        if cacheable is not None and not cacheable(task.result()):
+            return
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        self._items[key] = (time.monotonic() + self.ttl, task.result())
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def invalidate(self, key: typing.Hashable) -> None:
+        """Удаляет значение по ключу из кеша."""
+        self._items.pop(key, None)
+
+    def clear(self) -> None:
+        """Очищает кеш и счётчики."""
+        self._items.clear()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def stats(self) -> dict:
+        """Статистика работы кеша."""
+        return {
+            'size': len(self._items),
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'in_flight': len(self._in_flight),
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+        }
@@ -0,0 +1,23 @@
+"""Модуль с кодированием непрозрачных курсоров пагинации."""
+import base64
+import json
+
+
+def encode_cursor(values: list) -> str:
+    """Кодирует значения ключа последней строки страницы в курсор."""
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> list:
+    """Декодирует курсор в значения ключа, пустой курсор - начало выборки."""
+    if not cursor:
+        return []
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as exc:
+        raise ValueError(f'Некорректный курсор {cursor}') from exc
+    if not isinstance(values, list):
+        raise ValueError(f'Некорректный курсор {cursor}')
+    return values
@@ -0,0 +1,36 @@
+"""Модуль с кодированием строк выгрузки аккаунтов в NDJSON и CSV."""
+import csv
+import io
+
+import app.utils.fast_json as fast_json
+
+EXPORT_FIELDS = (
+    'acc_addr', 'bandwidth', 'trx_balance', 'energy', 'created_at',
+)
+
+EXPORT_MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def encode_ndjson(rows: list) -> str:
+    """Кодирует пачку строк БД в NDJSON.
+
+    Кодирование то же, что у JSON-эндпоинтов, поэтому даты совпадают
+    с ними по формату (ISO 8601).
+    """
+    return ''.join(
+        fast_json.dumps(dict(zip(EXPORT_FIELDS, row))).decode() + '\n'
+        for row in rows
+    )
+
+
+def encode_csv(rows: list, with_header: bool = False) -> str:
+    """Кодирует пачку строк БД в CSV."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if with_header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows(rows)
+    return buffer.getvalue()
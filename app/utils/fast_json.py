@@ -0,0 +1,21 @@
+"""Модуль с быстрым кодированием строк из БД в JSON."""
+import typing
+
+import pydantic_core
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def dumps(obj: typing.Any) -> bytes:
+    """Кодирует в JSON данные из простых типов и datetime.
+
+    Модели не строятся и не валидируются: данные должны уже иметь форму
+    ответа. Используется orjson, если он установлен, иначе сериализатор
+    pydantic-core.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return pydantic_core.to_json(obj)
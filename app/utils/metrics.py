@@ -0,0 +1,314 @@
+"""Модуль с метриками сервиса в текстовом формате Prometheus."""
+import bisect
+import contextlib
+import time
+import typing
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+import httpx
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def escape_label_value(value: str) -> str:
+    """Экранирует значение метки по правилам формата Prometheus."""
+    return value.replace(
+        '\\', '\\\\'
+    ).replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names: tuple, values: tuple) -> str:
+    """Собирает блок меток вида {a="1",b="2"}."""
+    if not names:
+        return ''
+    pairs = ','.join(
+        f'{name}="{escape_label_value(value)}"'
+        for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+def format_value(value: float) -> str:
+    """Форматирует число для вывода метрики."""
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def get_error_type(exc: BaseException) -> str:
+    """Тип ошибки для меток: код ответа узла или имя класса исключения."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return f'http_{exc.response.status_code}'
+    return type(exc).__name__
+
+
+class Metric:
+    """Базовая метрика с набором меток."""
+
+    type_name = ''
+
+    def __init__(
+        self, name: str, documentation: str, label_names: tuple = (),
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: dict[tuple, typing.Any] = {}
+
+    def get_key(self, labels: dict) -> tuple:
+        """Ключ серии по значениям меток."""
+        if set(labels) != set(self.label_names):
+            raise ValueError(
+                f'Метрика {self.name} ожидает метки {self.label_names}'
+            )
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def clear(self) -> None:
+        """Сбрасывает все серии метрики."""
+        self._values.clear()
+
+    def render_samples(self) -> list[str]:
+        """Строки значений метрики."""
+        return [
+            f'{self.name}{format_labels(self.label_names, key)} '
+            f'{format_value(value)}'
+            for key, value in self._values.items()
+        ]
+
+    def render(self) -> str:
+        """Метрика в текстовом формате Prometheus."""
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type_name}',
+        ]
+        lines.extend(self.render_samples())
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    """Монотонно растущий счётчик."""
+
+    type_name = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """Увеличивает счётчик."""
+        key = self.get_key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        """Текущее значение серии."""
+        return self._values.get(self.get_key(labels), 0)
+
+
+class Gauge(Counter):
+    """Значение, которое может как расти, так и уменьшаться."""
+
+    type_name = 'gauge'
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        """Уменьшает значение."""
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        """Устанавливает значение."""
+        self._values[self.get_key(labels)] = value
+
+
+class Histogram(Metric):
+    """Гистограмма распределения величины (обычно длительности)."""
+
+    type_name = 'histogram'
+
+    def __init__(
+        self, name: str, documentation: str, label_names: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        """Добавляет наблюдение."""
+        key = self.get_key(labels)
+        series = self._values.get(key)
+        if series is None:
+            series = self._values[key] = {
+                'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0,
+            }
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series['buckets'][index] += 1
+        series['sum'] += value
+        series['count'] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels) -> typing.Iterator[None]:
+        """Замеряет длительность блока, в том числе завершённого ошибкой."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def get(self, **labels) -> dict | None:
+        """Текущее состояние серии."""
+        return self._values.get(self.get_key(labels))
+
+    def render_samples(self) -> list[str]:
+        lines = []
+        bucket_names = self.label_names + ('le',)
+        for key, series in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, series['buckets']):
+                cumulative += bucket_count
+                labels = format_labels(
+                    bucket_names, key + (format_value(float(bound)),)
+                )
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = format_labels(bucket_names, key + ('+Inf',))
+            lines.append(f'{self.name}_bucket{labels} {series["count"]}')
+            labels = format_labels(self.label_names, key)
+            lines.append(
+                f'{self.name}_sum{labels} {format_value(series["sum"])}'
+            )
+            lines.append(f'{self.name}_count{labels} {series["count"]}')
+        return lines
+
+
+class MetricsRegistry:
+    """Реестр метрик процесса."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> typing.Any:
+        """Регистрирует метрику, имена должны быть уникальны."""
+        if metric.name in self._metrics:
+            raise ValueError(f'Метрика {metric.name} уже зарегистрирована')
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, *args, **kwargs) -> Counter:
+        """Создаёт и регистрирует счётчик."""
+        return self.register(Counter(*args, **kwargs))
+
+    def gauge(self, *args, **kwargs) -> Gauge:
+        """Создаёт и регистрирует gauge."""
+        return self.register(Gauge(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        """Создаёт и регистрирует гистограмму."""
+        return self.register(Histogram(*args, **kwargs))
+
+    def clear(self) -> None:
+        """Сбрасывает значения всех метрик."""
+        for metric in self._metrics.values():
+            metric.clear()
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus."""
+        return '\n'.join(
+            metric.render() for metric in self._metrics.values()
+        ) + '\n'
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: длительность и число запросов в обработке.
+
+    Эндпоинт определяется шаблоном пути маршрута, чтобы число серий не
+    зависело от значений параметров пути.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send,
+    ) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        method = scope['method']
+        endpoint = get_endpoint(scope)
+        status = ['500']
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                status[0] = str(message['status'])
+            await send(message)
+
+        http_requests_in_flight.inc(method=method, endpoint=endpoint)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec(method=method, endpoint=endpoint)
+            http_request_duration.observe(
+                time.perf_counter() - start,
+                method=method, endpoint=endpoint, status=status[0],
+            )
+
+
+def get_endpoint(scope: Scope) -> str:
+    """Шаблон пути маршрута, которому соответствует запрос."""
+    app = scope.get('app')
+    router = getattr(app, 'router', None)
+    for route in getattr(router, 'routes', ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, 'path', 'unmatched')
+    return 'unmatched'
+
+
+registry = MetricsRegistry()
+
+http_requests_in_flight = registry.gauge(
+    'http_requests_in_flight',
+    'Число HTTP-запросов в обработке.',
+    ('method', 'endpoint'),
+)
+http_request_duration = registry.histogram(
+    'http_request_duration_seconds',
+    'Длительность обработки HTTP-запросов.',
+    ('method', 'endpoint', 'status'),
+)
+worker_stage_duration = registry.histogram(
+    'account_worker_stage_duration_seconds',
+    'Длительность этапов обработки в AccountWorker.',
+    ('stage',),
+)
+worker_errors = registry.counter(
+    'account_worker_errors_total',
+    'Ошибки этапов AccountWorker по типам.',
+    ('stage', 'error_type'),
+)
+tron_call_duration = registry.histogram(
+    'tron_call_duration_seconds',
+    'Длительность попыток вызова узла TRON.',
+    ('method',),
+)
+tron_call_errors = registry.counter(
+    'tron_call_errors_total',
+    'Ошибки вызовов узла TRON по типам.',
+    ('method', 'error_type'),
+)
+db_query_duration = registry.histogram(
+    'db_query_duration_seconds',
+    'Длительность SQL-запросов по типу операции.',
+    ('operation',),
+)
+db_replica_healthy = registry.gauge(
+    'db_replica_healthy',
+    'Доступность реплики БД по последней проверке (1 - доступна).',
+    ('replica',),
+)
+db_replica_lag = registry.gauge(
+    'db_replica_lag_seconds',
+    'Отставание реплики БД от основной.',
+    ('replica',),
+)
@@ -0,0 +1,80 @@
+"""Модуль с выборочным профилированием отдельных запросов."""
+import cProfile
+import datetime
+import io
+import logging
+import os
+import pstats
+import random
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import AppSettings
+from app.utils.metrics import get_endpoint
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b'x-profile'
+
+
+class ProfilingMiddleware:
+    """ASGI-middleware: профилирует запрос через cProfile.
+
+    Запрос профилируется, если передан заголовок X-Profile или он попал
+    в выборку profiling_sample_rate. Одновременно профилируется только
+    один запрос; cProfile учитывает и другие корутины, работавшие в это
+    время в том же цикле событий, поэтому профиль снимается с
+    ненагруженного экземпляра. Сводка пишется в журнал, а при заданном
+    profiling_dir - ещё и .prof-файл для snakeviz/pstats.
+    """
+
+    def __init__(self, app: ASGIApp, app_settings: AppSettings) -> None:
+        self.app = app
+        self.app_settings = app_settings
+        self._active = False
+
+    def should_profile(self, scope: Scope) -> bool:
+        """Нужно ли профилировать запрос."""
+        if not self.app_settings.profiling_enabled or self._active:
+            return False
+        headers = dict(scope.get('headers', ()))
+        if headers.get(PROFILE_HEADER, b'').lower() in (b'1', b'true'):
+            return True
+        return random.random() < self.app_settings.profiling_sample_rate
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send,
+    ) -> None:
+        if scope['type'] != 'http' or not self.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        self._active = True
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.disable()
+            self._active = False
+            self.report(profiler, scope)
+
+    def report(self, profiler: cProfile.Profile, scope: Scope) -> None:
+        """Пишет сводку профиля в журнал и, если задано, в файл."""
+        endpoint = get_endpoint(scope)
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(
+            self.app_settings.profiling_top
+        )
+        logger.info(
+            'Профиль запроса %s %s:\n%s',
+            scope['method'], endpoint, stream.getvalue(),
+        )
+        if self.app_settings.profiling_dir:
+            file_name = '{}_{}.prof'.format(
+                datetime.datetime.now().strftime('%Y%m%dT%H%M%S%f'),
+                endpoint.strip('/').replace('/', '_') or 'root',
+            )
+            stats.dump_stats(
+                os.path.join(self.app_settings.profiling_dir, file_name)
+            )
@@ -0,0 +1,137 @@
+"""Модуль с выбором реплики БД для запросов на чтение."""
+import asyncio
+import itertools
+import logging
+
+from app.config import AppSettings
+import app.utils.metrics as metrics
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+logger = logging.getLogger(__name__)
+
+# Отставание считается нулевым, если всё полученное WAL уже применено:
+# иначе на простаивающем мастере оно бы росло без реальных изменений.
+REPLICA_LAG_QUERY = sa.text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+    """
+)
+
+
+class Replica:
+    """Реплика: движок, фабрика сессий и последнее известное состояние."""
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.name = f'{engine.url.host}:{engine.url.port or 5432}'
+        self.session_factory = sessionmaker(  # type: ignore
+            engine, class_=AsyncSession,
+        )
+        self.healthy = False
+        self.lag: float | None = None
+        self.in_use = 0
+
+
+class ReplicaRouter:
+    """Выбор реплики для чтения с проверкой здоровья и отставания.
+
+    Пока реплика не прошла проверку, недоступна или отстаёт больше чем
+    на replica_max_lag секунд, она не выбирается; если подходящих реплик
+    нет, choose возвращает None и чтение идёт с основной БД.
+    """
+
+    def __init__(
+        self, engines: list[AsyncEngine], app_settings: AppSettings,
+    ) -> None:
+        self.replicas = [Replica(engine) for engine in engines]
+        self.selection = app_settings.replica_selection
+        self.max_lag = app_settings.replica_max_lag
+        self.check_interval = app_settings.replica_check_interval
+        self.check_timeout = app_settings.replica_check_timeout
+        self._counter = itertools.count()
+        self._stop_event = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def is_usable(self, replica: Replica) -> bool:
+        """Можно ли читать с реплики."""
+        return (
+            replica.healthy and replica.lag is not None
+            and replica.lag <= self.max_lag
+        )
+
+    def choose(self) -> Replica | None:
+        """Выбирает реплику или None, если читать нужно с основной БД."""
+        usable = [
+            replica for replica in self.replicas if self.is_usable(replica)
+        ]
+        if not usable:
+            return None
+        if self.selection == 'least_connections':
+            return min(usable, key=lambda replica: replica.in_use)
+        return usable[next(self._counter) % len(usable)]
+
+    def mark_failed(self, replica: Replica) -> None:
+        """Исключает реплику до следующей успешной проверки."""
+        if replica.healthy:
+            logger.warning('Реплика %s недоступна', replica.name)
+        replica.healthy = False
+        metrics.db_replica_healthy.set(0, replica=replica.name)
+
+    async def check(self, replica: Replica) -> None:
+        """Проверяет доступность и отставание реплики."""
+        try:
+            lag = await asyncio.wait_for(
+                ReplicaRouter.fetch_lag(replica), self.check_timeout
+            )
+        except Exception:
+            self.mark_failed(replica)
+            return
+        replica.lag = float(lag or 0)
+        replica.healthy = True
+        metrics.db_replica_healthy.set(1, replica=replica.name)
+        metrics.db_replica_lag.set(replica.lag, replica=replica.name)
+
+    @staticmethod
+    async def fetch_lag(replica: Replica) -> float | None:
+        """Запрашивает у реплики отставание в секундах."""
+        async with replica.engine.connect() as conn:
+            return (await conn.execute(REPLICA_LAG_QUERY)).scalar()
+
+    async def check_all(self) -> None:
+        """Проверяет все реплики параллельно."""
+        await asyncio.gather(
+            *(self.check(replica) for replica in self.replicas)
+        )
+
+    def start(self) -> None:
+        """Запускает фоновые проверки реплик."""
+        self._stop_event.clear()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Останавливает проверки и закрывает соединения с репликами."""
+        self._stop_event.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    async def run(self) -> None:
+        """Цикл проверок до остановки."""
+        while not self._stop_event.is_set():
+            await self.check_all()
+            try:
+                await asyncio.wait_for(
+                    self._stop_event.wait(), self.check_interval
+                )
+            except asyncio.TimeoutError:
+                pass
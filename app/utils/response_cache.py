@@ -0,0 +1,97 @@
+"""Модуль с кешем сериализованных ответов и поддержкой ETag."""
+import collections
+import hashlib
+import time
+import typing
+
+from app.config import settings
+from app.utils.async_cache import CoalescingTTLCache
+import fastapi
+
+
+class CachedResponse(typing.NamedTuple):
+    """Сериализованный ответ из кеша."""
+
+    body: bytes
+    etag: str
+    headers: dict
+
+
+class VersionedResponseCache:
+    """LRU-кеш ответов с TTL, сбрасываемый повышением версии данных.
+
+    Версия повышается после каждой записи в БД, поэтому ответы,
+    собранные до неё, больше не выдаются.
+    """
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.version = 0
+        self._items: collections.OrderedDict = collections.OrderedDict()
+
+    def get(self, key: typing.Hashable) -> CachedResponse | None:
+        """Выдаёт актуальный ответ по ключу."""
+        item = self._items.get(key)
+        if item is None:
+            return None
+        version, expires_at, response = item
+        if version != self.version or expires_at <= time.monotonic():
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return response
+
+    def put(
+        self,
+        key: typing.Hashable,
+        body: bytes,
+        version: int,
+        headers: dict | None = None,
+    ) -> CachedResponse:
+        """Сохраняет ответ, собранный на версии данных version."""
+        response = CachedResponse(
+            body, f'"{hashlib.sha1(body).hexdigest()}"', headers or {},
+        )
+        if version == self.version and self.ttl > 0 and self.max_size > 0:
+            self._items[key] = (
+                version, time.monotonic() + self.ttl, response,
+            )
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return response
+
+    def bump_version(self) -> None:
+        """Помечает все сохранённые ответы устаревшими."""
+        self.version += 1
+
+    def clear(self) -> None:
+        """Очищает кеш."""
+        self._items.clear()
+
+
+def build_response(
+    request: fastapi.Request, cached: CachedResponse,
+) -> fastapi.Response:
+    """Собирает JSON-ответ или 304, если у клиента та же версия."""
+    headers = {'ETag': cached.etag, **cached.headers}
+    if_none_match = request.headers.get('If-None-Match', '')
+    if cached.etag in (tag.strip() for tag in if_none_match.split(',')):
+        return fastapi.Response(status_code=304, headers=headers)
+    return fastapi.Response(
+        cached.body, media_type='application/json', headers=headers,
+    )
+
+
+accounts_page_cache = VersionedResponseCache(
+    settings.page_cache_ttl, settings.page_cache_max_size,
+)
+
+accounts_stats_cache = VersionedResponseCache(
+    settings.stats_cache_ttl, settings.stats_cache_max_size,
+)
+
+idempotency_cache = CoalescingTTLCache(
+    settings.idempotency_ttl, settings.idempotency_max_size,
+)
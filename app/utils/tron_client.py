@@ -1,4 +1,51 @@
 """Модуль с клиентом TRON."""
+from app.config import AppSettings, settings
+from app.utils.async_cache import CoalescingTTLCache
+from app.utils.tron_guard import TronCallGuard
+from app.utils.tron_simulator import TronSimulator
+import httpx
 import tronpy
+from tronpy.defaults import conf_for_name
+from tronpy.providers.async_http import AsyncHTTPProvider
 
 tron_client: tronpy.AsyncTron = None
+
+tron_data_cache = CoalescingTTLCache(
+    settings.tron_cache_ttl, settings.tron_cache_max_size,
+)
+
+tron_guard = TronCallGuard(settings)
+
+
+def create_tron_client(app_settings: AppSettings) -> tronpy.AsyncTron:
+    """Создаёт клиент TRON с общим пулом HTTP-соединений из настроек.
+
+    При tron_provider='simulator' запросы обслуживает TronSimulator в том
+    же процессе, без сети.
+    """
+    transport = None
+    if app_settings.tron_provider == 'simulator':
+        transport = httpx.MockTransport(TronSimulator(app_settings).handle)
+    headers = {}
+    if app_settings.tron_api_key:
+        headers['TRON-PRO-API-KEY'] = app_settings.tron_api_key
+    http_client = httpx.AsyncClient(
+        headers=headers,
+        timeout=httpx.Timeout(app_settings.tron_timeout),
+        limits=httpx.Limits(
+            max_connections=app_settings.tron_max_connections,
+            max_keepalive_connections=(
+                app_settings.tron_max_keepalive_connections
+            ),
+            keepalive_expiry=app_settings.tron_keepalive_expiry,
+        ),
+        transport=transport,
+    )
+    provider = AsyncHTTPProvider(
+        app_settings.tron_endpoint_uri
+        or conf_for_name(app_settings.tron_network),
+        timeout=app_settings.tron_timeout,
+        client=http_client,
+        api_key=app_settings.tron_api_key,
+    )
+    return tronpy.AsyncTron(provider, network=app_settings.tron_network)
@@ -0,0 +1,222 @@
+"""Модуль с ограничением частоты, повторами и предохранителем вызовов TRON."""
+import asyncio
+import random
+import time
+import typing
+
+from app.config import AppSettings
+import app.utils.metrics as metrics
+import httpx
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Предохранитель разомкнут: узел TRON считается недоступным."""
+
+
+class TokenBucket:
+    """Ограничитель частоты по алгоритму token bucket.
+
+    После отказа узла по квоте (429) частота снижается вдвое, но не ниже
+    десятой части заданной, и восстанавливается понемногу с каждым
+    успешным вызовом.
+    """
+
+    MIN_RATE_FACTOR = 0.1
+    RECOVERY_FACTOR = 0.05
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+
+    async def acquire(self) -> None:
+        """Забирает токен, при нехватке ждёт своей очереди.
+
+        Токен резервируется сразу (запас может уйти в минус), поэтому
+        ожидающие обслуживаются в порядке обращения без блокировки.
+        """
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated_at) * self.rate,
+        )
+        self._updated_at = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+    def on_rate_limited(self) -> None:
+        """Снижает частоту после отказа узла по квоте."""
+        if self.rate > 0:
+            self.rate = max(
+                self.base_rate * self.MIN_RATE_FACTOR, self.rate / 2
+            )
+
+    def on_success(self) -> None:
+        """Постепенно возвращает частоту к заданной."""
+        if self.rate > 0:
+            self.rate = min(
+                self.base_rate,
+                self.rate + self.base_rate * self.RECOVERY_FACTOR,
+            )
+
+
+class CircuitBreaker:
+    """Предохранитель: после серии сбоев отклоняет вызовы до таймаута."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def before_call(self) -> bool:
+        """Проверяет, можно ли выполнять вызов.
+
+        Возвращает True, если вызов пробный: только его результат решает,
+        замкнуть предохранитель снова или разомкнуть.
+        """
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError('Узел TRON временно недоступен')
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                raise CircuitOpenError('Узел TRON временно недоступен')
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def on_success(self, is_probe: bool = False) -> None:
+        """Фиксирует успешный вызов.
+
+        Результат обычного вызова, начатого до размыкания, не учитывается,
+        пока предохранитель не замкнут.
+        """
+        if is_probe:
+            self._probe_in_flight = False
+        elif self.state != self.CLOSED:
+            return
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def on_failure(self, is_probe: bool = False) -> None:
+        """Фиксирует сбой узла."""
+        if is_probe:
+            self._probe_in_flight = False
+        elif self.state != self.CLOSED:
+            return
+        self.failures += 1
+        if is_probe or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def release_probe(self) -> None:
+        """Снимает признак пробного вызова, если тот не дал результата.
+
+        Нужен, когда пробный вызов прерван отменой или отказом по квоте:
+        иначе предохранитель навсегда остался бы в полуоткрытом состоянии.
+        """
+        self._probe_in_flight = False
+
+
+def is_rate_limited_error(exc: Exception) -> bool:
+    """Является ли ошибка отказом узла по квоте (429)."""
+    return (
+        isinstance(exc, httpx.HTTPStatusError)
+        and exc.response.status_code == 429
+    )
+
+
+def is_retryable_error(exc: Exception) -> bool:
+    """Является ли ошибка временной (сеть, таймаут, 429, 5xx)."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(exc, (httpx.TransportError, asyncio.TimeoutError))
+
+
+class TronCallGuard:
+    """Обёртка вызовов TRON: частота, параллелизм, повторы, предохранитель."""
+
+    def __init__(self, app_settings: AppSettings) -> None:
+        self.bucket = TokenBucket(
+            app_settings.tron_rate_limit, app_settings.tron_rate_burst,
+        )
+        self.semaphore = asyncio.Semaphore(app_settings.tron_max_in_flight)
+        self.breaker = CircuitBreaker(
+            app_settings.tron_breaker_failure_threshold,
+            app_settings.tron_breaker_reset_timeout,
+        )
+        self.retry_attempts = app_settings.tron_retry_attempts
+        self.retry_base_delay = app_settings.tron_retry_base_delay
+        self.retry_max_delay = app_settings.tron_retry_max_delay
+
+    async def call(
+        self, fetch: typing.Callable[[], typing.Awaitable],
+        method: str = 'call',
+    ) -> typing.Any:
+        """Выполняет вызов TRON с повторами временных ошибок.
+
+        method - имя вызова для меток метрик.
+        """
+        attempt = 0
+        while True:
+            try:
+                is_probe = self.breaker.before_call()
+            except CircuitOpenError as exc:
+                metrics.tron_call_errors.inc(
+                    method=method, error_type=metrics.get_error_type(exc),
+                )
+                raise
+            try:
+                await self.bucket.acquire()
+                async with self.semaphore:
+                    with metrics.tron_call_duration.time(method=method):
+                        result = await fetch()
+            except Exception as exc:
+                metrics.tron_call_errors.inc(
+                    method=method, error_type=metrics.get_error_type(exc),
+                )
+                if is_rate_limited_error(exc):
+                    # Узел жив, но мы превысили квоту: это не сбой узла.
+                    self.bucket.on_rate_limited()
+                elif not is_retryable_error(exc):
+                    # Узел ответил по существу (например, нет аккаунта).
+                    self.breaker.on_success(is_probe)
+                    raise
+                else:
+                    self.breaker.on_failure(is_probe)
+                if attempt >= self.retry_attempts:
+                    raise
+                delay = self.get_retry_delay(attempt, exc)
+            else:
+                self.breaker.on_success(is_probe)
+                self.bucket.on_success()
+                return result
+            finally:
+                if is_probe:
+                    self.breaker.release_probe()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def get_retry_delay(self, attempt: int, exc: Exception) -> float:
+        """Экспоненциальная задержка с джиттером, с учётом Retry-After."""
+        delay = min(
+            self.retry_max_delay, self.retry_base_delay * 2 ** attempt
+        )
+        if isinstance(exc, httpx.HTTPStatusError):
+            retry_after = exc.response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(self.retry_max_delay, float(retry_after))
+        return random.uniform(delay / 2, delay)
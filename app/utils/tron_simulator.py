@@ -0,0 +1,146 @@
+"""Модуль с имитатором узла TRON для работы без сети."""
+import asyncio
+import hashlib
+import json
+import math
+import random
+
+from app.config import AppSettings
+import httpx
+import tronpy.keys
+
+
+def make_addresses(count: int, seed: int = 0) -> list[str]:
+    """Детерминированный набор корректных base58-адресов TRON."""
+    rnd = random.Random(seed)
+    return [
+        tronpy.keys.to_base58check_address(
+            b'\x41' + rnd.getrandbits(160).to_bytes(20, 'big')
+        )
+        for _ in range(count)
+    ]
+
+
+def get_address_seed(acc_addr: str) -> int:
+    """Стабильное между процессами число, выведенное из адреса."""
+    return int.from_bytes(
+        hashlib.blake2b(acc_addr.encode(), digest_size=8).digest(), 'big',
+    )
+
+
+class TronSimulator:
+    """Имитатор HTTP API узла TRON (wallet/getaccount и соседи).
+
+    Подключается к httpx.AsyncClient через MockTransport, поэтому
+    tronpy, TronCallGuard и метрики работают как с настоящим узлом.
+    Данные аккаунтов выводятся из адреса, так что популяция адресов
+    любого размера не занимает памяти. Задержка, доля ошибок 503, ответов
+    429 и отсутствующих аккаунтов задаются настройками tron_sim_*;
+    tron_sim_capacity ограничивает число одновременно обслуживаемых
+    запросов, остальные ждут в очереди, как на перегруженном узле.
+    """
+
+    def __init__(self, app_settings: AppSettings) -> None:
+        self.distribution = app_settings.tron_sim_latency_distribution
+        self.latency_ms = app_settings.tron_sim_latency_ms
+        self.spread_ms = app_settings.tron_sim_latency_spread_ms
+        self.sigma = app_settings.tron_sim_latency_sigma
+        self.error_rate = app_settings.tron_sim_error_rate
+        self.rate_limit_rate = app_settings.tron_sim_rate_limit_rate
+        self.missing_rate = app_settings.tron_sim_missing_rate
+        self.random = random.Random(app_settings.tron_sim_seed)
+        self.semaphore = (
+            asyncio.Semaphore(app_settings.tron_sim_capacity)
+            if app_settings.tron_sim_capacity > 0 else None
+        )
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+
+    def get_latency(self) -> float:
+        """Задержка ответа в секундах по выбранному распределению."""
+        if self.distribution == 'constant':
+            latency_ms = self.latency_ms
+        elif self.distribution == 'uniform':
+            latency_ms = self.random.uniform(
+                self.latency_ms - self.spread_ms,
+                self.latency_ms + self.spread_ms,
+            )
+        elif self.distribution == 'normal':
+            latency_ms = self.random.gauss(self.latency_ms, self.spread_ms)
+        elif self.distribution == 'lognormal':
+            latency_ms = (
+                self.random.lognormvariate(
+                    math.log(self.latency_ms), self.sigma
+                )
+                if self.latency_ms > 0 else 0
+            )
+        else:
+            latency_ms = (
+                self.random.expovariate(1 / self.latency_ms)
+                if self.latency_ms > 0 else 0
+            )
+        return max(latency_ms, 0) / 1000
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """Обрабатывает запрос клиента TRON."""
+        self.requests += 1
+        if self.semaphore is None:
+            return await self.respond(request)
+        async with self.semaphore:
+            return await self.respond(request)
+
+    async def respond(self, request: httpx.Request) -> httpx.Response:
+        """Ответ после имитации задержки и сбоев."""
+        latency = self.get_latency()
+        if latency > 0:
+            await asyncio.sleep(latency)
+        roll = self.random.random()
+        if roll < self.rate_limit_rate:
+            self.rate_limited += 1
+            return httpx.Response(
+                429, headers={'Retry-After': '1'},
+                json={'Error': 'rate limit'},
+            )
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.errors += 1
+            return httpx.Response(503, json={'Error': 'unavailable'})
+        method = request.url.path.strip('/')
+        try:
+            acc_addr = json.loads(request.content or b'{}')['address']
+        except (KeyError, ValueError):
+            return httpx.Response(400, json={'Error': 'bad request'})
+        seed = get_address_seed(acc_addr)
+        if (seed % 10000) / 10000 < self.missing_rate:
+            return httpx.Response(200, json={})
+        if method == 'wallet/getaccount':
+            return httpx.Response(200, json={
+                'address': acc_addr,
+                'balance': seed % 10 ** 12,
+                'create_time': 1_600_000_000_000 + seed % 10 ** 11,
+                'account_resource': {
+                    'energy_window_size': (seed >> 8) % 28800,
+                },
+            })
+        if method == 'wallet/getaccountnet':
+            return httpx.Response(200, json={
+                'freeNetLimit': 600,
+                'freeNetUsed': (seed >> 16) % 600,
+                'NetLimit': (seed >> 24) % 5000,
+                'NetUsed': 0,
+            })
+        if method == 'wallet/getaccountresource':
+            return httpx.Response(200, json={
+                'freeNetLimit': 600,
+                'EnergyLimit': (seed >> 32) % 100000,
+                'EnergyUsed': 0,
+            })
+        return httpx.Response(404, json={'Error': f'unknown {method}'})
+
+    def stats(self) -> dict:
+        """Счётчики обработанных запросов."""
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'rate_limited': self.rate_limited,
+        }
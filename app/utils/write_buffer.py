@@ -0,0 +1,113 @@
+"""Модуль с буфером отложенной (write-behind) записи снимков в БД."""
+import asyncio
+import logging
+import typing
+
+from app.config import AppSettings
+from app.database import db_session
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBufferFullError(Exception):
+    """Очередь отложенной записи переполнена."""
+
+
+class AccountWriteBuffer:
+    """Буфер, копящий строки из разных запросов и пишущий их пачками.
+
+    Пачка сбрасывается при наборе batch_size строк или по истечении
+    flush_interval с момента появления первой строки.
+    """
+
+    def __init__(
+        self,
+        app_settings: AppSettings,
+        insert_func: typing.Callable[..., typing.Awaitable],
+        db_factory=db_session,
+    ) -> None:
+        self.batch_size = app_settings.write_behind_batch_size
+        self.flush_interval = app_settings.write_behind_flush_interval
+        self.put_timeout = app_settings.write_behind_put_timeout
+        self.insert_func = insert_func
+        self.db_factory = db_factory
+        self._queue: asyncio.Queue = asyncio.Queue(
+            app_settings.write_behind_max_queue
+        )
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Запускает фоновую задачу сброса буфера."""
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Сбрасывает всё накопленное и останавливает буфер."""
+        if self._task is not None:
+            await self._queue.put(None)
+            await self._task
+            self._task = None
+
+    async def submit(self, data: dict) -> asyncio.Future:
+        """Ставит строку в очередь.
+
+        Возвращает future, завершающийся после записи строки в БД. Если
+        очередь не освободилась за put_timeout - WriteBufferFullError.
+        """
+        future = asyncio.get_running_loop().create_future()
+        # Ошибку записи не обязательно ждать, помечаем её полученной.
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        try:
+            await asyncio.wait_for(
+                self._queue.put((data, future)), self.put_timeout
+            )
+        except asyncio.TimeoutError:
+            raise WriteBufferFullError('Очередь записи в БД переполнена')
+        return future
+
+    async def run(self) -> None:
+        """Цикл сброса пачек до получения сигнала остановки."""
+        stopping = False
+        while not stopping:
+            batch, stopping = await self.collect_batch()
+            if batch:
+                await self.flush(batch)
+
+    async def collect_batch(self) -> tuple[list, bool]:
+        """Набирает пачку, возвращает её и признак остановки."""
+        item = await self._queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def flush(self, batch: list) -> None:
+        """Пишет пачку одним запросом и завершает futures ожидающих."""
+        try:
+            await self.insert_func(
+                [data for data, _ in batch], self.db_factory()
+            )
+        except Exception as exc:
+            logger.exception('Ошибка записи пачки из %s строк', len(batch))
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(True)
+
+
+write_buffer: AccountWriteBuffer | None = None
@@ -0,0 +1 @@
+"""Нагрузочные замеры API аккаунтов."""
@@ -0,0 +1,260 @@
+"""Нагрузочные замеры API аккаунтов на локальной БД и имитаторе TRON.
+
+Приложение поднимается в том же процессе (ASGI-транспорт httpx) со
+своим лайфспаном, а клиент TRON подменяется имитатором узла
+(tron_provider='simulator') с заданными задержкой и долей сбоев. Нужна
+локальная Postgres с применёнными миграциями (POSTGRES_URL). Фоновые
+задачи и ограничение частоты вызовов TRON лучше выключить, чтобы они не
+искажали замеры:
+
+    TRON_RATE_LIMIT=0 REFRESH_ENABLED=false JOBS_ENABLED=false \\
+    PARTITION_MAINTENANCE_ENABLED=false \\
+    python -m benchmarks.bench_api --seed-rows 20000 --output run.json
+
+Результаты пишутся в JSON; два прогона сравнивает benchmarks.compare.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import platform
+import subprocess
+
+import httpx
+
+from app.utils.tron_simulator import make_addresses
+from benchmarks.harness import run_load
+
+SCENARIOS = ('create', 'get', 'cursor', 'bulk')
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenarios', nargs='+', default=SCENARIOS,
+                        choices=SCENARIOS)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--tron-latency-distribution', default='lognormal',
+                        choices=('constant', 'uniform', 'normal',
+                                 'lognormal', 'exponential'))
+    parser.add_argument('--tron-latency-ms', type=float, default=50)
+    parser.add_argument('--tron-latency-spread-ms', type=float, default=20)
+    parser.add_argument('--tron-latency-sigma', type=float, default=0.5)
+    parser.add_argument('--tron-error-rate', type=float, default=0)
+    parser.add_argument('--tron-rate-limit-rate', type=float, default=0)
+    parser.add_argument('--tron-capacity', type=int, default=0)
+    parser.add_argument('--seed-rows', type=int, default=0,
+                        help='сколько адресов записать до замеров')
+    parser.add_argument('--page-sizes', type=int, nargs='+',
+                        default=[20, 100, 300])
+    parser.add_argument('--pages', type=int, nargs='+',
+                        default=[1, 10, 100])
+    parser.add_argument('--bulk-sizes', type=int, nargs='+',
+                        default=[100, 1000])
+    parser.add_argument('--bulk-requests', type=int, default=5)
+    parser.add_argument('--page-cache', action='store_true',
+                        help='не отключать кеш страниц')
+    parser.add_argument('--output', default=None,
+                        help='файл JSON с результатами')
+    return parser.parse_args()
+
+
+def get_git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_simulator_settings(args: argparse.Namespace) -> dict:
+    """Настройки имитатора TRON из аргументов."""
+    return {
+        'tron_provider': 'simulator',
+        'tron_sim_latency_distribution': args.tron_latency_distribution,
+        'tron_sim_latency_ms': args.tron_latency_ms,
+        'tron_sim_latency_spread_ms': args.tron_latency_spread_ms,
+        'tron_sim_latency_sigma': args.tron_latency_sigma,
+        'tron_sim_error_rate': args.tron_error_rate,
+        'tron_sim_rate_limit_rate': args.tron_rate_limit_rate,
+        'tron_sim_capacity': args.tron_capacity,
+    }
+
+
+async def seed_rows(
+    client: httpx.AsyncClient, count: int, chunk_size: int,
+) -> None:
+    """Заполняет БД адресами (клиент TRON должен быть без задержки)."""
+    addrs = make_addresses(count, seed=1000)
+    for start in range(0, count, chunk_size):
+        res = await client.post(
+            '/api/v1/create_accounts_info_bulk',
+            json={'acc_addrs': addrs[start:start + chunk_size]},
+        )
+        res.raise_for_status()
+
+
+async def bench_create(client: httpx.AsyncClient, args) -> list[dict]:
+    addrs = make_addresses(args.requests, seed=1)
+
+    async def call(index: int) -> bool:
+        res = await client.post(
+            '/api/v1/create_account_info', json={'acc_addr': addrs[index]},
+        )
+        return res.status_code == 200 and res.json() == ''
+
+    return [await run_load(
+        'create_account_info', call, args.requests, args.concurrency,
+        {'tron_latency_ms': args.tron_latency_ms},
+    )]
+
+
+async def bench_get(client: httpx.AsyncClient, args) -> list[dict]:
+    results = []
+    for page_size in args.page_sizes:
+        for page in args.pages:
+            params = {'page': page, 'page_size': page_size}
+
+            async def call(index: int, params=params) -> bool:
+                res = await client.get(
+                    '/api/v1/get_accounts_info', params=params,
+                )
+                return res.status_code == 200
+
+            results.append(await run_load(
+                'get_accounts_info', call, args.requests, args.concurrency,
+                params,
+            ))
+    return results
+
+
+async def bench_cursor(client: httpx.AsyncClient, args) -> list[dict]:
+    results = []
+    for page_size in args.page_sizes:
+        for page in args.pages:
+            # Курсор нужной глубины получаем проходом с начала.
+            cursor = ''
+            for _ in range(page - 1):
+                res = await client.get(
+                    '/api/v1/get_accounts_info',
+                    params={'cursor': cursor, 'page_size': page_size},
+                )
+                cursor = res.headers.get('X-Next-Cursor')
+                if cursor is None:
+                    break
+            if cursor is None:
+                continue
+            params = {'cursor': cursor, 'page_size': page_size}
+
+            async def call(index: int, params=params) -> bool:
+                res = await client.get(
+                    '/api/v1/get_accounts_info', params=params,
+                )
+                return res.status_code == 200
+
+            results.append(await run_load(
+                'get_accounts_info_by_cursor', call, args.requests,
+                args.concurrency, {'page': page, 'page_size': page_size},
+            ))
+    return results
+
+
+async def bench_bulk(client: httpx.AsyncClient, args) -> list[dict]:
+    results = []
+    for bulk_size in args.bulk_sizes:
+        addrs = make_addresses(args.bulk_requests * bulk_size, seed=bulk_size)
+
+        async def call(index: int, bulk_size=bulk_size, addrs=addrs) -> bool:
+            res = await client.post(
+                '/api/v1/create_accounts_info_bulk',
+                json={
+                    'acc_addrs':
+                        addrs[index * bulk_size:(index + 1) * bulk_size],
+                },
+            )
+            return res.status_code == 200 and all(
+                result['inserted'] for result in res.json()
+            )
+
+        results.append(await run_load(
+            'create_accounts_info_bulk', call, args.bulk_requests,
+            min(args.concurrency, args.bulk_requests),
+            {'bulk_size': bulk_size, 'tron_latency_ms': args.tron_latency_ms},
+        ))
+    return results
+
+
+async def replace_tron_client(tc, app_settings) -> None:
+    """Закрывает текущий клиент TRON и создаёт новый из настроек."""
+    if tc.tron_client is not None:
+        await tc.tron_client.close()
+    tc.tron_client = tc.create_tron_client(app_settings)
+    tc.tron_data_cache.clear()
+
+
+async def main(args: argparse.Namespace) -> dict:
+    from main import app
+    from app.config import settings
+    import app.utils.metrics as metrics
+    import app.utils.response_cache as rc
+    import app.utils.tron_client as tc
+
+    started_at = datetime.datetime.now().isoformat()
+    sim_settings = get_simulator_settings(args)
+    results = []
+    async with app.router.lifespan_context(app):
+        if not args.page_cache:
+            rc.accounts_page_cache = rc.VersionedResponseCache(0, 0)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url='http://bench', timeout=None,
+        ) as client:
+            if args.seed_rows:
+                await replace_tron_client(tc, settings.model_copy(update={
+                    **sim_settings, 'tron_sim_latency_ms': 0,
+                }))
+                await seed_rows(
+                    client, args.seed_rows, settings.bulk_max_addresses,
+                )
+            await replace_tron_client(
+                tc, settings.model_copy(update=sim_settings)
+            )
+            metrics.registry.clear()
+            for scenario in args.scenarios:
+                bench = globals()[f'bench_{scenario}']
+                results.extend(await bench(client, args))
+    return {
+        'meta': {
+            'started_at': started_at,
+            'git_revision': get_git_revision(),
+            'python': platform.python_version(),
+            'args': vars(args),
+            'tron_calls': sum(
+                (metrics.tron_call_duration.get(method=method) or {}).get(
+                    'count', 0
+                )
+                for method in ('get_account', 'get_bandwidth')
+            ),
+            'settings': settings.model_dump(
+                exclude={'postgres_url', 'tron_api_key'}
+            ),
+        },
+        'results': results,
+    }
+
+
+if __name__ == '__main__':
+    arguments = parse_args()
+    report = asyncio.run(main(arguments))
+    for result in report['results']:
+        print(
+            f"{result['name']:<30} {json.dumps(result['params'])}\n"
+            f"    {result['throughput_rps']:>10} rps"
+            f"  p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms"
+            f"  p99 {result['p99_ms']} ms  errors {result['errors']}"
+        )
+    if arguments.output:
+        with open(arguments.output, 'w') as output:
+            json.dump(report, output, indent=2, default=str)
@@ -0,0 +1,60 @@
+"""Сравнение двух прогонов benchmarks.bench_api.
+
+    python -m benchmarks.compare base.json new.json --threshold 10
+
+Код возврата 1, если p99 вырос или пропускная способность упала больше
+чем на threshold процентов хотя бы в одном замере.
+"""
+import argparse
+import json
+import sys
+
+
+def load_results(path: str) -> dict:
+    with open(path) as report_file:
+        report = json.load(report_file)
+    return {
+        (result['name'], json.dumps(result['params'], sort_keys=True)):
+            result
+        for result in report['results']
+    }
+
+
+def get_change(base: float, new: float) -> float:
+    """Изменение в процентах."""
+    return (new - base) / base * 100 if base else 0.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('base')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=10.0)
+    args = parser.parse_args()
+    base_results = load_results(args.base)
+    new_results = load_results(args.new)
+    regressions = 0
+    for key, new in new_results.items():
+        base = base_results.get(key)
+        if base is None:
+            continue
+        p99_change = get_change(base['p99_ms'], new['p99_ms'])
+        rps_change = get_change(base['throughput_rps'], new['throughput_rps'])
+        regressed = (
+            p99_change > args.threshold or -rps_change > args.threshold
+        )
+        regressions += regressed
+        print(
+            f"{'!' if regressed else ' '} {key[0]:<30} {key[1]}\n"
+            f"    rps {base['throughput_rps']} -> {new['throughput_rps']}"
+            f" ({rps_change:+.1f}%)"
+            f"  p50 {base['p50_ms']} -> {new['p50_ms']}"
+            f"  p95 {base['p95_ms']} -> {new['p95_ms']}"
+            f"  p99 {base['p99_ms']} -> {new['p99_ms']}"
+            f" ({p99_change:+.1f}%)"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
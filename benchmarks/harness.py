@@ -0,0 +1,68 @@
+"""Модуль с замером задержек и пропускной способности под нагрузкой."""
+import asyncio
+import time
+import typing
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Перцентиль с линейной интерполяцией по отсортированному списку."""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = position - lower
+    return (
+        sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+    )
+
+
+async def run_load(
+    name: str,
+    call: typing.Callable[[int], typing.Awaitable[bool]],
+    requests: int,
+    concurrency: int,
+    params: dict | None = None,
+) -> dict:
+    """Выполняет requests вызовов call(i) не более concurrency разом.
+
+    call возвращает признак успеха. Результат - словарь с пропускной
+    способностью и перцентилями задержки в миллисекундах.
+    """
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in counter:
+            start = time.perf_counter()
+            try:
+                ok = await call(index)
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'name': name,
+        'params': {
+            'requests': requests, 'concurrency': concurrency,
+            **(params or {}),
+        },
+        'errors': errors,
+        'duration_s': round(duration, 4),
+        'throughput_rps': round(requests / duration, 2) if duration else 0,
+        **{
+            f'p{int(fraction * 100)}_ms': round(
+                percentile(latencies, fraction) * 1000, 3
+            )
+            for fraction in (0.5, 0.95, 0.99)
+        },
+        'max_ms': round(latencies[-1] * 1000, 3) if latencies else 0,
+    }
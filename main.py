@@ -3,7 +3,16 @@ import fastapi
 import app.utils.app_start_stop as astst
 
 from app.routers.account_router import account_router
+from app.routers.job_router import job_router
+from app.routers.service_router import service_router
+from app.config import settings
+from app.utils.metrics import MetricsMiddleware
+from app.utils.profiling import ProfilingMiddleware
 
 app = fastapi.FastAPI(lifespan=astst.app_lifespan)
+app.add_middleware(ProfilingMiddleware, app_settings=settings)
+app.add_middleware(MetricsMiddleware)
 
-app.include_router(account_router)
\ No newline at end of file
+app.include_router(account_router)
+app.include_router(job_router)
+app.include_router(service_router)
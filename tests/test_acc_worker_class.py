@@ -1,12 +1,16 @@
 """Модуль с тестами класса логики работы с аккаунтом."""
+import asyncio
 import contextlib
 import datetime
 import unittest.mock
 
 import app.classes.acc_worker as acc_w
 import app.models.acc_model as acc_bd_mdl
+from app.schemas.acc_schema import AccInfoSchema
+from app.utils.cursor import decode_cursor, encode_cursor
 import pytest
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
 
 TEST_ADDR = 'TEST ADDR'
 
@@ -31,6 +35,9 @@ class MockedBDCursor:
     def fetchall(self):
         pass
 
+    def one(self):
+        pass
+
 
 mocked_bd_cursor = MockedBDCursor()
 
@@ -55,6 +62,7 @@ async def mocked_async_session():
 @pytest.fixture()
 def mock_tron_client(monkeypatch):
     monkeypatch.setattr(acc_w.tr, 'tron_client', mocked_tron_client)
+    acc_w.tr.tron_data_cache.clear()
 
 
 def mocked_is_addr_false(*args, **kwargs):
@@ -156,9 +164,9 @@ async def test_create_account_info(mock_methods_for_create) -> None:
             }.issubset(first_ins_call[0])
             assert first_ins_call[1] == 'd'
             assert first_ins_call[0]['acc_addr'] == TEST_ADDR
-            assert first_ins_call[0]['energy'] == '1'
-            assert first_ins_call[0]['trx_balance'] == '2'
-            assert first_ins_call[0]['bandwidth'] == '3'
+            assert first_ins_call[0]['energy'] == 1
+            assert first_ins_call[0]['trx_balance'] == 2
+            assert first_ins_call[0]['bandwidth'] == 3
             if insert_in_bd_mock.side_effect == mocked_insert_in_bd_good:
                 assert mess == ''
             else:
@@ -172,8 +180,120 @@ async def test_create_account_info(mock_methods_for_create) -> None:
         insert_in_bd_mock.assert_not_awaited()
 
 
+class MockedWriteBuffer:
+
+    def __init__(self, exc: Exception | None = None):
+        self.submitted = []
+        self.exc = exc
+
+    async def submit(self, data: dict):
+        if self.exc is not None:
+            raise self.exc
+        self.submitted.append(data)
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(True)
+        return future
+
+
+@pytest.mark.parametrize(
+    'write_buffer, expected_mess', [
+        (MockedWriteBuffer(), ''),
+        (
+            MockedWriteBuffer(acc_w.wb.WriteBufferFullError()),
+            'Очередь записи в БД переполнена',
+        ),
+    ]
+)
+@pytest.mark.asyncio
+async def test_create_account_info_write_behind(
+    monkeypatch, write_buffer, expected_mess
+) -> None:
+    """Тест создания записи через буфер отложенной записи."""
+    monkeypatch.setattr(acc_w.wb, 'write_buffer', write_buffer)
+    prepare_mock = unittest.mock.create_autospec(
+        acc_w.AccountWorker.prepare_account_data,
+        side_effect=mocked_prepare_data_mixed,
+    )
+    monkeypatch.setattr(
+        acc_w.AccountWorker, 'prepare_account_data', prepare_mock,
+    )
+    insert_in_bd_mock = unittest.mock.create_autospec(
+        acc_w.AccountWorker.insert_data_in_bd,
+        side_effect=mocked_insert_in_bd_good,
+    )
+    monkeypatch.setattr(
+        acc_w.AccountWorker, 'insert_data_in_bd', insert_in_bd_mock,
+    )
+    mess = await acc_w.AccountWorker.create_account_info(
+        TEST_ADDR, 'd', wait_durable=True,
+    )
+    assert mess == expected_mess
+    insert_in_bd_mock.assert_not_awaited()
+    if not expected_mess:
+        assert write_buffer.submitted == [{'acc_addr': TEST_ADDR}]
+
+
+def mocked_prepare_data_mixed(acc_addr, *args, **kwargs):
+    if acc_addr == 'BAD ADDR':
+        return None, ['bad']
+    return {'acc_addr': acc_addr}, []
+
+
+def mocked_insert_bulk_good(data, *args, **kwargs):
+    return [(num, row['acc_addr']) for num, row in enumerate(data)]
+
+
+def mocked_insert_bulk_exception(*args, **kwargs):
+    raise Exception('TEST EXCEPTION')
+
+
+@pytest.fixture(params=[mocked_insert_bulk_good, mocked_insert_bulk_exception])
+def mock_methods_for_create_bulk(monkeypatch, request):
+    prepare_mock = unittest.mock.create_autospec(
+        acc_w.AccountWorker.prepare_account_data,
+        side_effect=mocked_prepare_data_mixed,
+    )
+    monkeypatch.setattr(
+        acc_w.AccountWorker, 'prepare_account_data', prepare_mock,
+    )
+    # ------------------------
+    insert_bulk_mock = unittest.mock.create_autospec(
+        acc_w.AccountWorker.insert_bulk_data_in_bd,
+        side_effect=request.param,
+    )
+    monkeypatch.setattr(
+        acc_w.AccountWorker, 'insert_bulk_data_in_bd', insert_bulk_mock,
+    )
+    return prepare_mock, insert_bulk_mock
+
+
+@pytest.mark.asyncio
+async def test_create_accounts_info_bulk(mock_methods_for_create_bulk) -> None:
+    """Тест пакетного создания записей в БД."""
+    prepare_mock, insert_bulk_mock = mock_methods_for_create_bulk
+    res = await acc_w.AccountWorker.create_accounts_info_bulk(
+        [TEST_ADDR, 'BAD ADDR', TEST_ADDR, 'ADDR2'], 'd', concurrency=2,
+    )
+    assert len(prepare_mock.await_args_list) == 3
+    insert_calls = insert_bulk_mock.await_args_list
+    assert len(insert_calls) == 1
+    assert [row['acc_addr'] for row in insert_calls[0].args[0]] == [
+        TEST_ADDR, 'ADDR2'
+    ]
+    assert insert_calls[0].args[1] == 'd'
+    assert [item.acc_addr for item in res] == [TEST_ADDR, 'BAD ADDR', 'ADDR2']
+    assert res[1].inserted is False
+    assert res[1].message == 'bad'
+    if insert_bulk_mock.side_effect == mocked_insert_bulk_good:
+        assert res[0].inserted and res[2].inserted
+        assert res[0].message == res[2].message == ''
+    else:
+        assert not res[0].inserted and not res[2].inserted
+        assert len(res[0].message) > 0 and len(res[2].message) > 0
+
+
 def mocked_fetchall_good(*args, **kwargs):
-    return [('ADDR1', '1', '2', '3', datetime.datetime.now())]
+    return [('ADDR1', 1, 2, 3, datetime.datetime.now())]
 
 
 async def mocked_execute_good(*args, **kwargs):
@@ -207,18 +327,13 @@ def mock_methods_for_get_accounts(monkeypatch, request):
 async def test_get_accounts_info(mock_methods_for_get_accounts: tuple) -> None:
     """Тест метода выборки из БД."""
     sess_execute_mock, fetchall_mock = mock_methods_for_get_accounts
-    sub_stmt = sa.select(
-        sa.func.max(acc_bd_mdl.AccDataModel.id).label('m_id')
-    ).group_by(
-        acc_bd_mdl.AccDataModel.acc_addr
-    ).limit(20).offset(0).order_by('m_id')
     stmt = sa.select(
-        acc_bd_mdl.AccDataModel.acc_addr,
-        acc_bd_mdl.AccDataModel.bandwidth,
-        acc_bd_mdl.AccDataModel.trx_balance,
-        acc_bd_mdl.AccDataModel.energy,
-        acc_bd_mdl.AccDataModel.created_at,
-    ).where(acc_bd_mdl.AccDataModel.id.in_(sub_stmt))
+        acc_bd_mdl.AccLatestModel.acc_addr,
+        acc_bd_mdl.AccLatestModel.bandwidth,
+        acc_bd_mdl.AccLatestModel.trx_balance,
+        acc_bd_mdl.AccLatestModel.energy,
+        acc_bd_mdl.AccLatestModel.created_at,
+    ).order_by(acc_bd_mdl.AccLatestModel.account_id).limit(20).offset(0)
 
     res = await acc_w.AccountWorker.get_accounts_info(
         1, 20, mocked_async_session()
@@ -230,6 +345,263 @@ async def test_get_accounts_info(mock_methods_for_get_accounts: tuple) -> None:
     assert stmt.compare(first_execute_call_args[1])
     fetchall_mock.assert_called_once()
     assert len(res) == 1
+    assert res[0]['acc_addr'] == 'ADDR1'
+    assert (
+        res[0]['bandwidth'], res[0]['trx_balance'], res[0]['energy']
+    ) == (1, 2, 3)
+
+
+def test_get_account_dict() -> None:
+    """Тест выдачи пустых числовых полей снимка как 0 по схеме ответа."""
+    created_at = datetime.datetime(2024, 1, 1)
+    account = acc_w.get_account_dict(('ADDR1', None, 2, None, created_at))
+    assert account == {
+        'acc_addr': 'ADDR1', 'bandwidth': 0, 'trx_balance': 2, 'energy': 0,
+        'created_at': created_at,
+    }
+    assert AccInfoSchema(**account).bandwidth == 0
+
+
+def mocked_fetchall_with_ids(*args, **kwargs):
+    return [
+        ('ADDR1', 1, 2, 3, datetime.datetime.now(), 10),
+        ('ADDR2', 1, 2, 3, datetime.datetime.now(), 11),
+    ]
+
+
+@pytest.fixture()
+def mock_methods_for_get_accounts_by_cursor(
+    mock_methods_for_get_accounts, monkeypatch
+):
+    sess_execute_mock, fetchall_mock = mock_methods_for_get_accounts
+    fetchall_mock.side_effect = mocked_fetchall_with_ids
+    return sess_execute_mock, fetchall_mock
+
+
+@pytest.mark.parametrize(
+    'cursor, page_size, has_next', [
+        ('', 2, True), (encode_cursor([5]), 2, True),
+        (encode_cursor([5]), 3, False),
+    ]
+)
+@pytest.mark.asyncio
+async def test_get_accounts_info_by_cursor(
+    mock_methods_for_get_accounts_by_cursor: tuple, cursor, page_size,
+    has_next,
+) -> None:
+    """Тест метода выборки из БД по курсору."""
+    sess_execute_mock, fetchall_mock = mock_methods_for_get_accounts_by_cursor
+    stmt = sa.select(
+        acc_bd_mdl.AccLatestModel.acc_addr,
+        acc_bd_mdl.AccLatestModel.bandwidth,
+        acc_bd_mdl.AccLatestModel.trx_balance,
+        acc_bd_mdl.AccLatestModel.energy,
+        acc_bd_mdl.AccLatestModel.created_at,
+        acc_bd_mdl.AccLatestModel.account_id,
+    ).order_by(acc_bd_mdl.AccLatestModel.account_id).limit(page_size)
+    if cursor:
+        stmt = stmt.where(acc_bd_mdl.AccLatestModel.account_id > 5)
+
+    res, next_cursor = await acc_w.AccountWorker.get_accounts_info_by_cursor(
+        cursor, page_size, mocked_async_session()
+    )
+    execute_calls = sess_execute_mock.await_args_list
+    assert len(execute_calls) == 1
+    assert stmt.compare(execute_calls[0].args[1])
+    assert len(res) == 2
+    if has_next:
+        assert decode_cursor(next_cursor) == [11]
+    else:
+        assert next_cursor is None
+
+
+def mocked_fetchall_sorted(*args, **kwargs):
+    return [
+        ('ADDR1', 1, 9, 3, datetime.datetime.now(), 10, 9),
+        ('ADDR2', 1, 7, 3, datetime.datetime.now(), 4, 7),
+    ]
+
+
+@pytest.mark.parametrize(
+    'cursor, sort_desc', [
+        ('', True), (encode_cursor(['trx_balance', True, 10, 3]), True),
+        (encode_cursor(['trx_balance', False, 1, 3]), False),
+    ]
+)
+@pytest.mark.asyncio
+async def test_get_accounts_info_by_cursor_sorted(
+    mock_methods_for_get_accounts: tuple, cursor, sort_desc
+) -> None:
+    """Тест выборки по курсору с фильтрами и сортировкой по полю."""
+    sess_execute_mock, fetchall_mock = mock_methods_for_get_accounts
+    fetchall_mock.side_effect = mocked_fetchall_sorted
+    model = acc_bd_mdl.AccLatestModel
+    stmt = sa.select(
+        model.acc_addr, model.bandwidth, model.trx_balance, model.energy,
+        model.created_at,
+    ).where(
+        model.energy >= 2, model.trx_balance.is_not(None),
+    ).order_by(
+        *(
+            [model.trx_balance.desc(), model.account_id.desc()]
+            if sort_desc else [model.trx_balance, model.account_id]
+        )
+    ).add_columns(model.account_id).limit(2).add_columns(model.trx_balance)
+    if cursor:
+        key_columns = sa.tuple_(model.trx_balance, model.account_id)
+        if sort_desc:
+            stmt = stmt.where(key_columns < sa.tuple_(10, 3))
+        else:
+            stmt = stmt.where(key_columns > sa.tuple_(1, 3))
+
+    res, next_cursor = await acc_w.AccountWorker.get_accounts_info_by_cursor(
+        cursor, 2, mocked_async_session(),
+        filters=acc_w.AccFilterSchema(min_energy=2),
+        sort_by='trx_balance', sort_desc=sort_desc,
+    )
+    execute_calls = sess_execute_mock.await_args_list
+    assert stmt.compare(execute_calls[0].args[1])
+    assert len(res) == 2
+    assert decode_cursor(next_cursor) == ['trx_balance', sort_desc, 7, 4]
+
+
+@pytest.mark.parametrize(
+    'cursor_values, sort_by', [
+        (['trx_balance', False, 1, 3], 'm_id'),
+        ([5], 'energy'),
+        (['energy', True, 1, 3], 'energy'),
+        (['energy', False, 'x', 3], 'energy'),
+        (['energy', False, True, 3], 'energy'),
+        (['created_at', False, 20260101, 3], 'created_at'),
+        (['created_at', False, None, 3], 'created_at'),
+        (['created_at', False, 'x', 3], 'created_at'),
+        (['created_at', False, '2026-01-01T00:00:00Z', 3], 'created_at'),
+    ]
+)
+@pytest.mark.asyncio
+async def test_get_accounts_info_by_foreign_cursor(
+    cursor_values, sort_by
+) -> None:
+    """Тест отказа от курсора, выданного для другой сортировки."""
+    with pytest.raises(ValueError):
+        await acc_w.AccountWorker.get_accounts_info_by_cursor(
+            encode_cursor(cursor_values), 20, mocked_async_session(),
+            sort_by=sort_by,
+        )
+
+
+@pytest.mark.asyncio
+async def test_get_accounts_info_by_bad_cursor() -> None:
+    """Тест метода выборки из БД по некорректному курсору."""
+    with pytest.raises(ValueError):
+        await acc_w.AccountWorker.get_accounts_info_by_cursor(
+            '%%%', 20, mocked_async_session()
+        )
+
+
+def mocked_fetchall_history(*args, **kwargs):
+    return [(datetime.datetime.now(), 1, 2, 3, 4, 5, 6, 7, 8, 9)]
+
+
+@pytest.mark.parametrize('bucket', [None, 'hour'])
+@pytest.mark.asyncio
+async def test_get_account_history(
+    mock_methods_for_get_accounts: tuple, bucket
+) -> None:
+    """Тест метода выборки истории снимков адреса."""
+    sess_execute_mock, fetchall_mock = mock_methods_for_get_accounts
+    fetchall_mock.side_effect = mocked_fetchall_history
+    date_to = datetime.datetime.now()
+    date_from = date_to - datetime.timedelta(days=7)
+    res, truncated = await acc_w.AccountWorker.get_account_history(
+        TEST_ADDR, date_from, date_to, bucket, mocked_async_session()
+    )
+    assert truncated is False
+    execute_calls = sess_execute_mock.await_args_list
+    assert len(execute_calls) == 1
+    compiled = execute_calls[0].args[1].compile(dialect=pg.dialect())
+    assert compiled.params['acc_addr_1'] == TEST_ADDR
+    assert compiled.params['created_at_1'] == date_from
+    assert compiled.params['created_at_2'] == date_to
+    assert acc_w.settings.history_max_points + 1 in (
+        compiled.params.values()
+    )
+    assert len(res) == 1
+    if bucket is None:
+        assert 'GROUP BY' not in str(compiled)
+        assert res[0].energy == 3
+        assert res[0].energy_max is None
+    else:
+        assert 'GROUP BY date_trunc' in str(compiled)
+        assert bucket in compiled.params.values()
+        assert (res[0].bandwidth, res[0].trx_balance, res[0].energy) == (
+            1, 4, 7
+        )
+        assert (res[0].energy_min, res[0].energy_max) == (8, 9)
+
+
+@pytest.mark.asyncio
+async def test_get_account_history_truncated(
+    mock_methods_for_get_accounts: tuple, monkeypatch
+) -> None:
+    """Тест признака обрезанной истории сверх history_max_points."""
+    _, fetchall_mock = mock_methods_for_get_accounts
+    fetchall_mock.side_effect = (
+        lambda *args: mocked_fetchall_history() * 3
+    )
+    monkeypatch.setattr(acc_w.settings, 'history_max_points', 2)
+    date_to = datetime.datetime.now()
+    res, truncated = await acc_w.AccountWorker.get_account_history(
+        TEST_ADDR, date_to - datetime.timedelta(days=1), date_to, None,
+        mocked_async_session(),
+    )
+    assert truncated is True
+    assert len(res) == 2
+
+
+@pytest.mark.parametrize(
+    'days, bucket, expected', [
+        (7, 'minute', 10081), (7, 'hour', 169), (1, 'week', 2),
+    ]
+)
+def test_get_history_bucket_count(days, bucket, expected) -> None:
+    date_from = datetime.datetime(2026, 1, 1)
+    assert acc_w.get_history_bucket_count(
+        date_from, date_from + datetime.timedelta(days=days), bucket
+    ) == expected
+
+
+def mocked_one_stats(*args, **kwargs):
+    return tuple(range(1, 25))
+
+
+@pytest.mark.asyncio
+async def test_get_accounts_stats(
+    mock_methods_for_get_accounts: tuple, monkeypatch
+) -> None:
+    """Тест метода подсчёта статистики по последним снимкам."""
+    sess_execute_mock, _ = mock_methods_for_get_accounts
+    one_mock = unittest.mock.create_autospec(
+        MockedBDCursor.one, side_effect=mocked_one_stats,
+    )
+    monkeypatch.setattr(MockedBDCursor, 'one', one_mock)
+    filters = acc_w.AccFilterSchema(addr_prefix='T', min_energy=5)
+    res = await acc_w.AccountWorker.get_accounts_stats(
+        filters, {'energy': [10, 20]}, mocked_async_session()
+    )
+    execute_calls = sess_execute_mock.await_args_list
+    assert len(execute_calls) == 1
+    compiled = str(execute_calls[0].args[1].compile(dialect=pg.dialect()))
+    assert 'FROM accounts_latest' in compiled
+    assert 'WITHIN GROUP' in compiled
+    assert 'FILTER (WHERE accounts_latest.energy >=' in compiled
+    assert 'LIKE' in compiled
+    assert res.accounts_count == 1
+    assert res.bandwidth.sum == 2
+    assert res.bandwidth.percentiles == {'p50': 6, 'p90': 7, 'p99': 8}
+    assert res.trx_balance.above_thresholds == {}
+    assert res.energy.max == 19
+    assert res.energy.above_thresholds == {'10': 23, '20': 24}
 
 
 async def mocked_commit(*args, **kwargs):
@@ -270,6 +642,95 @@ async def test_insert_data_in_bd(mock_methods_for_insert: tuple) -> None:
     commit_mock.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+async def test_insert_bulk_data_in_bd(mock_methods_for_insert: tuple) -> None:
+    """Тест метода многострочной вставки в БД."""
+    sess_execute_mock, fetchall_mock, commit_mock = mock_methods_for_insert
+    rows = [{'acc_addr': 'ADDR1'}, {'acc_addr': 'ADDR2'}]
+    stmt = sa.insert(acc_bd_mdl.AccDataModel).values(rows).returning(
+        acc_bd_mdl.AccDataModel.id, acc_bd_mdl.AccDataModel.acc_addr,
+    )
+    res = await acc_w.AccountWorker.insert_bulk_data_in_bd(
+        rows, mocked_async_session()
+    )
+    execute_calls = sess_execute_mock.await_args_list
+    assert len(execute_calls) == 1
+    first_execute_call_args = execute_calls[0].args
+    assert len(first_execute_call_args) == 2
+    assert stmt.compare(first_execute_call_args[1])
+    fetchall_mock.assert_called_once()
+    assert len(res) == 1
+    commit_mock.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_insert_data_in_bd_dedup(
+    mock_methods_for_insert: tuple, monkeypatch,
+) -> None:
+    """Тест условной вставки в БД в режиме дедупликации."""
+    sess_execute_mock, fetchall_mock, commit_mock = mock_methods_for_insert
+    monkeypatch.setattr(acc_w.settings, 'dedup_enabled', True)
+    monkeypatch.setattr(acc_w.settings, 'dedup_window', 30)
+    row = {
+        'acc_addr': 'ADDR1', 'bandwidth': 1, 'trx_balance': 2, 'energy': 3,
+        'created_at': datetime.datetime(2024, 1, 1),
+    }
+    res = await acc_w.AccountWorker.insert_data_in_bd(
+        row, mocked_async_session()
+    )
+    execute_calls = sess_execute_mock.await_args_list
+    assert len(execute_calls) == 1
+    first_execute_call_args = execute_calls[0].args
+    assert len(first_execute_call_args) == 2
+    compiled = first_execute_call_args[1].compile(
+        dialect=pg.dialect()
+    )
+    assert 'NOT (EXISTS' in str(compiled)
+    assert 'IS NOT DISTINCT FROM' in str(compiled)
+    assert datetime.timedelta(seconds=30) in compiled.params.values()
+    assert 'ADDR1' in compiled.params.values()
+    fetchall_mock.assert_called_once()
+    assert len(res) == 1
+    commit_mock.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_insert_bulk_data_in_bd_dedup_in_batch(
+    mock_methods_for_insert: tuple, monkeypatch,
+) -> None:
+    """Тест отбрасывания повторов одного адреса внутри пачки."""
+    sess_execute_mock, _, _ = mock_methods_for_insert
+    monkeypatch.setattr(acc_w.settings, 'dedup_enabled', True)
+    monkeypatch.setattr(acc_w.settings, 'dedup_window', 30)
+    created_at = datetime.datetime(2024, 1, 1)
+
+    def make_row(acc_addr, energy, seconds):
+        return {
+            'acc_addr': acc_addr, 'bandwidth': 1, 'trx_balance': 2,
+            'energy': energy,
+            'created_at': created_at + datetime.timedelta(seconds=seconds),
+        }
+
+    rows = [
+        make_row('ADDR1', 3, 0),
+        make_row('ADDR2', 3, 1),
+        # Тот же снимок позже окна и другой снимок внутри окна.
+        make_row('ADDR1', 3, 60),
+        make_row('ADDR1', 4, 10),
+        make_row('ADDR1', 5, 90),
+    ]
+    await acc_w.AccountWorker.insert_bulk_data_in_bd(
+        rows, mocked_async_session()
+    )
+    compiled = sess_execute_mock.await_args.args[1].compile(
+        dialect=pg.dialect()
+    )
+    values = list(compiled.params.values())
+    assert values.count('ADDR1') == 2
+    assert values.count('ADDR2') == 1
+    assert 4 not in values and 5 in values
+
+
 async def mocked_get_bandwidth_good(*args, **kwargs):
     return 600
 
@@ -1,4 +1,5 @@
 """Модуль с тестами роутеров приложения."""
+import asyncio
 import datetime
 import unittest.mock
 
@@ -7,7 +8,13 @@ import pytest
 
 from main import app as main_app
 import app.routers.account_router as acc_rtr
-from app.schemas.acc_schema import AccInfoSchema
+from app.schemas.acc_schema import (
+    AccBulkResultSchema,
+    AccFieldStatsSchema,
+    AccHistoryPointSchema,
+    AccInfoSchema,
+    AccStatsSchema,
+)
 
 test_client = fastapi.testclient.TestClient(main_app)
 
@@ -20,19 +27,37 @@ class MockedAccountWorker:
     async def get_accounts_info(*args, **kwargs):
         pass
 
+    async def get_accounts_info_by_cursor(*args, **kwargs):
+        pass
+
+    async def create_accounts_info_bulk(*args, **kwargs):
+        pass
+
+    async def stream_accounts_info(*args, **kwargs):
+        pass
+
+    async def get_account_history(*args, **kwargs):
+        pass
+
+    async def get_accounts_stats(*args, **kwargs):
+        pass
+
 
 async def mocked_get_acc(*args, **kwargs):
     return [
-        AccInfoSchema(
-            acc_addr='TEST ADDR', bandwidth=1, energy=1,
-            trx_balance=1, created_at=datetime.datetime.now()
-        )
+        {
+            'acc_addr': 'TEST ADDR', 'bandwidth': 1, 'trx_balance': 1,
+            'energy': 1,
+            'created_at': datetime.datetime(2024, 1, 2, 3, 4, 5, 6),
+        }
     ]
 
 
 @pytest.fixture()
 def mock_acc_worker_class(monkeypatch):
     monkeypatch.setattr(acc_rtr, 'AccountWorker', MockedAccountWorker)
+    acc_rtr.rc.accounts_page_cache.clear()
+    acc_rtr.rc.accounts_stats_cache.clear()
 
 
 @pytest.fixture()
@@ -52,6 +77,14 @@ def mock_acc_worker_get_method(mock_acc_worker_class, monkeypatch):
         ({}, 200), (None, 200),
         ({'page': 25, 'page_size': 50}, 200),
         ({'page': None, 'page_size': 'asdas'}, 422),
+        (
+            {
+                'sort_by': 'energy', 'sort_desc': True,
+                'min_trx_balance': 100, 'addr_prefix': 'TX',
+            },
+            200,
+        ),
+        ({'sort_by': 'acc_addr'}, 422),
     ]
 )
 def test_get_accs_router(mock_acc_worker_get_method, params, expected_code):
@@ -69,10 +102,89 @@ def test_get_accs_router(mock_acc_worker_get_method, params, expected_code):
                 assert first_call_args[0] == params['page']
             if 'page_size' in params:
                 assert first_call_args[1] == params['page_size']
+        first_call_kwargs = get_acc_meth_calls[0].kwargs
+        assert first_call_kwargs['sort_by'] == (params or {}).get(
+            'sort_by', 'm_id'
+        )
+        assert first_call_kwargs['sort_desc'] == (params or {}).get(
+            'sort_desc', False
+        )
+        filters = first_call_kwargs['filters']
+        assert filters.min_trx_balance == (params or {}).get(
+            'min_trx_balance'
+        )
+        assert filters.addr_prefix == (params or {}).get('addr_prefix')
     else:
         get_acc_meth_mock.assert_not_awaited()
 
 
+def test_get_accs_router_cache(mock_acc_worker_get_method):
+    get_acc_meth_mock = mock_acc_worker_get_method
+    res = test_client.get('/api/v1/get_accounts_info')
+    assert res.status_code == 200
+    etag = res.headers['ETag']
+    res = test_client.get(
+        '/api/v1/get_accounts_info', headers={'If-None-Match': etag},
+    )
+    assert res.status_code == 304
+    assert res.headers['ETag'] == etag
+    assert len(get_acc_meth_mock.await_args_list) == 1
+    acc_rtr.rc.accounts_page_cache.bump_version()
+    res = test_client.get('/api/v1/get_accounts_info')
+    assert res.status_code == 200
+    assert len(get_acc_meth_mock.await_args_list) == 2
+
+
+def test_get_accs_router_matches_schema(mock_acc_worker_get_method):
+    res = test_client.get('/api/v1/get_accounts_info')
+    assert res.status_code == 200
+    expected = [
+        AccInfoSchema(**row).model_dump(mode='json')
+        for row in asyncio.run(mocked_get_acc())
+    ]
+    assert res.json() == expected
+    assert res.json()[0]['created_at'] == '2024-01-02T03:04:05.000006'
+
+
+async def mocked_get_acc_by_cursor(cursor, *args, **kwargs):
+    if cursor == 'bad':
+        raise ValueError('bad cursor')
+    return await mocked_get_acc(), 'NEXT'
+
+
+@pytest.fixture()
+def mock_acc_worker_get_by_cursor_method(mock_acc_worker_class, monkeypatch):
+    get_acc_mock = unittest.mock.create_autospec(
+        MockedAccountWorker.get_accounts_info_by_cursor,
+        side_effect=mocked_get_acc_by_cursor
+    )
+    monkeypatch.setattr(
+        MockedAccountWorker, 'get_accounts_info_by_cursor', get_acc_mock
+    )
+    return get_acc_mock
+
+
+@pytest.mark.parametrize(
+    'params, expected_code', [
+        ({'cursor': ''}, 200), ({'cursor': 'abc', 'page_size': 50}, 200),
+        ({'cursor': 'bad'}, 422),
+    ]
+)
+def test_get_accs_by_cursor_router(
+    mock_acc_worker_get_by_cursor_method, params, expected_code
+):
+    get_acc_meth_mock = mock_acc_worker_get_by_cursor_method
+    res = test_client.get('/api/v1/get_accounts_info', params=params)
+    assert res.status_code == expected_code
+    get_acc_meth_calls = get_acc_meth_mock.await_args_list
+    assert len(get_acc_meth_calls) == 1
+    assert get_acc_meth_calls[0].args[0] == params['cursor']
+    assert get_acc_meth_calls[0].args[1] == params.get('page_size', 20)
+    if expected_code == 200:
+        assert len(res.json()) == 1
+        assert res.headers['X-Next-Cursor'] == 'NEXT'
+
+
 async def mocked_create_acc(*args, **kwargs):
     return '!!!!'
 
@@ -112,3 +224,291 @@ def test_create_acc_router(
                 assert first_call_args[0] == params['acc_addr']
     else:
         create_acc_mock.assert_not_awaited()
+
+
+def test_create_acc_router_idempotency(mock_acc_worker_create_method):
+    create_acc_mock = mock_acc_worker_create_method
+    create_acc_mock.side_effect = None
+    create_acc_mock.return_value = ''
+    acc_rtr.rc.idempotency_cache.clear()
+    for _ in range(3):
+        res = test_client.post(
+            '/api/v1/create_account_info', json={'acc_addr': 'ADDR'},
+            headers={'Idempotency-Key': 'KEY1'},
+        )
+        assert res.status_code == 200
+        assert res.json() == ''
+    assert len(create_acc_mock.await_args_list) == 1
+    res = test_client.post(
+        '/api/v1/create_account_info', json={'acc_addr': 'ADDR'},
+        headers={'Idempotency-Key': 'KEY2'},
+    )
+    assert res.status_code == 200
+    assert len(create_acc_mock.await_args_list) == 2
+    create_acc_mock.return_value = 'ERROR'
+    for _ in range(2):
+        test_client.post(
+            '/api/v1/create_account_info', json={'acc_addr': 'ADDR'},
+            headers={'Idempotency-Key': 'KEY3'},
+        )
+    assert len(create_acc_mock.await_args_list) == 4
+
+
+async def mocked_create_acc_bulk(acc_addrs, *args, **kwargs):
+    return [
+        AccBulkResultSchema(acc_addr=acc_addr, inserted=True, message='')
+        for acc_addr in acc_addrs
+    ]
+
+
+@pytest.fixture()
+def mock_acc_worker_create_bulk_method(mock_acc_worker_class, monkeypatch):
+    create_bulk_mock = unittest.mock.create_autospec(
+        MockedAccountWorker.create_accounts_info_bulk,
+        side_effect=mocked_create_acc_bulk
+    )
+    monkeypatch.setattr(
+        MockedAccountWorker, 'create_accounts_info_bulk', create_bulk_mock
+    )
+    return create_bulk_mock
+
+
+@pytest.mark.parametrize(
+    'params, expected_code', [
+        ({}, 422), ({'acc_addrs': []}, 422),
+        ({'acc_addrs': ['addr1', 'addr2']}, 200),
+    ]
+)
+def test_create_acc_bulk_router(
+    mock_acc_worker_create_bulk_method, params, expected_code
+):
+    create_bulk_mock = mock_acc_worker_create_bulk_method
+    res = test_client.post(
+        '/api/v1/create_accounts_info_bulk', json=params,
+    )
+    assert res.status_code == expected_code
+    if expected_code == 200:
+        assert len(res.json()) == len(params['acc_addrs'])
+        create_bulk_calls = create_bulk_mock.await_args_list
+        assert len(create_bulk_calls) == 1
+        assert create_bulk_calls[0].args[0] == params['acc_addrs']
+    else:
+        create_bulk_mock.assert_not_awaited()
+
+
+async def mocked_get_history(*args, **kwargs):
+    return [
+        AccHistoryPointSchema(
+            created_at=datetime.datetime.now(), bandwidth=1, trx_balance=2,
+            energy=3,
+        )
+    ], False
+
+
+@pytest.fixture()
+def mock_acc_worker_history_method(mock_acc_worker_class, monkeypatch):
+    history_mock = unittest.mock.create_autospec(
+        MockedAccountWorker.get_account_history,
+        side_effect=mocked_get_history
+    )
+    monkeypatch.setattr(
+        MockedAccountWorker, 'get_account_history', history_mock
+    )
+    return history_mock
+
+
+@pytest.mark.parametrize(
+    'params, expected_code', [
+        (
+            {
+                'acc_addr': 'ADDR', 'date_from': '2026-01-01T00:00:00',
+                'date_to': '2026-01-08T00:00:00',
+            },
+            200,
+        ),
+        (
+            {
+                'acc_addr': 'ADDR', 'date_from': '2026-01-01T00:00:00',
+                'date_to': '2026-01-08T00:00:00', 'bucket': 'hour',
+            },
+            200,
+        ),
+        (
+            {
+                'acc_addr': 'ADDR', 'date_from': '2026-01-01T00:00:00',
+                'date_to': '2026-01-08T00:00:00', 'bucket': 'second',
+            },
+            422,
+        ),
+        (
+            {
+                'acc_addr': 'ADDR', 'date_from': '2026-01-08T00:00:00',
+                'date_to': '2026-01-01T00:00:00',
+            },
+            422,
+        ),
+        (
+            {
+                'acc_addr': 'ADDR', 'date_from': '2026-01-01T00:00:00',
+                'date_to': '2026-01-08T00:00:00', 'bucket': 'minute',
+            },
+            422,
+        ),
+        (
+            {
+                'acc_addr': 'ADDR', 'date_from': '2026-01-01T00:00:00',
+                'date_to': '2026-01-07T00:00:00', 'bucket': 'minute',
+            },
+            200,
+        ),
+        ({'acc_addr': 'ADDR'}, 422),
+    ]
+)
+def test_get_history_router(
+    mock_acc_worker_history_method, params, expected_code
+):
+    history_mock = mock_acc_worker_history_method
+    res = test_client.get('/api/v1/get_account_history', params=params)
+    assert res.status_code == expected_code
+    if expected_code == 200:
+        assert len(res.json()) == 1
+        call_args = history_mock.await_args_list[0].args
+        assert call_args[0] == params['acc_addr']
+        assert call_args[1] == datetime.datetime(2026, 1, 1)
+        assert call_args[3] == params.get('bucket')
+        assert 'X-History-Truncated' not in res.headers
+    else:
+        history_mock.assert_not_awaited()
+
+
+def test_get_history_router_truncated(mock_acc_worker_history_method):
+    """Тест заголовка об обрезанной истории без интервалов."""
+    history_mock = mock_acc_worker_history_method
+    history_mock.side_effect = None
+    history_mock.return_value = ([], True)
+    res = test_client.get('/api/v1/get_account_history', params={
+        'acc_addr': 'ADDR', 'date_from': '2026-01-01T00:00:00',
+        'date_to': '2026-02-01T00:00:00',
+    })
+    assert res.status_code == 200
+    assert res.headers['X-History-Truncated'] == 'true'
+
+
+def test_get_history_router_tz_aware(mock_acc_worker_history_method):
+    """Тест приведения дат с часовым поясом к наивным локальным."""
+    history_mock = mock_acc_worker_history_method
+    res = test_client.get('/api/v1/get_account_history', params={
+        'acc_addr': 'ADDR', 'date_from': '2026-01-01T00:00:00Z',
+        'date_to': '2026-01-08T00:00:00+03:00',
+    })
+    assert res.status_code == 200
+    call_args = history_mock.await_args_list[0].args
+    assert call_args[1] == datetime.datetime(
+        2026, 1, 1, tzinfo=datetime.timezone.utc
+    ).astimezone().replace(tzinfo=None)
+    assert call_args[2] == datetime.datetime(
+        2026, 1, 7, 21, tzinfo=datetime.timezone.utc
+    ).astimezone().replace(tzinfo=None)
+    assert call_args[1].tzinfo is None and call_args[2].tzinfo is None
+
+
+async def mocked_get_stats(*args, **kwargs):
+    field_stats = AccFieldStatsSchema(
+        sum=1, avg=1, min=1, max=1, percentiles={'p50': 1},
+        above_thresholds={},
+    )
+    return AccStatsSchema(
+        accounts_count=1, bandwidth=field_stats, trx_balance=field_stats,
+        energy=field_stats,
+    )
+
+
+@pytest.fixture()
+def mock_acc_worker_stats_method(mock_acc_worker_class, monkeypatch):
+    stats_mock = unittest.mock.create_autospec(
+        MockedAccountWorker.get_accounts_stats,
+        side_effect=mocked_get_stats
+    )
+    monkeypatch.setattr(
+        MockedAccountWorker, 'get_accounts_stats', stats_mock
+    )
+    return stats_mock
+
+
+@pytest.mark.parametrize(
+    'params, expected_code', [
+        ({}, 200),
+        (
+            {
+                'addr_prefix': 'T', 'min_trx_balance': 5,
+                'energy_above': [10, 20],
+            },
+            200,
+        ),
+        ({'min_energy': 'many'}, 422),
+    ]
+)
+def test_get_stats_router(mock_acc_worker_stats_method, params, expected_code):
+    stats_mock = mock_acc_worker_stats_method
+    for _ in range(2):
+        res = test_client.get('/api/v1/get_accounts_stats', params=params)
+        assert res.status_code == expected_code
+    if expected_code == 200:
+        assert res.json()['accounts_count'] == 1
+        stats_calls = stats_mock.await_args_list
+        assert len(stats_calls) == 1
+        filters, thresholds = stats_calls[0].args[:2]
+        assert filters.addr_prefix == params.get('addr_prefix')
+        assert filters.min_trx_balance == params.get('min_trx_balance')
+        assert thresholds['energy'] == params.get('energy_above', [])
+    else:
+        stats_mock.assert_not_awaited()
+
+
+async def mocked_stream_acc(*args, **kwargs):
+    created_at = datetime.datetime(2026, 1, 1)
+    yield [('ADDR1', 1, 2, 3, created_at)]
+    yield [('ADDR2', 4, 5, 6, created_at)]
+
+
+@pytest.fixture()
+def mock_acc_worker_stream_method(mock_acc_worker_class, monkeypatch):
+    stream_mock = unittest.mock.Mock(side_effect=mocked_stream_acc)
+    monkeypatch.setattr(
+        MockedAccountWorker, 'stream_accounts_info', stream_mock
+    )
+    return stream_mock
+
+
+@pytest.mark.parametrize(
+    'params, expected_code, expected_body', [
+        (
+            {},
+            200,
+            '{"acc_addr":"ADDR1","bandwidth":1,"trx_balance":2,'
+            '"energy":3,"created_at":"2026-01-01T00:00:00"}\n'
+            '{"acc_addr":"ADDR2","bandwidth":4,"trx_balance":5,'
+            '"energy":6,"created_at":"2026-01-01T00:00:00"}\n',
+        ),
+        (
+            {'format': 'csv', 'history': True},
+            200,
+            'acc_addr,bandwidth,trx_balance,energy,created_at\r\n'
+            'ADDR1,1,2,3,2026-01-01 00:00:00\r\n'
+            'ADDR2,4,5,6,2026-01-01 00:00:00\r\n',
+        ),
+        ({'format': 'xml'}, 422, None),
+    ]
+)
+def test_export_accs_router(
+    mock_acc_worker_stream_method, params, expected_code, expected_body
+):
+    stream_mock = mock_acc_worker_stream_method
+    res = test_client.get('/api/v1/export_accounts_info', params=params)
+    assert res.status_code == expected_code
+    if expected_code == 200:
+        assert res.text == expected_body
+        stream_mock.assert_called_once()
+        assert stream_mock.call_args.args[0] == params.get('history', False)
+    else:
+        stream_mock.assert_not_called()
@@ -0,0 +1,78 @@
+"""Модуль с тестами асинхронного TTL-кеша."""
+import asyncio
+import unittest.mock
+
+import app.utils.async_cache as ac
+import pytest
+
+
+def make_fetch(value, delay: float = 0):
+    async def fetch():
+        await asyncio.sleep(delay)
+        return value
+    return unittest.mock.AsyncMock(side_effect=fetch)
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_and_coalescing() -> None:
+    """Тест попаданий в кеш и слияния одновременных промахов."""
+    cache = ac.CoalescingTTLCache(ttl=60, max_size=10)
+    fetch = make_fetch('VALUE', delay=0.01)
+    res = await asyncio.gather(
+        *(cache.get_or_fetch('key', fetch) for _ in range(5))
+    )
+    assert res == ['VALUE'] * 5
+    assert await cache.get_or_fetch('key', fetch) == 'VALUE'
+    fetch.assert_awaited_once()
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['coalesced'] == 4
+    assert cache.stats()['hits'] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_expiry(monkeypatch) -> None:
+    """Тест устаревания записей кеша."""
+    now = [100.0]
+    monkeypatch.setattr(
+        ac, 'time', unittest.mock.Mock(monotonic=lambda: now[0])
+    )
+    cache = ac.CoalescingTTLCache(ttl=5, max_size=10)
+    fetch = make_fetch('VALUE')
+    await cache.get_or_fetch('key', fetch)
+    now[0] += 10
+    await cache.get_or_fetch('key', fetch)
+    assert fetch.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_lru_eviction() -> None:
+    """Тест вытеснения давно не использованных записей."""
+    cache = ac.CoalescingTTLCache(ttl=60, max_size=2)
+    for key in ('a', 'b', 'a', 'c'):
+        await cache.get_or_fetch(key, make_fetch(key))
+    fetch = make_fetch('b')
+    await cache.get_or_fetch('b', fetch)
+    fetch.assert_awaited_once()
+    assert cache.stats()['size'] == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_does_not_store_errors() -> None:
+    """Тест того, что ошибки не кешируются."""
+    cache = ac.CoalescingTTLCache(ttl=60, max_size=10)
+    fetch = unittest.mock.AsyncMock(side_effect=Exception('TEST EXCEPTION'))
+    for _ in range(2):
+        with pytest.raises(Exception):
+            await cache.get_or_fetch('key', fetch)
+    assert fetch.await_count == 2
+    assert cache.stats()['size'] == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_cacheable_filter() -> None:
+    """Тест отказа от сохранения значений, не прошедших cacheable."""
+    cache = ac.CoalescingTTLCache(ttl=60, max_size=10)
+    fetch = make_fetch('')
+    assert await cache.get_or_fetch('key', fetch, cacheable=bool) == ''
+    assert await cache.get_or_fetch('key', fetch, cacheable=bool) == ''
+    assert fetch.await_count == 2
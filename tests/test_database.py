@@ -0,0 +1,141 @@
+"""Модуль с тестами хуков движка БД."""
+import logging
+import unittest.mock
+
+import app.config as config
+import app.database as database
+import app.utils.metrics as metrics
+import pytest
+import sqlalchemy as sa
+import sqlalchemy.exc
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.util import greenlet_spawn
+
+
+@pytest.mark.asyncio
+async def test_pool_timeouts() -> None:
+    """Тест: таймаутом пула считается только таймаут ожидания."""
+
+    def mocked_connect():
+        raise OSError('connection refused')
+
+    pool = database.MeteredAsyncQueuePool(
+        mocked_connect, pool_size=1, max_overflow=0, timeout=0.01,
+    )
+    with pytest.raises(OSError):
+        await greenlet_spawn(pool._do_get)
+    assert pool.timeouts == 0
+    pool = database.MeteredAsyncQueuePool(
+        unittest.mock.MagicMock, pool_size=1, max_overflow=0, timeout=0.01,
+    )
+    await greenlet_spawn(pool._do_get)
+    with pytest.raises(sqlalchemy.exc.TimeoutError):
+        await greenlet_spawn(pool._do_get)
+    assert pool.timeouts == 1
+    assert pool.wait_count == 2
+
+
+def test_slow_query_log(caplog) -> None:
+    """Тест журнала медленных запросов и метрики длительности."""
+    metrics.registry.clear()
+    engine = sa.create_engine('sqlite://')
+    database.register_query_hooks(engine, config.AppSettings(
+        slow_query_threshold_ms=0, slow_query_sample_rate=1.0,
+    ))
+    with caplog.at_level(logging.WARNING, logger=database.__name__):
+        with engine.connect() as conn:
+            conn.execute(sa.text('SELECT :value'), {'value': 'SECRET'})
+    records = [
+        record for record in caplog.records if hasattr(record, 'slow_query')
+    ]
+    assert len(records) == 1
+    slow_query = records[0].slow_query
+    assert slow_query['statement'] == 'SELECT ?'
+    assert len(slow_query['params_hash']) == 16
+    assert 'SECRET' not in records[0].getMessage()
+    assert metrics.db_query_duration.get(operation='SELECT')['count'] == 1
+
+
+def test_slow_query_log_threshold(caplog) -> None:
+    """Тест того, что быстрые запросы не попадают в журнал."""
+    engine = sa.create_engine('sqlite://')
+    database.register_query_hooks(engine, config.AppSettings(
+        slow_query_threshold_ms=60000,
+    ))
+    with caplog.at_level(logging.WARNING, logger=database.__name__):
+        with engine.connect() as conn:
+            conn.execute(sa.text('SELECT 1'))
+    assert not caplog.records
+
+
+def make_replica_router(**overrides) -> database.ReplicaRouter:
+    engines = [
+        create_async_engine(f'postgresql+asyncpg://u:p@replica{index}/db')
+        for index in range(3)
+    ]
+    return database.ReplicaRouter(
+        engines, config.AppSettings(replica_max_lag=5, **overrides),
+    )
+
+
+def set_state(router, states: list) -> None:
+    for replica, (healthy, lag) in zip(router.replicas, states):
+        replica.healthy = healthy
+        replica.lag = lag
+
+
+def test_replica_router_round_robin() -> None:
+    """Тест выбора реплик по кругу с пропуском больных и отстающих."""
+    router = make_replica_router()
+    assert router.choose() is None
+    set_state(router, [(True, 0.0), (False, 0.0), (True, 10.0)])
+    assert [router.choose().name for _ in range(2)] == ['replica0:5432'] * 2
+    set_state(router, [(True, 0.0), (True, 1.0), (True, 10.0)])
+    names = [router.choose().name for _ in range(4)]
+    assert sorted(set(names)) == ['replica0:5432', 'replica1:5432']
+    assert names[0] != names[1]
+
+
+def test_replica_router_least_connections() -> None:
+    """Тест выбора наименее занятой реплики."""
+    router = make_replica_router(replica_selection='least_connections')
+    set_state(router, [(True, 0.0), (True, 0.0), (True, 0.0)])
+    router.replicas[0].in_use = 3
+    router.replicas[1].in_use = 1
+    router.replicas[2].in_use = 2
+    assert router.choose() is router.replicas[1]
+
+
+@pytest.mark.asyncio
+async def test_replica_router_check(monkeypatch) -> None:
+    """Тест проверки здоровья и отставания реплик."""
+    router = make_replica_router()
+
+    async def mocked_fetch_lag(replica):
+        if replica.name == 'replica1:5432':
+            raise OSError('connection refused')
+        return 7.5 if replica.name == 'replica2:5432' else None
+
+    monkeypatch.setattr(
+        database.ReplicaRouter, 'fetch_lag', mocked_fetch_lag,
+    )
+    await router.check_all()
+    assert [
+        (replica.healthy, replica.lag) for replica in router.replicas
+    ] == [(True, 0.0), (False, None), (True, 7.5)]
+    assert router.choose() is router.replicas[0]
+    assert metrics.db_replica_lag.get(replica='replica2:5432') == 7.5
+
+
+@pytest.mark.asyncio
+async def test_read_session_routing(monkeypatch) -> None:
+    """Тест чтения с реплики и возврата к основной БД."""
+    router = make_replica_router()
+    monkeypatch.setattr(database, 'replica_router', router)
+    async with database.db_read_session() as session:
+        assert session.bind is database.async_engine
+    set_state(router, [(False, 0.0), (True, 0.0), (False, 0.0)])
+    async with database.db_read_session() as session:
+        assert session.bind is router.replicas[1].engine
+        assert router.replicas[1].in_use == 1
+    assert router.replicas[1].in_use == 0
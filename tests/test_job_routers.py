@@ -0,0 +1,79 @@
+"""Модуль с тестами роутеров фоновых заданий."""
+import datetime
+import unittest.mock
+
+import fastapi.testclient
+import pytest
+
+from main import app as main_app
+import app.routers.job_router as job_rtr
+from app.schemas.job_schema import JobCreatedSchema, JobStatusSchema
+
+test_client = fastapi.testclient.TestClient(main_app)
+
+
+class MockedSnapshotJobWorker:
+
+    async def create_job(*args, **kwargs):
+        pass
+
+    async def get_job_status(*args, **kwargs):
+        pass
+
+
+async def mocked_create_job(acc_addrs, *args, **kwargs):
+    return JobCreatedSchema(job_id=1, status='pending', total=len(acc_addrs))
+
+
+async def mocked_get_job_status(job_id, *args, **kwargs):
+    if job_id != 1:
+        return None
+    return JobStatusSchema(
+        job_id=1, status='running', total=10, processed=4, inserted=3,
+        failed=1, created_at=datetime.datetime.now(), throughput=2.0,
+    )
+
+
+@pytest.fixture()
+def mock_job_worker_class(monkeypatch):
+    monkeypatch.setattr(job_rtr, 'SnapshotJobWorker', MockedSnapshotJobWorker)
+    mocks = {}
+    for name, side_effect in (
+        ('create_job', mocked_create_job),
+        ('get_job_status', mocked_get_job_status),
+    ):
+        mocks[name] = unittest.mock.create_autospec(
+            getattr(MockedSnapshotJobWorker, name), side_effect=side_effect,
+        )
+        monkeypatch.setattr(MockedSnapshotJobWorker, name, mocks[name])
+    return mocks
+
+
+@pytest.mark.parametrize(
+    'params, expected_code', [
+        ({'acc_addrs': ['ADDR1', 'ADDR2']}, 202),
+        ({'acc_addrs': []}, 422), ({}, 422),
+    ]
+)
+def test_create_job_router(mock_job_worker_class, params, expected_code):
+    res = test_client.post('/api/v1/snapshot_jobs', json=params)
+    assert res.status_code == expected_code
+    if expected_code == 202:
+        assert res.json() == {'job_id': 1, 'status': 'pending', 'total': 2}
+    else:
+        mock_job_worker_class['create_job'].assert_not_awaited()
+
+
+@pytest.mark.parametrize(
+    'job_id, params, expected_code', [
+        (1, {}, 200), (2, {}, 404), (1, {'failures_limit': -1}, 422),
+    ]
+)
+def test_get_job_router(mock_job_worker_class, job_id, params, expected_code):
+    res = test_client.get(f'/api/v1/snapshot_jobs/{job_id}', params=params)
+    assert res.status_code == expected_code
+    if expected_code == 200:
+        assert res.json()['processed'] == 4
+        assert res.json()['throughput'] == 2.0
+        call_args = mock_job_worker_class['get_job_status'].await_args.args
+        assert call_args[:2] == (1, 100)
@@ -0,0 +1,206 @@
+"""Модуль с тестами исполнителя фоновых заданий."""
+import asyncio
+import contextlib
+import unittest.mock
+
+import app.classes.job_worker as jw
+import app.config as config
+import app.models.job_model as job_bd_mdl
+from app.schemas.acc_schema import AccBulkResultSchema
+import pytest
+from sqlalchemy.dialects import postgresql as pg
+
+JOB_ITEMS = [(1, 'ADDR1'), (2, 'ADDR2'), (3, 'ADDR3'), (4, 'ADDR4')]
+
+
+async def mocked_create_bulk(acc_addrs, *args, **kwargs):
+    return [
+        AccBulkResultSchema(
+            acc_addr=acc_addr, inserted=acc_addr != 'ADDR3',
+            message='' if acc_addr != 'ADDR3' else 'ERROR',
+        )
+        for acc_addr in acc_addrs
+    ]
+
+
+@pytest.fixture()
+def job_worker(monkeypatch):
+    pending = list(JOB_ITEMS)
+
+    async def mocked_claim_items(job_id, limit, instance_id, lease, db):
+        return pending[:limit]
+
+    async def mocked_save_results(job_id, items, results, instance_id, db):
+        del pending[:len(items)]
+
+    mocks = {}
+    for name, side_effect in (
+        ('claim_items', mocked_claim_items),
+        ('save_results', mocked_save_results),
+        ('finish_job', None),
+        ('release_items', None),
+        ('renew_items', None),
+    ):
+        mocks[name] = unittest.mock.create_autospec(
+            getattr(jw.SnapshotJobWorker, name), side_effect=side_effect,
+        )
+        monkeypatch.setattr(jw.SnapshotJobWorker, name, mocks[name])
+    mocks['create_bulk'] = unittest.mock.create_autospec(
+        jw.AccountWorker.create_accounts_info_bulk,
+        side_effect=mocked_create_bulk,
+    )
+    monkeypatch.setattr(
+        jw.AccountWorker, 'create_accounts_info_bulk', mocks['create_bulk'],
+    )
+    app_settings = config.AppSettings(
+        job_batch_size=3, job_concurrency=2, job_stale_timeout=60,
+        instance_id='node-1',
+    )
+    return jw.SnapshotJobWorker(app_settings, db_factory=lambda: 'd'), mocks
+
+
+@pytest.mark.asyncio
+async def test_process_job(job_worker) -> None:
+    """Тест обработки задания пачками до завершения."""
+    worker, mocks = job_worker
+    await worker.process_job(7)
+    bulk_calls = mocks['create_bulk'].await_args_list
+    assert [call.args[0] for call in bulk_calls] == [
+        ['ADDR1', 'ADDR2', 'ADDR3'], ['ADDR4'],
+    ]
+    assert all(call.kwargs['concurrency'] == 2 for call in bulk_calls)
+    save_calls = mocks['save_results'].await_args_list
+    assert [call.args[1] for call in save_calls] == [
+        JOB_ITEMS[:3], JOB_ITEMS[3:],
+    ]
+    mocks['claim_items'].assert_awaited_with(7, 3, 'node-1', 60, 'd')
+    mocks['finish_job'].assert_awaited_once_with(7, 'd')
+    mocks['release_items'].assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_process_job_stopped(job_worker) -> None:
+    """Тест остановки исполнителя без завершения задания."""
+    worker, mocks = job_worker
+    worker._stop_event.set()
+    await worker.process_job(7)
+    mocks['claim_items'].assert_not_awaited()
+    mocks['finish_job'].assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_process_job_error(job_worker) -> None:
+    """Тест возврата арендованных адресов в очередь при ошибке."""
+    worker, mocks = job_worker
+    mocks['save_results'].side_effect = RuntimeError('db is down')
+    with pytest.raises(RuntimeError):
+        await worker.process_job(7)
+    mocks['finish_job'].assert_not_awaited()
+    mocks['release_items'].assert_awaited_once_with('node-1', 'd')
+
+
+@pytest.mark.asyncio
+async def test_worker_start_stop(job_worker, monkeypatch) -> None:
+    """Тест запуска, разбора задания и корректной остановки."""
+    worker, mocks = job_worker
+    claim_mock = unittest.mock.create_autospec(
+        jw.SnapshotJobWorker.claim_job, side_effect=[7, None, None],
+    )
+    monkeypatch.setattr(jw.SnapshotJobWorker, 'claim_job', claim_mock)
+    worker.start()
+    await asyncio.sleep(0.01)
+    await asyncio.wait_for(worker.stop(), 1)
+    mocks['finish_job'].assert_awaited_once_with(7, 'd')
+    assert claim_mock.await_count == 2
+
+
+class MockedBDSession:
+
+    def __init__(self) -> None:
+        self.execute = unittest.mock.AsyncMock()
+        self.commit = unittest.mock.AsyncMock()
+
+
+@pytest.mark.asyncio
+async def test_process_items_renews_lease(job_worker) -> None:
+    """Тест продления аренды пачки, пока она обрабатывается."""
+    worker, mocks = job_worker
+    worker.stale_timeout = 0.03
+    mocks['renew_items'].return_value = 1
+
+    async def mocked_slow_create_bulk(acc_addrs, *args, **kwargs):
+        await asyncio.sleep(0.05)
+        return await mocked_create_bulk(acc_addrs)
+
+    mocks['create_bulk'].side_effect = mocked_slow_create_bulk
+    results = await worker.process_items(JOB_ITEMS[:2])
+    assert [result.acc_addr for result in results] == ['ADDR1', 'ADDR2']
+    assert mocks['renew_items'].await_count >= 2
+    mocks['renew_items'].assert_awaited_with([1, 2], 'node-1', 0.03, 'd')
+    renew_count = mocks['renew_items'].await_count
+    await asyncio.sleep(0.03)
+    assert mocks['renew_items'].await_count == renew_count
+
+
+@pytest.mark.asyncio
+async def test_save_results() -> None:
+    """Тест сохранения результатов пачки только для своих адресов."""
+    session = MockedBDSession()
+    done_curs = unittest.mock.MagicMock()
+    # Адрес 2 тем временем арендовал другой экземпляр.
+    done_curs.scalars.return_value.all.return_value = [1]
+    session.execute.side_effect = [
+        done_curs, unittest.mock.MagicMock(rowcount=1),
+        unittest.mock.MagicMock(),
+    ]
+
+    @contextlib.asynccontextmanager
+    async def mocked_async_session():
+        yield session
+
+    results = await mocked_create_bulk(['ADDR1', 'ADDR2', 'ADDR3'])
+    await jw.SnapshotJobWorker.save_results(
+        7, JOB_ITEMS[:3], results, 'node-1', mocked_async_session()
+    )
+    execute_calls = session.execute.await_args_list
+    assert len(execute_calls) == 3
+    done_stmt = execute_calls[0].args[0].compile(dialect=pg.dialect())
+    assert [1, 2] in done_stmt.params.values()
+    assert 'node-1' in done_stmt.params.values()
+    failed_stmt = execute_calls[1].args[0].compile(dialect=pg.dialect())
+    assert 'FROM (VALUES' in str(failed_stmt)
+    assert {3, 'ERROR', 'node-1', job_bd_mdl.ITEM_FAILED}.issubset(
+        failed_stmt.params.values()
+    )
+    job_stmt = execute_calls[2].args[0].compile(dialect=pg.dialect())
+    assert 'snapshot_jobs.processed +' in str(job_stmt)
+    assert job_stmt.params['processed_1'] == 2
+    assert job_stmt.params['inserted_1'] == 1
+    assert job_stmt.params['failed_1'] == 1
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_claim_items() -> None:
+    """Тест аренды пачки адресов одним запросом со SKIP LOCKED."""
+    session = MockedBDSession()
+    session.execute.return_value = unittest.mock.MagicMock()
+    session.execute.return_value.fetchall.return_value = [
+        (2, 'ADDR2'), (1, 'ADDR1'),
+    ]
+
+    @contextlib.asynccontextmanager
+    async def mocked_async_session():
+        yield session
+
+    items = await jw.SnapshotJobWorker.claim_items(
+        7, 2, 'node-1', 60, mocked_async_session()
+    )
+    assert items == [(1, 'ADDR1'), (2, 'ADDR2')]
+    stmt = session.execute.await_args.args[0].compile(dialect=pg.dialect())
+    assert 'FOR UPDATE SKIP LOCKED' in str(stmt)
+    assert 'RETURNING' in str(stmt)
+    assert {7, 2, 'node-1', job_bd_mdl.ITEM_CLAIMED}.issubset(
+        stmt.params.values()
+    )
+    session.commit.assert_awaited_once()
@@ -0,0 +1,39 @@
+"""Модуль с тестами метрик сервиса."""
+import app.utils.metrics as metrics
+import pytest
+
+
+def test_histogram_render() -> None:
+    """Тест накопительных корзин гистограммы и формата вывода."""
+    registry = metrics.MetricsRegistry()
+    histogram = registry.histogram(
+        'test_seconds', 'Тест.', ('stage',), buckets=(0.1, 1.0),
+    )
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, stage='x')
+    text = registry.render()
+    assert '# TYPE test_seconds histogram' in text
+    assert 'test_seconds_bucket{stage="x",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{stage="x",le="1.0"} 3' in text
+    assert 'test_seconds_bucket{stage="x",le="+Inf"} 4' in text
+    assert 'test_seconds_sum{stage="x"} 6.05' in text
+    assert 'test_seconds_count{stage="x"} 4' in text
+
+
+def test_counter_and_gauge() -> None:
+    """Тест счётчика, gauge и экранирования меток."""
+    registry = metrics.MetricsRegistry()
+    counter = registry.counter('test_total', 'Тест.', ('error_type',))
+    gauge = registry.gauge('test_in_flight', 'Тест.')
+    counter.inc(error_type='a"b')
+    counter.inc(2, error_type='a"b')
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    text = registry.render()
+    assert 'test_total{error_type="a\\"b"} 3' in text
+    assert 'test_in_flight 1' in text
+    with pytest.raises(ValueError):
+        counter.inc(stage='x')
+    with pytest.raises(ValueError):
+        registry.counter('test_total', 'Повтор.')
@@ -0,0 +1,143 @@
+"""Модуль с тестами обслуживания партиций таблицы снимков."""
+import contextlib
+import datetime
+import types
+import unittest.mock
+
+import app.classes.partition_maintainer as pm
+import app.config as config
+import pytest
+
+TODAY = datetime.date(2026, 10, 18)
+
+PARTITIONS = [
+    ('accounts_legacy', None, datetime.date(2026, 5, 1), None),
+    (
+        'accounts_p202605', datetime.date(2026, 5, 1),
+        datetime.date(2026, 6, 1), pm.DOWNSAMPLED_COMMENT,
+    ),
+    (
+        'accounts_p202606', datetime.date(2026, 6, 1),
+        datetime.date(2026, 7, 1), None,
+    ),
+    (
+        'accounts_p202610', datetime.date(2026, 10, 1),
+        datetime.date(2026, 11, 1), None,
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    'bound, expected', [
+        (
+            "FOR VALUES FROM (MINVALUE) TO ('2026-11-01 00:00:00')",
+            (None, datetime.date(2026, 11, 1)),
+        ),
+        (
+            "FOR VALUES FROM ('2026-11-01 00:00:00') "
+            "TO ('2026-12-01 00:00:00')",
+            (datetime.date(2026, 11, 1), datetime.date(2026, 12, 1)),
+        ),
+        ('DEFAULT', (None, None)),
+    ]
+)
+def test_parse_partition_bound(bound, expected):
+    assert pm.parse_partition_bound(bound) == expected
+
+
+def test_add_months():
+    assert pm.add_months(datetime.date(2026, 11, 1), 2) == datetime.date(
+        2027, 1, 1
+    )
+    assert pm.add_months(datetime.date(2026, 1, 1), -1) == datetime.date(
+        2025, 12, 1
+    )
+
+
+@pytest.mark.parametrize(
+    'retention_months, retention_mode, expected_drop, expected_downsample', [
+        (0, 'drop', [], []),
+        (4, 'drop', ['accounts_legacy', 'accounts_p202605'], []),
+        (3, 'drop', [
+            'accounts_legacy', 'accounts_p202605', 'accounts_p202606',
+        ], []),
+        (3, 'downsample', [], ['accounts_legacy', 'accounts_p202606']),
+    ]
+)
+def test_plan(
+    retention_months, retention_mode, expected_drop, expected_downsample
+):
+    maintainer = pm.AccountPartitionMaintainer(config.AppSettings(
+        partition_premake_months=2,
+        partition_retention_months=retention_months,
+        partition_retention_mode=retention_mode,
+    ))
+    plan = maintainer.plan(PARTITIONS, TODAY)
+    assert plan['created'] == [
+        (
+            'accounts_p202611', datetime.date(2026, 11, 1),
+            datetime.date(2026, 12, 1),
+        ),
+        (
+            'accounts_p202612', datetime.date(2026, 12, 1),
+            datetime.date(2027, 1, 1),
+        ),
+    ]
+    assert plan['dropped'] == expected_drop
+    assert plan['downsampled'] == expected_downsample
+
+
+class MockedBDSession:
+
+    def __init__(self, partitions: list) -> None:
+        self.execute = unittest.mock.AsyncMock(
+            return_value=unittest.mock.MagicMock(rowcount=0)
+        )
+        self.execute.return_value.scalar.return_value = True
+        self.execute.return_value.fetchall.return_value = partitions
+        self.commit = unittest.mock.AsyncMock()
+
+
+@pytest.mark.asyncio
+async def test_maintain_with_default_partition(monkeypatch):
+    """Тест переноса строк из DEFAULT-партиции в создаваемые партиции."""
+
+    class MockedDate(datetime.date):
+
+        @classmethod
+        def today(cls):
+            return TODAY
+
+    monkeypatch.setattr(pm, 'datetime', types.SimpleNamespace(
+        date=MockedDate, datetime=datetime.datetime,
+    ))
+    session = MockedBDSession([
+        (
+            'accounts_p202610',
+            "FOR VALUES FROM ('2026-10-01 00:00:00') "
+            "TO ('2026-11-01 00:00:00')",
+            None,
+        ),
+        ('accounts_default', 'DEFAULT', None),
+    ])
+
+    @contextlib.asynccontextmanager
+    async def mocked_async_session():
+        yield session
+
+    maintainer = pm.AccountPartitionMaintainer(
+        config.AppSettings(partition_premake_months=1)
+    )
+    plan = await maintainer.maintain(mocked_async_session())
+    assert [name for name, _, _ in plan['created']] == ['accounts_p202611']
+    statements = [
+        str(call.args[0]) for call in session.execute.await_args_list[2:]
+    ]
+    assert len(statements) == 4
+    assert statements[0] == (
+        'LOCK TABLE "accounts_default" IN SHARE ROW EXCLUSIVE MODE'
+    )
+    assert 'LIKE accounts' in statements[1]
+    assert 'DELETE FROM "accounts_default"' in statements[2]
+    assert 'ATTACH PARTITION "accounts_p202611"' in statements[3]
+    session.commit.assert_awaited_once()
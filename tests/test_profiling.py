@@ -0,0 +1,46 @@
+"""Модуль с тестами выборочного профилирования запросов."""
+import logging
+
+import fastapi
+import fastapi.testclient
+
+import app.config as config
+import app.utils.profiling as profiling
+
+
+def make_client(tmp_path, **kwargs) -> fastapi.testclient.TestClient:
+    app = fastapi.FastAPI()
+
+    @app.get('/api/v1/ping')
+    async def ping() -> str:
+        return 'pong'
+
+    app.add_middleware(
+        profiling.ProfilingMiddleware,
+        app_settings=config.AppSettings(
+            profiling_dir=str(tmp_path), **kwargs
+        ),
+    )
+    return fastapi.testclient.TestClient(app)
+
+
+def test_profiling_by_header(tmp_path, caplog) -> None:
+    """Тест профилирования запроса по заголовку X-Profile."""
+    client = make_client(tmp_path, profiling_enabled=True)
+    with caplog.at_level(logging.INFO, logger=profiling.__name__):
+        assert client.get('/api/v1/ping').json() == 'pong'
+        assert not caplog.records
+        res = client.get('/api/v1/ping', headers={'X-Profile': '1'})
+    assert res.json() == 'pong'
+    assert len(caplog.records) == 1
+    assert '/api/v1/ping' in caplog.records[0].getMessage()
+    assert [path.suffix for path in tmp_path.iterdir()] == ['.prof']
+
+
+def test_profiling_disabled(tmp_path, caplog) -> None:
+    """Тест того, что без profiling_enabled заголовок игнорируется."""
+    client = make_client(tmp_path, profiling_sample_rate=1.0)
+    with caplog.at_level(logging.INFO, logger=profiling.__name__):
+        client.get('/api/v1/ping', headers={'X-Profile': '1'})
+    assert not caplog.records
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,92 @@
+"""Модуль с тестами планировщика обновления аккаунтов."""
+import asyncio
+import types
+import unittest.mock
+
+import app.classes.refresh_scheduler as rs
+import app.config as config
+from app.schemas.acc_schema import AccBulkResultSchema
+import pytest
+
+TRACKED_ADDRS = ['ADDR1', 'ADDR2', 'ADDR3', 'ADDR4', 'ADDR5']
+
+
+async def mocked_get_tracked_addresses(after_addr, limit, db, shard=None):
+    acc_addrs = [
+        acc_addr for acc_addr in TRACKED_ADDRS
+        if shard is None or int(acc_addr[-1]) % 2 == shard
+    ]
+    start = 0 if after_addr is None else acc_addrs.index(after_addr) + 1
+    return acc_addrs[start:start + limit]
+
+
+async def mocked_create_bulk(acc_addrs, *args, **kwargs):
+    return [
+        AccBulkResultSchema(
+            acc_addr=acc_addr, inserted=acc_addr != 'ADDR3', message='',
+        )
+        for acc_addr in acc_addrs
+    ]
+
+
+@pytest.fixture()
+def scheduler(monkeypatch):
+    get_tracked_mock = unittest.mock.create_autospec(
+        rs.AccountRefreshScheduler.get_tracked_addresses,
+        side_effect=mocked_get_tracked_addresses,
+    )
+    monkeypatch.setattr(
+        rs.AccountRefreshScheduler, 'get_tracked_addresses', get_tracked_mock,
+    )
+    create_bulk_mock = unittest.mock.create_autospec(
+        rs.AccountWorker.create_accounts_info_bulk,
+        side_effect=mocked_create_bulk,
+    )
+    monkeypatch.setattr(
+        rs.AccountWorker, 'create_accounts_info_bulk', create_bulk_mock,
+    )
+    app_settings = config.AppSettings(
+        refresh_batch_size=2, refresh_concurrency=3, refresh_rate_limit=0,
+        refresh_interval=60, refresh_jitter=0,
+    )
+    return (
+        rs.AccountRefreshScheduler(app_settings, db_factory=lambda: 'd'),
+        create_bulk_mock,
+    )
+
+
+@pytest.mark.asyncio
+async def test_refresh_cycle(scheduler) -> None:
+    """Тест одного прохода обновления всех адресов пачками."""
+    refresh_scheduler, create_bulk_mock = scheduler
+    refreshed = await refresh_scheduler.refresh_cycle()
+    assert refreshed == 4
+    bulk_calls = create_bulk_mock.await_args_list
+    assert [call.args[0] for call in bulk_calls] == [
+        ['ADDR1', 'ADDR2'], ['ADDR3', 'ADDR4'], ['ADDR5'],
+    ]
+    assert all(call.kwargs['concurrency'] == 3 for call in bulk_calls)
+
+
+@pytest.mark.asyncio
+async def test_refresh_cycle_by_shards(scheduler) -> None:
+    """Тест прохода только по арендованным шардам, по одному за раз."""
+    refresh_scheduler, create_bulk_mock = scheduler
+    refresh_scheduler.coordinator = types.SimpleNamespace(
+        shards=frozenset({1})
+    )
+    refreshed = await refresh_scheduler.refresh_cycle()
+    assert refreshed == 2
+    assert [
+        call.args[0] for call in create_bulk_mock.await_args_list
+    ] == [['ADDR1', 'ADDR3'], ['ADDR5']]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_start_stop(scheduler) -> None:
+    """Тест запуска и корректной остановки планировщика."""
+    refresh_scheduler, create_bulk_mock = scheduler
+    refresh_scheduler.start()
+    await asyncio.sleep(0.01)
+    await asyncio.wait_for(refresh_scheduler.stop(), 1)
+    assert len(create_bulk_mock.await_args_list) == 3
@@ -0,0 +1,36 @@
+"""Модуль с тестами служебных роутеров приложения."""
+import fastapi.testclient
+
+from main import app as main_app
+
+test_client = fastapi.testclient.TestClient(main_app)
+
+
+def test_pool_stats_router():
+    res = test_client.get('/api/v1/pool_stats')
+    assert res.status_code == 200
+    stats = res.json()
+    assert stats['pool_class'] == 'MeteredAsyncQueuePool'
+    assert stats['checked_out'] == 0
+    assert stats['wait_count'] == 0
+
+
+def test_tron_cache_stats_router():
+    res = test_client.get('/api/v1/tron_cache_stats')
+    assert res.status_code == 200
+    assert {'hits', 'misses', 'coalesced'}.issubset(res.json())
+
+
+def test_metrics_router():
+    test_client.get('/api/v1/tron_cache_stats')
+    res = test_client.get('/metrics')
+    assert res.status_code == 200
+    assert res.headers['content-type'].startswith('text/plain')
+    assert '# TYPE http_request_duration_seconds histogram' in res.text
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'endpoint="/api/v1/tron_cache_stats",status="200"}'
+    ) in res.text
+    assert (
+        'http_requests_in_flight{method="GET",endpoint="/metrics"} 1'
+    ) in res.text
@@ -0,0 +1,114 @@
+"""Модуль с тестами координатора шардов адресов."""
+import asyncio
+import contextlib
+import unittest.mock
+
+import app.classes.shard_coordinator as sc
+import app.config as config
+import pytest
+from sqlalchemy.dialects import postgresql as pg
+
+
+def test_get_instance_id(monkeypatch) -> None:
+    """Тест идентификатора экземпляра из настроек и по умолчанию."""
+    assert sc.get_instance_id(
+        config.AppSettings(instance_id='node-1')
+    ) == 'node-1'
+    monkeypatch.setattr(sc.socket, 'gethostname', lambda: 'host')
+    monkeypatch.setattr(sc.os, 'getpid', lambda: 42)
+    assert sc.get_instance_id(config.AppSettings()) == 'host-42'
+
+
+@pytest.fixture()
+def coordinator(monkeypatch):
+    rebalance_mock = unittest.mock.create_autospec(
+        sc.ShardCoordinator.rebalance,
+        side_effect=[frozenset({1, 2}), RuntimeError('db is down')],
+    )
+    monkeypatch.setattr(sc.ShardCoordinator, 'rebalance', rebalance_mock)
+    leave_mock = unittest.mock.create_autospec(sc.ShardCoordinator.leave)
+    monkeypatch.setattr(sc.ShardCoordinator, 'leave', leave_mock)
+    app_settings = config.AppSettings(
+        instance_id='node-1', shard_lease_ttl=30, shard_renew_interval=10,
+    )
+    return (
+        sc.ShardCoordinator(app_settings, db_factory=lambda: 'd'),
+        rebalance_mock, leave_mock,
+    )
+
+
+@pytest.mark.asyncio
+async def test_renew(coordinator) -> None:
+    """Тест обновления шардов и их сброса при ошибке продления."""
+    shard_coordinator, rebalance_mock, _ = coordinator
+    await shard_coordinator.renew()
+    assert shard_coordinator.shards == {1, 2}
+    rebalance_mock.assert_awaited_with('node-1', 30, 'd')
+    await shard_coordinator.renew()
+    assert shard_coordinator.shards == frozenset()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_start_stop(coordinator) -> None:
+    """Тест продления при запуске и отпускания шардов при остановке."""
+    shard_coordinator, rebalance_mock, leave_mock = coordinator
+    shard_coordinator.start()
+    await asyncio.sleep(0.01)
+    assert shard_coordinator.shards == {1, 2}
+    await asyncio.wait_for(shard_coordinator.stop(), 1)
+    assert rebalance_mock.await_count == 1
+    assert shard_coordinator.shards == frozenset()
+    leave_mock.assert_awaited_once_with('node-1', 'd')
+
+
+class MockedBDSession:
+
+    def __init__(self, scalars: list) -> None:
+        self.execute = unittest.mock.AsyncMock(
+            return_value=unittest.mock.MagicMock()
+        )
+        self.execute.return_value.scalar_one.return_value = 2
+        self.execute.return_value.scalars.return_value.all.side_effect = (
+            scalars
+        )
+        self.commit = unittest.mock.AsyncMock()
+
+
+@pytest.mark.asyncio
+async def test_rebalance_releases_excess() -> None:
+    """Тест отпускания шардов сверх справедливой доли."""
+    session = MockedBDSession([list(range(40))])
+
+    @contextlib.asynccontextmanager
+    async def mocked_async_session():
+        yield session
+
+    shards = await sc.ShardCoordinator.rebalance(
+        'node-1', 30, mocked_async_session()
+    )
+    assert shards == frozenset(range(32))
+    release_stmt = session.execute.await_args_list[-1].args[0].compile(
+        dialect=pg.dialect()
+    )
+    assert list(range(32, 40)) in release_stmt.params.values()
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_rebalance_claims_free() -> None:
+    """Тест захвата свободных шардов до справедливой доли."""
+    session = MockedBDSession([[0, 1], [5, 6]])
+
+    @contextlib.asynccontextmanager
+    async def mocked_async_session():
+        yield session
+
+    shards = await sc.ShardCoordinator.rebalance(
+        'node-1', 30, mocked_async_session()
+    )
+    assert shards == {0, 1, 5, 6}
+    execute_calls = session.execute.await_args_list
+    claim_stmt = execute_calls[-2].args[0].compile(dialect=pg.dialect())
+    assert 'FOR UPDATE SKIP LOCKED' in str(claim_stmt)
+    assert 30 in claim_stmt.params.values()
+    session.commit.assert_awaited_once()
@@ -0,0 +1,30 @@
+"""Модуль с тестами создания клиента TRON."""
+import app.config as config
+import app.utils.tron_client as tc
+import pytest
+
+
+@pytest.mark.parametrize(
+    'overrides, expected_uri', [
+        ({}, 'https://api.nileex.io'),
+        (
+            {
+                'tron_endpoint_uri': 'http://localhost:8090/',
+                'tron_api_key': 'K',
+            },
+            'http://localhost:8090/',
+        ),
+    ]
+)
+@pytest.mark.asyncio
+async def test_create_tron_client(overrides, expected_uri) -> None:
+    """Тест сборки клиента TRON из настроек."""
+    app_settings = config.AppSettings(tron_timeout=3.0, **overrides)
+    client = tc.create_tron_client(app_settings)
+    http_client = client.provider.client
+    assert client.provider.endpoint_uri == expected_uri
+    assert http_client.timeout.read == 3.0
+    if 'tron_api_key' in overrides:
+        assert http_client.headers['TRON-PRO-API-KEY'] == 'K'
+    await client.close()
+    assert http_client.is_closed
@@ -0,0 +1,177 @@
+"""Модуль с тестами защиты вызовов TRON."""
+import asyncio
+import unittest.mock
+
+import app.config as config
+import app.utils.metrics as metrics
+import app.utils.tron_guard as tg
+import httpx
+import pytest
+
+
+def make_status_error(status_code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request('POST', 'http://tron/wallet/getaccount')
+    return httpx.HTTPStatusError(
+        'TEST', request=request,
+        response=httpx.Response(status_code, request=request),
+    )
+
+
+@pytest.fixture()
+def guard() -> tg.TronCallGuard:
+    return tg.TronCallGuard(config.AppSettings(
+        tron_rate_limit=0, tron_retry_attempts=2, tron_retry_base_delay=0,
+        tron_breaker_failure_threshold=3, tron_breaker_reset_timeout=60,
+    ))
+
+
+@pytest.mark.asyncio
+async def test_guard_retries_retryable_errors(guard) -> None:
+    """Тест повтора временных ошибок."""
+    fetch = unittest.mock.AsyncMock(
+        side_effect=[make_status_error(429), httpx.ConnectError('T'), 'OK']
+    )
+    assert await guard.call(fetch) == 'OK'
+    assert fetch.await_count == 3
+    assert guard.breaker.state == tg.CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_guard_does_not_retry_other_errors(guard) -> None:
+    """Тест того, что ошибки по существу не повторяются."""
+    fetch = unittest.mock.AsyncMock(side_effect=make_status_error(400))
+    with pytest.raises(httpx.HTTPStatusError):
+        await guard.call(fetch)
+    fetch.assert_awaited_once()
+    assert guard.breaker.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_guard_breaker_fails_fast(guard) -> None:
+    """Тест размыкания предохранителя после серии сбоев."""
+    fetch = unittest.mock.AsyncMock(side_effect=make_status_error(503))
+    with pytest.raises(httpx.HTTPStatusError):
+        await guard.call(fetch)
+    assert fetch.await_count == 3
+    assert guard.breaker.state == tg.CircuitBreaker.OPEN
+    with pytest.raises(tg.CircuitOpenError):
+        await guard.call(fetch)
+    assert fetch.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_guard_rate_limited_does_not_open_breaker() -> None:
+    """Тест: отказы по квоте снижают частоту, но не размыкают цепь."""
+    guard = tg.TronCallGuard(config.AppSettings(
+        tron_rate_limit=1000, tron_rate_burst=1000, tron_retry_attempts=3,
+        tron_retry_base_delay=0, tron_breaker_failure_threshold=2,
+    ))
+    fetch = unittest.mock.AsyncMock(
+        side_effect=[make_status_error(429)] * 3 + ['OK']
+    )
+    assert await guard.call(fetch) == 'OK'
+    assert guard.breaker.state == tg.CircuitBreaker.CLOSED
+    assert guard.breaker.failures == 0
+    assert guard.bucket.rate == pytest.approx(1000 / 8 + 50)
+
+
+@pytest.mark.asyncio
+async def test_guard_cancelled_probe(guard) -> None:
+    """Тест снятия признака пробного вызова при отмене вызова."""
+    guard.breaker.state = tg.CircuitBreaker.HALF_OPEN
+    fetch = unittest.mock.AsyncMock(side_effect=asyncio.CancelledError)
+    with pytest.raises(asyncio.CancelledError):
+        await guard.call(fetch)
+    assert guard.breaker.state == tg.CircuitBreaker.HALF_OPEN
+    assert await guard.call(unittest.mock.AsyncMock(return_value='OK')) == (
+        'OK'
+    )
+    assert guard.breaker.state == tg.CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_breaker_half_open_probe(monkeypatch) -> None:
+    """Тест пробного вызова после таймаута предохранителя."""
+    now = [100.0]
+    monkeypatch.setattr(
+        tg, 'time', unittest.mock.Mock(monotonic=lambda: now[0])
+    )
+    breaker = tg.CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.on_failure()
+    with pytest.raises(tg.CircuitOpenError):
+        breaker.before_call()
+    now[0] += 11
+    assert breaker.before_call() is True
+    with pytest.raises(tg.CircuitOpenError):
+        breaker.before_call()
+    breaker.on_success(is_probe=True)
+    assert breaker.before_call() is False
+    assert breaker.state == tg.CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_guard_normal_call_during_probe() -> None:
+    """Тест: обычный вызов, завершившийся во время пробы, её не трогает."""
+    guard = tg.TronCallGuard(config.AppSettings(
+        tron_rate_limit=0, tron_retry_attempts=0,
+        tron_breaker_failure_threshold=1, tron_breaker_reset_timeout=0,
+    ))
+    normal_done = asyncio.Event()
+    probe_done = asyncio.Event()
+
+    async def wait_and_return(event: asyncio.Event) -> str:
+        await event.wait()
+        return 'OK'
+
+    normal_call = asyncio.create_task(
+        guard.call(lambda: wait_and_return(normal_done))
+    )
+    await asyncio.sleep(0)
+    with pytest.raises(httpx.HTTPStatusError):
+        await guard.call(unittest.mock.AsyncMock(
+            side_effect=make_status_error(503)
+        ))
+    assert guard.breaker.state == tg.CircuitBreaker.OPEN
+    probe_call = asyncio.create_task(
+        guard.call(lambda: wait_and_return(probe_done))
+    )
+    await asyncio.sleep(0)
+    assert guard.breaker.state == tg.CircuitBreaker.HALF_OPEN
+    normal_done.set()
+    assert await normal_call == 'OK'
+    assert guard.breaker.state == tg.CircuitBreaker.HALF_OPEN
+    with pytest.raises(tg.CircuitOpenError):
+        await guard.call(unittest.mock.AsyncMock(return_value='OK'))
+    probe_done.set()
+    assert await probe_call == 'OK'
+    assert guard.breaker.state == tg.CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate(monkeypatch) -> None:
+    """Тест ожидания токена после исчерпания запаса."""
+    sleep_mock = unittest.mock.AsyncMock()
+    monkeypatch.setattr(tg, 'asyncio', unittest.mock.Mock(sleep=sleep_mock))
+    now = [100.0]
+    monkeypatch.setattr(
+        tg, 'time', unittest.mock.Mock(monotonic=lambda: now[0])
+    )
+    bucket = tg.TokenBucket(rate=10, burst=2)
+    for _ in range(4):
+        await bucket.acquire()
+    sleep_delays = [call.args[0] for call in sleep_mock.await_args_list]
+    assert sleep_delays == [pytest.approx(0.1), pytest.approx(0.2)]
+
+
+@pytest.mark.asyncio
+async def test_guard_metrics(guard) -> None:
+    """Тест учёта длительности и ошибок вызовов в метриках."""
+    metrics.registry.clear()
+    fetch = unittest.mock.AsyncMock(
+        side_effect=[make_status_error(429), 'OK']
+    )
+    assert await guard.call(fetch, method='get_account') == 'OK'
+    assert metrics.tron_call_errors.get(
+        method='get_account', error_type='http_429'
+    ) == 1
+    assert metrics.tron_call_duration.get(method='get_account')['count'] == 2
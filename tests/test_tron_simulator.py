@@ -0,0 +1,78 @@
+"""Модуль с тестами имитатора узла TRON."""
+import app.config as config
+import app.utils.tron_client as tc
+import app.utils.tron_simulator as ts
+import httpx
+import pytest
+import tronpy.exceptions
+
+
+def make_settings(**overrides) -> config.AppSettings:
+    return config.AppSettings(**{
+        'tron_provider': 'simulator', 'tron_sim_latency_ms': 0,
+        'tron_sim_seed': 1, **overrides,
+    })
+
+
+@pytest.mark.asyncio
+async def test_simulator_accounts() -> None:
+    """Тест детерминированных данных аккаунтов через клиент tronpy."""
+    acc_addrs = ts.make_addresses(3, seed=5)
+    assert acc_addrs == ts.make_addresses(3, seed=5)
+    assert len(set(acc_addrs)) == 3
+    client = tc.create_tron_client(make_settings())
+    assert all(client.is_address(acc_addr) for acc_addr in acc_addrs)
+    account = await client.get_account(acc_addrs[0])
+    assert account == await client.get_account(acc_addrs[0])
+    assert account['address'] == acc_addrs[0]
+    assert isinstance(account['balance'], int)
+    assert 'energy_window_size' in account['account_resource']
+    assert 0 < await client.get_bandwidth(acc_addrs[0]) <= 5600
+    await client.close()
+
+
+@pytest.mark.parametrize(
+    'overrides, status_code', [
+        ({'tron_sim_error_rate': 1.0}, 503),
+        ({'tron_sim_rate_limit_rate': 1.0}, 429),
+    ]
+)
+@pytest.mark.asyncio
+async def test_simulator_errors(overrides, status_code) -> None:
+    """Тест имитации сбоев узла и ограничения частоты."""
+    client = tc.create_tron_client(make_settings(**overrides))
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        await client.get_account(ts.make_addresses(1)[0])
+    assert exc_info.value.response.status_code == status_code
+    if status_code == 429:
+        assert exc_info.value.response.headers['Retry-After'] == '1'
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_simulator_missing_accounts() -> None:
+    """Тест имитации отсутствующих аккаунтов."""
+    client = tc.create_tron_client(make_settings(tron_sim_missing_rate=1.0))
+    with pytest.raises(tronpy.exceptions.AddressNotFound):
+        await client.get_account(ts.make_addresses(1)[0])
+    await client.close()
+
+
+@pytest.mark.parametrize(
+    'distribution', ['constant', 'uniform', 'normal', 'lognormal',
+                     'exponential'],
+)
+def test_simulator_latency(distribution) -> None:
+    """Тест выборки задержек по распределениям."""
+    simulator = ts.TronSimulator(make_settings(
+        tron_sim_latency_distribution=distribution,
+        tron_sim_latency_ms=50, tron_sim_latency_spread_ms=10,
+    ))
+    latencies = [simulator.get_latency() for _ in range(2000)]
+    assert all(latency >= 0 for latency in latencies)
+    mean = sum(latencies) / len(latencies)
+    assert 0.03 < mean < 0.08
+    if distribution == 'constant':
+        assert set(latencies) == {0.05}
+    if distribution == 'uniform':
+        assert 0.04 <= min(latencies) and max(latencies) <= 0.06
@@ -0,0 +1,71 @@
+"""Модуль с тестами буфера отложенной записи."""
+import asyncio
+import unittest.mock
+
+import app.config as config
+import app.utils.write_buffer as wb
+import pytest
+
+
+def make_buffer(insert_mock, **overrides) -> wb.AccountWriteBuffer:
+    app_settings = config.AppSettings(**{
+        'write_behind_batch_size': 3,
+        'write_behind_flush_interval': 0.01,
+        'write_behind_max_queue': 10,
+        'write_behind_put_timeout': 0.01,
+        **overrides,
+    })
+    return wb.AccountWriteBuffer(
+        app_settings, insert_mock, db_factory=lambda: 'd',
+    )
+
+
+@pytest.mark.asyncio
+async def test_buffer_batches_rows() -> None:
+    """Тест сброса строк пачками по размеру и по времени."""
+    insert_mock = unittest.mock.AsyncMock(return_value=[1])
+    buffer = make_buffer(insert_mock)
+    buffer.start()
+    futures = [await buffer.submit({'acc_addr': num}) for num in range(4)]
+    await asyncio.wait_for(asyncio.gather(*futures), 1)
+    await buffer.stop()
+    batches = [call.args[0] for call in insert_mock.await_args_list]
+    assert batches == [
+        [{'acc_addr': 0}, {'acc_addr': 1}, {'acc_addr': 2}],
+        [{'acc_addr': 3}],
+    ]
+    assert all(call.args[1] == 'd' for call in insert_mock.await_args_list)
+
+
+@pytest.mark.asyncio
+async def test_buffer_flushes_on_stop() -> None:
+    """Тест гарантированного сброса буфера при остановке."""
+    insert_mock = unittest.mock.AsyncMock(return_value=[1])
+    buffer = make_buffer(insert_mock, write_behind_flush_interval=60)
+    buffer.start()
+    future = await buffer.submit({'acc_addr': 1})
+    await asyncio.wait_for(buffer.stop(), 1)
+    assert future.result() is True
+    insert_mock.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_buffer_propagates_insert_errors() -> None:
+    """Тест передачи ошибки записи ожидающим."""
+    insert_mock = unittest.mock.AsyncMock(side_effect=Exception('TEST'))
+    buffer = make_buffer(insert_mock)
+    buffer.start()
+    future = await buffer.submit({'acc_addr': 1})
+    with pytest.raises(Exception):
+        await asyncio.wait_for(future, 1)
+    await buffer.stop()
+
+
+@pytest.mark.asyncio
+async def test_buffer_backpressure() -> None:
+    """Тест отказа при переполненной очереди."""
+    insert_mock = unittest.mock.AsyncMock(return_value=[1])
+    buffer = make_buffer(insert_mock, write_behind_max_queue=1)
+    await buffer.submit({'acc_addr': 1})
+    with pytest.raises(wb.WriteBufferFullError):
+        await buffer.submit({'acc_addr': 2})